@@ -1,17 +1,19 @@
 from fastapi.responses import RedirectResponse
 from fastapi import APIRouter, Request
-import requests
 import secrets
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-from logic.user_db import get_or_create_user
-from logic.session_token import create_session_token
-
+# logic 모듈의 env 상수(SQLite·HTTP 설정)가 .env 값을 읽도록 import 전에 로드
 env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+from logic.user_db import get_or_create_user  # noqa: E402
+from logic.db import run_db  # noqa: E402
+from logic.http_clients import get_client  # noqa: E402
+from logic.session_token import create_session_token  # noqa: E402
+
 router = APIRouter()
 
 GOOGLE_CLIENT_ID = (os.getenv("GOOGLE_CLIENT_ID") or "").strip()
@@ -33,8 +35,7 @@ else:
 print(f"✅ FRONTEND_URL: {FRONTEND_URL}")
 
 
-def google_exchange_token(code: str) -> dict:
-    url = "https://oauth2.googleapis.com/token"
+async def google_exchange_token(code: str) -> dict:
     data = {
         "grant_type": "authorization_code",
         "code": code,
@@ -42,15 +43,14 @@ def google_exchange_token(code: str) -> dict:
         "client_secret": GOOGLE_CLIENT_SECRET,
         "redirect_uri": GOOGLE_REDIRECT_URI,
     }
-    r = requests.post(url, data=data, timeout=10)
+    r = await get_client("google_oauth").post("/token", data=data)
     r.raise_for_status()
     return r.json()
 
 
-def google_userinfo(access_token: str) -> dict:
-    url = "https://openidconnect.googleapis.com/v1/userinfo"
+async def google_userinfo(access_token: str) -> dict:
     headers = {"Authorization": f"Bearer {access_token}"}
-    r = requests.get(url, headers=headers, timeout=10)
+    r = await get_client("google_oidc").get("/v1/userinfo", headers=headers)
     r.raise_for_status()
     return r.json()
 
@@ -89,7 +89,7 @@ def google_login():
 
 
 @router.get("/auth/google/callback")
-def google_callback(request: Request):
+async def google_callback(request: Request):
     if not GOOGLE_CLIENT_ID or not GOOGLE_REDIRECT_URI:
         return RedirectResponse(
             f"{FRONTEND_URL}/login?error=google_not_configured",
@@ -111,7 +111,7 @@ def google_callback(request: Request):
         return RedirectResponse(f"{FRONTEND_URL}/login?error=bad_state", status_code=302)
 
     try:
-        token = google_exchange_token(code)
+        token = await google_exchange_token(code)
     except Exception as e:
         print(f"⚠️ 구글 토큰 교환 실패: {e}")
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
@@ -121,7 +121,7 @@ def google_callback(request: Request):
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
 
     try:
-        info = google_userinfo(access_token)
+        info = await google_userinfo(access_token)
     except Exception as e:
         print(f"⚠️ 구글 사용자 정보 조회 실패: {e}")
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
@@ -134,7 +134,8 @@ def google_callback(request: Request):
     nickname = (info.get("name") or "").strip() or None
 
     try:
-        user_id = get_or_create_user(
+        user_id = await run_db(
+            get_or_create_user,
             provider="google",
             provider_id=str(google_id),
             email=email,
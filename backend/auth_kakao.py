@@ -1,18 +1,20 @@
 # app/auth_kakao.py
 from fastapi.responses import RedirectResponse
 from fastapi import APIRouter, Request
-import requests
 import secrets
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-from logic.user_db import get_or_create_user
-from logic.session_token import create_session_token
-
+# logic 모듈의 env 상수(SQLite·HTTP 설정)가 .env 값을 읽도록 import 전에 로드
 env_path = Path(__file__).resolve().parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+from logic.user_db import get_or_create_user  # noqa: E402
+from logic.db import run_db  # noqa: E402
+from logic.http_clients import get_client  # noqa: E402
+from logic.session_token import create_session_token  # noqa: E402
+
 router = APIRouter()
 
 # 카카오 로그인용 env (전부 있어야 정상 동작)
@@ -32,23 +34,21 @@ else:
 print(f"✅ FRONTEND_URL: {FRONTEND_URL}")
 
 
-def exchange_token(code: str) -> dict:
-    url = "https://kauth.kakao.com/oauth/token"
+async def exchange_token(code: str) -> dict:
     data = {
         "grant_type": "authorization_code",
         "client_id": KAKAO_REST_KEY,
         "redirect_uri": KAKAO_REDIRECT_URI,
         "code": code,
     }
-    r = requests.post(url, data=data, timeout=10)
+    r = await get_client("kakao_auth").post("/oauth/token", data=data)
     r.raise_for_status()
     return r.json()
 
 
-def kakao_me(access_token: str) -> dict:
-    url = "https://kapi.kakao.com/v2/user/me"
+async def kakao_me(access_token: str) -> dict:
     headers = {"Authorization": f"Bearer {access_token}"}
-    r = requests.get(url, headers=headers, timeout=10)
+    r = await get_client("kakao_api").get("/v2/user/me", headers=headers)
     r.raise_for_status()
     return r.json()
 
@@ -82,7 +82,7 @@ def kakao_login():
 
 
 @router.get("/auth/kakao/callback")
-def kakao_callback(request: Request):
+async def kakao_callback(request: Request):
     if not KAKAO_REST_KEY or not KAKAO_REDIRECT_URI:
         return RedirectResponse(
             f"{FRONTEND_URL}/login?error=kakao_not_configured",
@@ -103,7 +103,7 @@ def kakao_callback(request: Request):
         return RedirectResponse(f"{FRONTEND_URL}/login?error=bad_state", status_code=302)
 
     try:
-        token = exchange_token(code)
+        token = await exchange_token(code)
     except Exception as e:
         print(f"⚠️ 카카오 토큰 교환 실패: {e}")
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
@@ -112,7 +112,7 @@ def kakao_callback(request: Request):
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
 
     try:
-        me = kakao_me(access_token)
+        me = await kakao_me(access_token)
     except Exception as e:
         print(f"⚠️ 카카오 사용자 정보 조회 실패: {e}")
         return RedirectResponse(f"{FRONTEND_URL}/login?error=no_access_token", status_code=302)
@@ -128,7 +128,8 @@ def kakao_callback(request: Request):
 
     # users 테이블에 없으면 INSERT, 있으면 last_login만 UPDATE 후 user_id 반환
     try:
-        user_id = get_or_create_user(
+        user_id = await run_db(
+            get_or_create_user,
             provider="kakao",
             provider_id=str(kakao_id),
             email=email,
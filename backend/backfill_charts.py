@@ -0,0 +1,39 @@
+"""
+saju 테이블 명식 컬럼 backfill — 명식이 없거나 chart_version 이 옛 버전인 행을 배치로 다시 계산
+실행 예:
+  cd backend && python backfill_charts.py
+  cd backend && python backfill_charts.py --batch-size 200 --max-rows 1000
+
+배치마다 커밋하므로 중간에 멈춰도 다시 실행하면 남은 행부터 이어서 처리합니다.
+(새로 저장되는 사주는 /api/saju/save 에서 바로 계산되고, 조회 시 빠진 행은 /api/saju/{id} 가 채움)
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from logic.chart_compute import BACKFILL_BATCH_SIZE, CHART_VERSION, backfill_charts  # noqa: E402
+from logic.migrations import migrate  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="saju 명식 컬럼 backfill")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    parser.add_argument("--max-rows", type=int, default=None, help="이번 실행에서 처리할 최대 행 수")
+    args = parser.parse_args()
+
+    migrate()  # 명식 컬럼이 있는 스키마까지
+    t0 = time.perf_counter()
+    stats = backfill_charts(batch_size=args.batch_size, max_rows=args.max_rows)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"✅ backfill 완료 (chart_version={CHART_VERSION}): {stats['updated']}건 갱신, "
+        f"{stats['failed']}건 실패, {stats['batches']}배치, {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+SQLite 연결 계층 마이크로 벤치마크 — 요청마다 connect/close 하던 방식 vs logic.db 스레드별 연결
+실행 예:
+  cd backend && python bench_db.py
+  cd backend && python bench_db.py --iterations 20000 --json
+  cd backend && python bench_db.py --saju-list --rows 10000
+
+/api/seeds 의 get_seed_balance 와 같은 쿼리(users 에서 id로 seed_balance 1건)를 임시 DB에 대해 반복하고
+호출당 평균/p50/p99(µs)와, 둘의 차이(= 요청당 없어진 connect 오버헤드)를 출력합니다.
+
+--saju-list: 사주 --rows 개를 가진 사용자 1명(+ 다른 사용자들)으로 /api/saju/list 쿼리 비교
+  예전(user_id 단일 인덱스, 전체 목록) vs 복합 인덱스 전체 목록 / 첫 페이지 / 뒤쪽 페이지(키셋), 응답 JSON 크기
+--export: 같은 데이터로 /api/saju/export 청크 루프 — 첫 청크까지 시간, 전체 시간, 최대 메모리(tracemalloc)
+  명식 컬럼이 빈 첫 실행(청크마다 계산·저장)과 저장된 뒤 두 번째 실행, 전체 목록을 한 번에 만든 경우와 비교
+"""
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from logic import db, saju_db  # noqa: E402
+from logic.migrations import migrate  # noqa: E402
+from logic.db import close_thread_connections, connection  # noqa: E402
+
+QUERY = "SELECT seed_balance FROM users WHERE id = ?"
+
+
+def _prepare(path: Path, users: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, seed_balance INTEGER DEFAULT 0)")
+    conn.executemany("INSERT INTO users (id, seed_balance) VALUES (?, ?)", [(i, i % 13) for i in range(1, users + 1)])
+    conn.commit()
+    conn.close()
+
+
+def _per_call_connect(path: Path, user_id: int) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(QUERY, (user_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _shared(path: Path, user_id: int) -> int:
+    with connection(path) as conn:
+        return conn.execute(QUERY, (user_id,)).fetchone()[0]
+
+
+def _measure(fn, path: Path, iterations: int, users: int) -> dict:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(path, i % users + 1)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 2),
+        "p50_us": round(samples[len(samples) // 2], 2),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1], 2),
+    }
+
+
+def _prepare_saju(path: Path, rows: int, other_users: int) -> None:
+    """대상 사용자(user_id=1) rows개 + 다른 사용자들 각 10개, created_at 은 무작위 순서로 삽입"""
+    db.APP_DB = path
+    migrate()
+    data = [(1, i) for i in range(rows)] + [(u, i) for u in range(2, other_users + 2) for i in range(10)]
+    random.Random(0).shuffle(data)
+    with connection(path) as conn:
+        conn.executemany(
+            "INSERT INTO saju (user_id, name, relation, birthdate, birth_time, calendar_type, gender, created_at) "
+            "VALUES (?, ?, NULL, '1990-01-01', '12:00', '양력', '남자', ?)",
+            [(uid, f"사주{i}", f"2024-01-01T00:00:00.{i:06d}") for uid, i in data],
+        )
+        conn.commit()
+
+
+def _time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def bench_saju_list(rows: int, other_users: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_saju.db"
+        _prepare_saju(path, rows, other_users)
+        legacy_sql = (
+            "SELECT id, user_id, name, relation, birthdate, birth_time, calendar_type, gender, created_at "
+            "FROM saju WHERE user_id = ? ORDER BY created_at DESC"
+        )
+        with connection(path) as conn:
+            # 예전 스키마: user_id 단일 인덱스만
+            conn.execute("DROP INDEX idx_saju_user_created")
+            conn.execute("CREATE INDEX idx_saju_user_id ON saju(user_id)")
+            conn.commit()
+            legacy_plan = [r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + legacy_sql, (1,))]
+            legacy_ms = _time_ms(lambda: conn.execute(legacy_sql, (1,)).fetchall(), repeat)
+            conn.execute("DROP INDEX idx_saju_user_id")
+            conn.commit()
+        with connection(path) as conn:
+            # 복합 인덱스 다시 생성 (마이그레이션 002 와 같은 정의)
+            conn.execute("CREATE INDEX idx_saju_user_created ON saju(user_id, created_at DESC, id DESC)")
+            conn.commit()
+
+        full = saju_db.get_saju_list_for_user(1)
+        deep_cursor = saju_db.encode_list_cursor(full[int(len(full) * 0.9)])
+        with connection(path) as conn:
+            page_plan = [r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM saju WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 21", (1,))]
+        first_page, _ = saju_db.get_saju_page_for_user(1, 20)
+        result = {
+            "rows": rows,
+            "legacy_full_list_ms": legacy_ms,
+            "legacy_plan": legacy_plan,
+            "indexed_full_list_ms": _time_ms(lambda: saju_db.get_saju_list_for_user(1), repeat),
+            "first_page_ms": _time_ms(lambda: saju_db.get_saju_page_for_user(1, 20), repeat),
+            "deep_page_ms": _time_ms(lambda: saju_db.get_saju_page_for_user(1, 20, deep_cursor), repeat),
+            "count_ms": _time_ms(lambda: saju_db.get_saju_count_for_user(1), repeat),
+            "page_plan": page_plan,
+            "full_list_bytes": len(json.dumps(full, ensure_ascii=False).encode()),
+            "page_bytes": len(json.dumps(first_page, ensure_ascii=False).encode()),
+        }
+        close_thread_connections()
+    return result
+
+
+def _export_run(fmt: str) -> dict:
+    import tracemalloc
+    from logic import saju_export
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first_ms, total_bytes = None, 0
+    after, limit = None, saju_export.EXPORT_FIRST_CHUNK
+    while True:
+        text, after = saju_export.export_chunk(1, fmt, after, limit)
+        total_bytes += len(text.encode())
+        if first_ms is None:
+            first_ms = (time.perf_counter() - t0) * 1000
+        if after is None:
+            break
+        limit = saju_export.EXPORT_CHUNK_SIZE
+    total_ms = (time.perf_counter() - t0) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"first_chunk_ms": round(first_ms, 2), "total_ms": round(total_ms, 1),
+            "peak_kib": round(peak / 1024, 1), "bytes": total_bytes}
+
+
+def bench_export(rows: int, other_users: int) -> dict:
+    import tracemalloc
+    from logic import saju_export
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare_saju(Path(tmp) / "bench_export.db", rows, other_users)
+        result = {"rows": rows, "cold": _export_run("ndjson"), "stored": _export_run("ndjson")}
+        tracemalloc.start()
+        full = saju_db.get_saju_list_for_user(1)
+        saju_export.encode_records([saju_export.export_record(r) for r in full], "ndjson")
+        result["full_list_peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+        close_thread_connections()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite connect-per-call vs shared connection")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--saju-list", action="store_true", help="/api/saju/list 인덱스·페이지네이션 비교")
+    parser.add_argument("--export", action="store_true", help="/api/saju/export 청크 스트리밍 시간·메모리")
+    parser.add_argument("--rows", type=int, default=10000, help="--saju-list/--export: 대상 사용자의 사주 개수")
+    parser.add_argument("--repeat", type=int, default=20, help="--saju-list: 쿼리별 반복 횟수 (중앙값)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.export:
+        result = bench_export(args.rows, args.users)
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+        print(f"📊 /api/saju/export — 사주 {result['rows']}개 사용자 (ndjson)")
+        for name, label in (("cold", "명식 계산·저장"), ("stored", "저장된 명식")):
+            r = result[name]
+            print(f"   {label:<10} 첫 청크 {r['first_chunk_ms']:>8.2f}ms  전체 {r['total_ms']:>9.1f}ms  "
+                  f"최대 메모리 {r['peak_kib']:>9.1f}KiB  ({r['bytes']:,}B)")
+        print(f"✅ 전체 목록을 한 번에 만들 때 최대 메모리 {result['full_list_peak_kib']:,.1f}KiB")
+        return
+
+    if args.saju_list:
+        result = bench_saju_list(args.rows, args.users, args.repeat)
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+        print(f"📊 /api/saju/list — 사주 {result['rows']}개 사용자 (중앙값)")
+        print(f"   예전 전체 목록     {result['legacy_full_list_ms']:>9.3f}ms  {' / '.join(result['legacy_plan'])}")
+        print(f"   인덱스 전체 목록   {result['indexed_full_list_ms']:>9.3f}ms")
+        print(f"   첫 페이지(20)      {result['first_page_ms']:>9.3f}ms  {' / '.join(result['page_plan'])}")
+        print(f"   90% 지점 페이지    {result['deep_page_ms']:>9.3f}ms")
+        print(f"   total(COUNT)       {result['count_ms']:>9.3f}ms")
+        print(f"✅ 응답 크기 {result['full_list_bytes']:,}B → {result['page_bytes']:,}B")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench_users.db"
+        _prepare(path, args.users)
+        # 워밍업 (OS 파일 캐시, 스레드 연결 생성)
+        _measure(_per_call_connect, path, 200, args.users)
+        _measure(_shared, path, 200, args.users)
+
+        result = {
+            "iterations": args.iterations,
+            "connect_per_call": _measure(_per_call_connect, path, args.iterations, args.users),
+            "shared_connection": _measure(_shared, path, args.iterations, args.users),
+        }
+        close_thread_connections()
+
+    saved = result["connect_per_call"]["mean_us"] - result["shared_connection"]["mean_us"]
+    result["saved_per_call_us"] = round(saved, 2)
+    result["speedup"] = round(result["connect_per_call"]["mean_us"] / result["shared_connection"]["mean_us"], 1)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    print(f"📊 get_seed_balance 쿼리 {args.iterations}회")
+    for name in ("connect_per_call", "shared_connection"):
+        r = result[name]
+        print(f"   {name:<18} mean {r['mean_us']:>8.1f}µs  p50 {r['p50_us']:>8.1f}µs  p99 {r['p99_us']:>8.1f}µs")
+    print(f"✅ 호출당 {result['saved_per_call_us']:.1f}µs 절감 ({result['speedup']}x)")
+
+
+if __name__ == "__main__":
+    main()
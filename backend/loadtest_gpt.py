@@ -0,0 +1,353 @@
+"""
+GPT 경로 부하 테스트 하네스 — 로컬 OpenAI 스텁(openai_stub_server.py)에 연결한 FastAPI 앱을 동시 요청으로 호출
+실행 예:
+  cd backend && python loadtest_gpt.py --endpoint concern --concurrency 20 --requests 200
+  cd backend && python loadtest_gpt.py --endpoint all --latency-ms 2000 --error-rate 0.1 --json
+  cd backend && python loadtest_gpt.py --tone-bench --requests 20 --concurrency 5
+
+- 기본: 스텁 서버를 같은 프로세스의 스레드로 띄우고, 앱은 httpx ASGITransport로 인프로세스 호출
+  (이벤트 루프 지연(stall)을 같은 루프에서 측정할 수 있음)
+- --url: 이미 떠 있는 백엔드 서버를 HTTP로 호출 (이 경우 stall은 하네스 자신의 루프 기준)
+- 결과: 처리량(req/s), p50/p95/p99 지연, 상태코드별 건수, 스텁 호출 수(병합 효과), 이벤트 루프 stall
+- --tone-bench: 사주 N개 × (empathy → reality → fun 톤 전환)을 TONE_MODE=single / all 로 각각 실행해
+  OpenAI 호출 수, prompt/completion 토큰, 첫 조회와 톤 전환 지연을 비교 (인프로세스 전용)
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+STEMS = "甲乙丙丁戊己庚辛壬癸"
+BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+SIXTY = [STEMS[i % 10] + BRANCHES[i % 12] for i in range(60)]
+TONES = ["empathy", "reality", "fun"]
+CONCERNS = [
+    "이직을 해야 할지 고민입니다.",
+    "연애가 자꾸 오래 가지 못해요.",
+    "돈이 모이지 않아서 불안합니다.",
+    "부모님과 자주 부딪혀요.",
+    "공부를 다시 시작해도 될까요?",
+]
+
+# stall 측정: 이 간격으로 깨어나야 하는 ticker가 늦은 만큼을 루프 지연으로 기록
+TICK_SEC = 0.01
+STALL_THRESHOLD_SEC = 0.05
+
+
+def _chart(rng: random.Random) -> dict:
+    year, month, day, hour = (rng.choice(SIXTY) for _ in range(4))
+    return {
+        "day_stem": day[0],
+        "year_pillar": year,
+        "month_pillar": month,
+        "day_pillar": day,
+        "hour_pillar": hour,
+    }
+
+
+def build_request(endpoint: str, i: int, distinct: int, seed: int):
+    """i번째 요청 (path, body). distinct>0이면 그 개수의 입력만 반복 → single-flight 병합 확인용"""
+    key = i % distinct if distinct else i
+    rng = random.Random(seed * 100003 + key)
+    chart = _chart(rng)
+    if endpoint == "interpret":
+        return "/saju/interpret-gpt", {**chart, "tone": rng.choice(TONES)}
+    if endpoint == "summary":
+        return "/saju/summary-gpt", {
+            "system": "당신은 사주 상담가입니다. 5단 요약과 인생 가이드를 작성하세요.",
+            "user": f"사주: {chart['year_pillar']} {chart['month_pillar']} {chart['day_pillar']} {chart['hour_pillar']}",
+        }
+    if endpoint == "concern":
+        return "/saju/concern-analysis", {**chart, "concern": f"{rng.choice(CONCERNS)} (#{key})"}
+    raise ValueError(endpoint)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class LoopLagMonitor:
+    """이벤트 루프가 TICK_SEC 타이머를 얼마나 늦게 처리하는지 기록"""
+
+    def __init__(self):
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + TICK_SEC
+            await asyncio.sleep(TICK_SEC)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def report(self) -> dict:
+        stalls = [s for s in self.samples if s >= STALL_THRESHOLD_SEC]
+        ordered = sorted(self.samples)
+        return {
+            "ticks": len(self.samples),
+            "stalls": len(stalls),
+            "stall_threshold_ms": STALL_THRESHOLD_SEC * 1000,
+            "max_lag_ms": round(max(self.samples, default=0.0) * 1000, 1),
+            "p99_lag_ms": round(percentile(ordered, 99) * 1000, 1),
+            "stalled_ms_total": round(sum(stalls) * 1000, 1),
+        }
+
+
+def start_stub_server(port: int, **config) -> None:
+    """스텁 서버를 데몬 스레드에서 실행하고 기동될 때까지 대기"""
+    import uvicorn
+    import openai_stub_server
+
+    openai_stub_server.configure(**config)
+    server = uvicorn.Server(uvicorn.Config(openai_stub_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("스텁 서버 기동 실패")
+        time.sleep(0.05)
+    print(f"🧪 OpenAI 스텁: http://127.0.0.1:{port}/v1  설정={openai_stub_server.STUB_CONFIG}")
+
+
+async def _stub_stats(port: int) -> dict:
+    import httpx
+    try:
+        async with httpx.AsyncClient(timeout=5) as c:
+            return (await c.get(f"http://127.0.0.1:{port}/stub/stats")).json()
+    except Exception:
+        return {}
+
+
+async def run_load(args) -> dict:
+    import httpx
+
+    endpoints = ["interpret", "summary", "concern"] if args.endpoint == "all" else [args.endpoint]
+    app = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        # 앱 import 전에 OpenAI SDK가 스텁을 보도록 설정 (SDK가 OPENAI_BASE_URL을 읽음)
+        import main
+        app = main.app
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout)
+
+    latencies = {e: [] for e in endpoints}
+    statuses = {e: Counter() for e in endpoints}
+    counter = iter(range(args.requests))
+    lock = asyncio.Lock()
+    monitor = LoopLagMonitor()
+
+    async def worker():
+        while True:
+            async with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            endpoint = endpoints[i % len(endpoints)]
+            path, body = build_request(endpoint, i, args.distinct, args.seed)
+            started = time.perf_counter()
+            try:
+                resp = await client.post(path, json=body)
+                status = str(resp.status_code)
+                if resp.status_code == 200:
+                    payload = resp.json()
+                    if payload.get("success") is False or payload.get("error"):
+                        status = "200-fallback"
+            except Exception as e:
+                status = type(e).__name__
+            latencies[endpoint].append(time.perf_counter() - started)
+            statuses[endpoint][status] += 1
+
+    stub_before = await _stub_stats(args.stub_port) if not args.no_stub else {}
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+    stub_after = await _stub_stats(args.stub_port) if not args.no_stub else {}
+
+    report = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "elapsed_sec": round(elapsed, 2),
+        "throughput_rps": round(args.requests / elapsed, 2) if elapsed else 0.0,
+        "endpoints": {},
+        "event_loop": monitor.report(),
+    }
+    for e in endpoints:
+        ordered = sorted(latencies[e])
+        report["endpoints"][e] = {
+            "count": len(ordered),
+            "status": dict(statuses[e]),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 1),
+        }
+    if stub_after:
+        report["upstream_calls"] = stub_after.get("requests", 0) - stub_before.get("requests", 0)
+        report["upstream_max_in_flight"] = stub_after.get("max_in_flight")
+    return report
+
+
+async def run_tone_bench(args) -> dict:
+    """톤 모드별로 같은 사주 집합을 '첫 조회 + 톤 2번 전환' 순서로 요청"""
+    import httpx
+    import main
+    from logic import gpt_generator
+    from logic.llm_cache import section_cache
+
+    app = main.app
+    await app.router.startup()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                               timeout=args.timeout)
+    results = {}
+    try:
+        for mode in ("single", "all"):
+            gpt_generator.TONE_MODE = mode
+            section_cache.clear()
+            first, switches = [], []
+            counter = iter(range(args.requests))
+            lock = asyncio.Lock()
+
+            async def worker():
+                while True:
+                    async with lock:
+                        i = next(counter, None)
+                    if i is None:
+                        return
+                    path, body = build_request("interpret", i, 0, args.seed)
+                    for n, tone in enumerate(TONES):
+                        started = time.perf_counter()
+                        await client.post(path, json={**body, "tone": tone})
+                        (first if n == 0 else switches).append(time.perf_counter() - started)
+
+            before = await _stub_stats(args.stub_port)
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            after = await _stub_stats(args.stub_port)
+            first.sort()
+            switches.sort()
+            results[mode] = {
+                "charts": args.requests,
+                "elapsed_sec": round(elapsed, 2),
+                "upstream_calls": after.get("requests", 0) - before.get("requests", 0),
+                "prompt_tokens": after.get("prompt_tokens", 0) - before.get("prompt_tokens", 0),
+                "completion_tokens": after.get("completion_tokens", 0) - before.get("completion_tokens", 0),
+                "first_view_p50_ms": round(percentile(first, 50) * 1000, 1),
+                "first_view_p95_ms": round(percentile(first, 95) * 1000, 1),
+                "tone_switch_p50_ms": round(percentile(switches, 50) * 1000, 1),
+                "tone_switch_p95_ms": round(percentile(switches, 95) * 1000, 1),
+            }
+    finally:
+        await client.aclose()
+        await app.router.shutdown()
+    return {"tone_bench": results}
+
+
+def print_tone_bench(report: dict) -> None:
+    print("\n🎭 톤 생성 방식 비교 (사주별 첫 조회 후 톤 2번 전환)")
+    for mode, r in report["tone_bench"].items():
+        print(f"  [{mode:6s}] 사주 {r['charts']}개 / {r['elapsed_sec']}s  OpenAI 호출 {r['upstream_calls']}건  "
+              f"토큰 prompt {r['prompt_tokens']} / completion {r['completion_tokens']}")
+        print(f"           첫 조회 p50={r['first_view_p50_ms']}ms p95={r['first_view_p95_ms']}ms  "
+              f"톤 전환 p50={r['tone_switch_p50_ms']}ms p95={r['tone_switch_p95_ms']}ms")
+
+
+def print_report(report: dict) -> None:
+    print(f"\n📈 부하 테스트 결과: {report['requests']}건 / 동시 {report['concurrency']} / {report['elapsed_sec']}s "
+          f"→ {report['throughput_rps']} req/s")
+    for name, r in report["endpoints"].items():
+        print(f"  [{name}] n={r['count']} p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms "
+              f"max={r['max_ms']}ms status={r['status']}")
+    if "upstream_calls" in report:
+        print(f"  OpenAI 스텁 호출: {report['upstream_calls']}건 (최대 동시 {report['upstream_max_in_flight']})")
+    lag = report["event_loop"]
+    print(f"  이벤트 루프: stall {lag['stalls']}회 (≥{lag['stall_threshold_ms']:.0f}ms), "
+          f"max {lag['max_lag_ms']}ms, p99 {lag['p99_lag_ms']}ms, 합계 {lag['stalled_ms_total']}ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="GPT 경로 부하 테스트")
+    parser.add_argument("--endpoint", choices=["interpret", "summary", "concern", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--distinct", type=int, default=0, help="서로 다른 입력 수 (0=전부 다름)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--url", help="인프로세스 대신 호출할 백엔드 주소 (예: http://127.0.0.1:8000)")
+    parser.add_argument("--no-stub", action="store_true", help="스텁을 띄우지 않음 (OPENAI_BASE_URL 직접 지정 시)")
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--tokens-per-sec", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-status", type=int)
+    parser.add_argument("--hang-rate", type=float)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--tone-bench", action="store_true",
+                        help="TONE_MODE=single/all 비교 (--requests=사주 수, 인프로세스 + 스텁 필요)")
+    args = parser.parse_args()
+    if args.tone_bench and (args.url or args.no_stub):
+        parser.error("--tone-bench 는 인프로세스 + 내장 스텁에서만 실행됩니다")
+
+    if not args.no_stub:
+        start_stub_server(
+            args.stub_port,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.latency_jitter_ms,
+            latency_dist=args.latency_dist,
+            tokens_per_sec=args.tokens_per_sec,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            hang_rate=args.hang_rate,
+            seed=args.seed,
+        )
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+
+    report = asyncio.run(run_tone_bench(args) if args.tone_bench else run_load(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.tone_bench:
+        print_tone_bench(report)
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,190 @@
+"""
+로그인 지연 측정 하네스 — 로컬 외부 API 스텁(provider_stub_server.py)에 연결한 앱의 OAuth 콜백을 동시 호출
+실행 예:
+  cd backend && python loadtest_login.py --provider all --concurrency 10 --requests 200
+  cd backend && python loadtest_login.py --provider kakao --connect-penalty-ms 150 --fresh-connections
+
+- 스텁 서버를 같은 프로세스의 스레드로 띄우고, 앱은 httpx ASGITransport로 인프로세스 호출
+- 콜백 한 번 = 토큰 교환 + 사용자 조회 (스텁) + users 저장 (임시 DB)
+- --fresh-connections: 로그인마다 공용 클라이언트를 닫아 연결 재사용 없이 측정 (요청마다 새 연결이던 예전 방식 비교용)
+- 결과: 제공자별 p50/p95/p99 지연, 상태, 스텁 호출 수와 새 연결 수, 이벤트 루프 stall
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from loadtest_gpt import LoopLagMonitor, percentile  # noqa: E402
+
+STATE = "loadtest-state"
+CALLBACKS = {
+    "kakao": ("/auth/kakao/callback", "kakao_oauth_state"),
+    "google": ("/auth/google/callback", "google_oauth_state"),
+}
+
+
+def start_stub_server(port: int, **config) -> None:
+    """스텁 서버를 데몬 스레드에서 실행하고 기동될 때까지 대기"""
+    import threading
+    import uvicorn
+    import provider_stub_server
+
+    provider_stub_server.configure(**config)
+    server = uvicorn.Server(uvicorn.Config(provider_stub_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("스텁 서버 기동 실패")
+        time.sleep(0.05)
+    print(f"🧪 외부 API 스텁: http://127.0.0.1:{port}  설정={provider_stub_server.STUB_CONFIG}")
+
+
+async def _stub_stats(port: int) -> dict:
+    import httpx
+    async with httpx.AsyncClient(timeout=5) as c:
+        return (await c.get(f"http://127.0.0.1:{port}/stub/stats")).json()
+
+
+async def run_login_load(args) -> dict:
+    import httpx
+    import main  # import 때 APP_DB_PATH(임시 DB)에 마이그레이션 적용
+    from logic import http_clients
+
+    providers = list(CALLBACKS) if args.provider == "all" else [args.provider]
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="https://loadtest",
+                               timeout=args.timeout)
+    latencies = {p: [] for p in providers}
+    statuses = {p: Counter() for p in providers}
+    counter = iter(range(args.requests))
+    lock = asyncio.Lock()
+    monitor = LoopLagMonitor()
+
+    async def worker():
+        while True:
+            async with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            provider = providers[i % len(providers)]
+            path, state_cookie = CALLBACKS[provider]
+            # --distinct 개의 사용자만 반복하면 기존 사용자 로그인(UPDATE) 경로
+            code = f"u{i % args.distinct if args.distinct else i}"
+            if args.fresh_connections:
+                await http_clients.aclose_all()
+            started = time.perf_counter()
+            try:
+                resp = await client.get(path, params={"code": code, "state": STATE},
+                                        cookies={state_cookie: STATE})
+                location = resp.headers.get("location", "")
+                status = "ok" if resp.status_code == 302 and "/login/success" in location else \
+                    f"{resp.status_code}:{location.rsplit('error=', 1)[-1]}"
+            except Exception as e:
+                status = type(e).__name__
+            latencies[provider].append(time.perf_counter() - started)
+            statuses[provider][status] += 1
+
+    stub_before = await _stub_stats(args.stub_port)
+    monitor.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+        await client.aclose()
+        await http_clients.aclose_all()
+    stub_after = await _stub_stats(args.stub_port)
+
+    report = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "fresh_connections": args.fresh_connections,
+        "http2": http_clients.HTTP2_ENABLED,
+        "elapsed_sec": round(elapsed, 2),
+        "throughput_rps": round(args.requests / elapsed, 2) if elapsed else 0.0,
+        "providers": {},
+        "upstream_calls": stub_after["requests"] - stub_before["requests"],
+        "upstream_connections": stub_after["connections"] - stub_before["connections"],
+        "event_loop": monitor.report(),
+    }
+    for p in providers:
+        ordered = sorted(latencies[p])
+        report["providers"][p] = {
+            "count": len(ordered),
+            "status": dict(statuses[p]),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 1),
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    mode = "로그인마다 새 연결" if report["fresh_connections"] else "공용 연결 재사용"
+    print(f"\n🔐 로그인 부하 테스트: {report['requests']}건 / 동시 {report['concurrency']} / {mode} "
+          f"(HTTP/2={'on' if report['http2'] else 'off'}) / {report['elapsed_sec']}s → {report['throughput_rps']} req/s")
+    for name, r in report["providers"].items():
+        print(f"  [{name}] n={r['count']} p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms "
+              f"max={r['max_ms']}ms status={r['status']}")
+    print(f"  스텁 호출: {report['upstream_calls']}건, 새 연결: {report['upstream_connections']}개")
+    lag = report["event_loop"]
+    print(f"  이벤트 루프: stall {lag['stalls']}회 (≥{lag['stall_threshold_ms']:.0f}ms), "
+          f"max {lag['max_lag_ms']}ms, p99 {lag['p99_lag_ms']}ms, 합계 {lag['stalled_ms_total']}ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="OAuth 로그인 콜백 지연 측정")
+    parser.add_argument("--provider", choices=["kakao", "google", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--distinct", type=int, default=0, help="서로 다른 사용자 수 (0=전부 새 사용자)")
+    parser.add_argument("--fresh-connections", action="store_true", help="로그인마다 연결을 새로 열어 비교")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--stub-port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument("--connect-penalty-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    start_stub_server(
+        args.stub_port,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        connect_penalty_ms=args.connect_penalty_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    # 앱(auth 모듈, logic.http_clients) import 전에 스텁 주소와 로그인 설정을 env 로
+    import provider_stub_server
+    os.environ.update(provider_stub_server.base_urls("127.0.0.1", args.stub_port))
+    # 부하 테스트 사용자는 임시 DB에만
+    os.environ["APP_DB_PATH"] = str(Path(tempfile.mkdtemp(prefix="loadtest_login_")) / "app.db")
+    os.environ.setdefault("KAKAO_REST_KEY", "stub-kakao-key")
+    os.environ.setdefault("KAKAO_REDIRECT_URI", "http://127.0.0.1:8000/auth/kakao/callback")
+    os.environ.setdefault("GOOGLE_CLIENT_ID", "stub-google-client")
+    os.environ.setdefault("GOOGLE_CLIENT_SECRET", "stub-google-secret")
+    os.environ.setdefault("GOOGLE_REDIRECT_URI", "http://127.0.0.1:8000/auth/google/callback")
+
+    report = asyncio.run(run_login_load(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main_cli()
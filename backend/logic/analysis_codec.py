@@ -0,0 +1,142 @@
+# backend/logic/analysis_codec.py
+"""
+analyze_full_saju 결과 → 프롬프트용 압축 텍스트 (모든 GPT 프롬프트 공용).
+
+- dict repr / 장황한 description 대신 사실 1개당 1줄, 짧은 키
+- 같은 사실은 한 번만 (patterns 는 harmony_clash·sinsal 에서 파생된 문자열이라 넣지 않음,
+  삼합의 일부(반합)는 지지 반합 줄에 국 이름으로 합침)
+- 입력이 같으면 출력 문자열도 항상 같음 (프롬프트 캐시 키로도 안전)
+
+    팔자: 甲子 丙寅 甲午 己巳 (년월일시) / 일간 甲
+    신강약: 중화 41/100 (득령O 득지X 득세X)
+    오행: 목3 화3 토1 금0 수1
+    십성: 비견2 정인1 식신2 상관1 정재1
+    관계:
+    천간합 년-시 甲己→토
+    반합 월-일 寅午 (寅午戌 화국)
+    지지충 년-일 子午
+    신살: 역마 월지寅, 문창귀인 시지巳
+"""
+from typing import List, Sequence
+
+ELEMENT_ABBR = (("wood", "목"), ("fire", "화"), ("earth", "토"), ("metal", "금"), ("water", "수"))
+
+# harmony_clash 키 → 줄 머리말 (출력 순서)
+RELATION_KINDS = (
+    ("cheongan_hap", "천간합"),
+    ("cheongan_chung", "천간충"),
+    ("jiji_yukhap", "육합"),
+    ("jiji_samhap", "삼합"),
+    ("jiji_banhap", "반합"),
+    ("jiji_chung", "지지충"),
+)
+
+SINSAL_KINDS = (
+    ("cheonul_gwiin", "천을귀인"),
+    ("dohwa", "도화"),
+    ("yeokma", "역마"),
+    ("hwagae", "화개"),
+    ("wolgong", "월공"),
+    ("munchang_gwiin", "문창귀인"),
+)
+
+ALL_PARTS = ("chart", "strength", "elements", "ten_gods", "relations", "sinsal")
+
+
+def _ox(value) -> str:
+    return "O" if value else "X"
+
+
+def encode_chart(analysis: dict) -> str:
+    bi = analysis.get("basic_info") or {}
+    pillars = " ".join(bi.get(k, "?") for k in ("year", "month", "day", "hour"))
+    return f"팔자: {pillars} (년월일시) / 일간 {bi.get('day_stem', '?')}"
+
+
+def encode_strength(analysis: dict) -> str:
+    summary = analysis.get("summary") or {}
+    line = f"신강약: {summary.get('strength', '?')} {summary.get('strength_score', '?')}/100"
+    if "deukryeong" in summary:
+        line += (f" (득령{_ox(summary.get('deukryeong'))} 득지{_ox(summary.get('deukji'))} "
+                 f"득세{_ox(summary.get('deukse'))})")
+    return line
+
+
+def encode_elements(counts: dict) -> str:
+    return "오행: " + " ".join(f"{abbr}{(counts or {}).get(key, 0)}" for key, abbr in ELEMENT_ABBR)
+
+
+def encode_ten_gods(counts: dict) -> str:
+    parts = [f"{god}{n}" for god, n in (counts or {}).items() if isinstance(n, (int, float)) and n > 0]
+    return "십성: " + (" ".join(parts) if parts else "없음")
+
+
+def encode_relations(analysis: dict) -> List[str]:
+    """합충 1건당 1줄. harmony_clash 가 없으면 patterns 의 합/충 문자열로 대체"""
+    hc = analysis.get("harmony_clash")
+    if not hc:
+        return [str(p) for p in analysis.get("patterns", []) if "합" in str(p) or "충" in str(p)]
+
+    # 일부만 있는 삼합은 같은 글자 쌍의 반합 줄에 국 이름으로 표시 (중복 제거)
+    partial_samhap = {}
+    for item in hc.get("jiji_samhap", []):
+        if not item.get("complete"):
+            chars = "".join(sorted(item.get("chars", "").replace(",", "").split()))
+            partial_samhap[chars] = item.get("name", "")
+    banhap_pairs = {"".join(sorted(item.get("chars", ""))) for item in hc.get("jiji_banhap", [])}
+
+    lines = []
+    for key, label in RELATION_KINDS:
+        for item in hc.get(key, []):
+            if key == "jiji_samhap":
+                chars = "".join(sorted(item.get("chars", "").replace(",", "").split()))
+                if item.get("complete"):
+                    lines.append(f"삼합 {item.get('name', '')} 완전")
+                elif chars not in banhap_pairs:
+                    lines.append(f"삼합 {item.get('name', '')} 일부({item.get('chars', '').replace(', ', '')})")
+                continue
+            line = f"{label} {item.get('position', '')} {item.get('chars', '')}"
+            if item.get("element"):
+                line += f"→{item['element']}"
+            if key == "jiji_banhap":
+                name = partial_samhap.get("".join(sorted(item.get("chars", ""))))
+                if name:
+                    line += f" ({name})"
+            lines.append(line)
+    return lines
+
+
+def encode_sinsal(analysis: dict) -> List[str]:
+    """신살 1건당 '이름 위치글자'. sinsal 이 없으면 patterns 의 합/충 외 문자열로 대체"""
+    ss = analysis.get("sinsal")
+    if not ss:
+        return [str(p) for p in analysis.get("patterns", []) if "합" not in str(p) and "충" not in str(p)]
+    return [
+        f"{label} {item.get('position', '')}{item.get('char', '')}"
+        for key, label in SINSAL_KINDS
+        for item in ss.get(key, [])
+    ]
+
+
+def encode_analysis(analysis: dict, parts: Sequence[str] = ALL_PARTS) -> str:
+    """parts 순서대로 압축 텍스트 조립 (없는 관계/신살은 '없음' 한 줄)"""
+    summary = analysis.get("summary") or {}
+    lines = []
+    for part in parts:
+        if part == "chart":
+            lines.append(encode_chart(analysis))
+        elif part == "strength":
+            lines.append(encode_strength(analysis))
+        elif part == "elements":
+            lines.append(encode_elements(summary.get("element_count")))
+        elif part == "ten_gods":
+            lines.append(encode_ten_gods(summary.get("ten_gods_count")))
+        elif part == "relations":
+            relations = encode_relations(analysis)
+            lines.append("관계:\n" + "\n".join(relations) if relations else "관계: 없음")
+        elif part == "sinsal":
+            sinsal = encode_sinsal(analysis)
+            lines.append("신살: " + (", ".join(sinsal) if sinsal else "없음"))
+        else:
+            raise ValueError(f"알 수 없는 항목: {part}")
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+# backend/logic/chart_compute.py
+"""
+저장된 사주 입력(birthdate/birth_time/calendar_type 문자열) → 명식 계산 결과를 saju 테이블에 함께 저장하기 위한 모듈.
+
+저장 시 한 번 계산해 두면 목록/상세 조회는 엔진(음력 변환·만세력·analyze_full_saju)을 다시 돌리지 않습니다.
+- solar_datetime: 실제 계산에 쓴 양력 일시 (시간 모름은 12:00 — saju-preview 페이지와 같은 규칙)
+- year_idx ~ hour_idx: 60갑자 인덱스 (logic.test.GANJI_60)
+- chart_summary: 신강약·오행 분포 압축 JSON  {"s": "중화", "sc": 41, "el": [목, 화, 토, 금, 수]}
+- chart_version: 계산 방식이 바뀌면 CHART_VERSION 을 올리고 backfill_charts() 로 다시 계산
+"""
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from logic import test
+
+CHART_VERSION = 1
+CHART_COLUMNS = ("solar_datetime", "year_idx", "month_idx", "day_idx", "hour_idx", "chart_summary", "chart_version")
+ELEMENT_KEYS = ("wood", "fire", "earth", "metal", "water")
+PILLAR_KEYS = ("year_pillar", "month_pillar", "day_pillar", "hour_pillar")
+
+SOLAR_TERMS_DB_PATH = Path(__file__).resolve().parent / "solar_terms_db.json"
+BACKFILL_BATCH_SIZE = 500
+
+_solar_terms = None
+_solar_terms_lock = threading.Lock()
+
+
+def solar_terms_db():
+    """절기 DB (main 과 같은 파일, 처음 쓸 때 한 번 로드)"""
+    global _solar_terms
+    if _solar_terms is None:
+        with _solar_terms_lock:
+            if _solar_terms is None:
+                _solar_terms = test.load_db(str(SOLAR_TERMS_DB_PATH))
+    return _solar_terms
+
+
+def calculate_pillars(solar_dt: datetime, db=None) -> Tuple[str, str, str, str]:
+    """(년주, 월주, 일주, 시주)"""
+    db = db if db is not None else solar_terms_db()
+    yj = test.calculate_year_pillar(solar_dt, db)
+    mj = test.calculate_month_pillar(solar_dt, yj, db)
+    dj = test.calculate_day_pillar(solar_dt)
+    sj = test.calculate_hour_pillar(solar_dt, dj)
+    return yj, mj, dj, sj
+
+
+def saved_input_to_solar(birthdate: str, birth_time: Optional[str], calendar_type: str) -> datetime:
+    """저장된 문자열 입력 → 양력 datetime (음력이면 변환, 시간 없으면 12:00)"""
+    y, m, d = (int(x) for x in birthdate.strip().split("-"))
+    hour, minute = 12, 0
+    if birth_time and ":" in birth_time:
+        hour, minute = (int(x) for x in birth_time.strip().split(":")[:2])
+    if calendar_type == "음력":
+        from logic import lunar_converter
+        y, m, d = lunar_converter.convert_lunar_to_solar(y, m, d, False)
+    return datetime(y, m, d, hour, minute)
+
+
+def compute_chart(birthdate: str, birth_time: Optional[str], calendar_type: str, db=None) -> dict:
+    """저장용 명식 (chart_from_columns 로 다시 읽을 수 있는 형태)"""
+    from logic.saju_engine.core.analyzer import analyze_full_saju
+
+    solar_dt = saved_input_to_solar(birthdate, birth_time, calendar_type)
+    pillars = calculate_pillars(solar_dt, db)
+    analysis = analyze_full_saju(pillars[2][0], dict(zip(("year", "month", "day", "hour"), pillars)))
+    summary = analysis.get("summary") or {}
+    counts = summary.get("element_count") or {}
+    return {
+        "solar_datetime": solar_dt.strftime("%Y-%m-%d %H:%M"),
+        "pillar_idx": [test.GANJI_60.index(p) for p in pillars],
+        "summary": {
+            "s": summary.get("strength"),
+            "sc": summary.get("strength_score"),
+            "el": [counts.get(k, 0) for k in ELEMENT_KEYS],
+        },
+        "chart_version": CHART_VERSION,
+    }
+
+
+def chart_to_columns(chart: Optional[dict]) -> tuple:
+    """compute_chart 결과 → CHART_COLUMNS 순서의 값 (None 이면 모두 NULL)"""
+    if not chart:
+        return (None,) * len(CHART_COLUMNS)
+    return (
+        chart["solar_datetime"],
+        *chart["pillar_idx"],
+        json.dumps(chart["summary"], ensure_ascii=False, separators=(",", ":")),
+        chart["chart_version"],
+    )
+
+
+def chart_from_columns(values: tuple) -> Optional[dict]:
+    """
+    CHART_COLUMNS 값 → 화면에 바로 쓰는 명식. 계산 전이거나 버전이 다르면 None
+
+        {"solar_datetime", "year_pillar"~"hour_pillar", "day_stem", "strength", "strength_score", "element_counts"}
+    """
+    solar_datetime, *idx, summary_json, version = values
+    if version != CHART_VERSION or any(i is None for i in idx):
+        return None
+    pillars = [test.GANJI_60[i] for i in idx]
+    summary = json.loads(summary_json or "{}")
+    return {
+        "solar_datetime": solar_datetime,
+        **dict(zip(PILLAR_KEYS, pillars)),
+        "day_stem": pillars[2][0],
+        "strength": summary.get("s"),
+        "strength_score": summary.get("sc"),
+        "element_counts": dict(zip(ELEMENT_KEYS, summary.get("el") or [0] * 5)),
+    }
+
+
+def render_chart(chart: dict) -> Optional[dict]:
+    """compute_chart 결과 → chart_from_columns 와 같은 화면용 형태 (저장 직후 응답용)"""
+    return chart_from_columns(chart_to_columns(chart))
+
+
+def backfill_charts(batch_size: int = BACKFILL_BATCH_SIZE, max_rows: Optional[int] = None, db=None) -> dict:
+    """
+    chart_version 이 없거나 옛 버전인 행을 id 순으로 batch_size 개씩 읽어 계산 후 저장 (배치마다 커밋).
+    계산에 실패한 행은 건너뛰고(다음 실행 때 다시 시도) 개수만 집계합니다.
+    """
+    from logic.saju_db import iter_rows_needing_chart, update_saju_charts
+
+    stats = {"updated": 0, "failed": 0, "batches": 0}
+    for batch in iter_rows_needing_chart(CHART_VERSION, batch_size):
+        updates = []
+        for saju_id, birthdate, birth_time, calendar_type in batch:
+            try:
+                updates.append((saju_id, compute_chart(birthdate, birth_time, calendar_type, db)))
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"⚠️ 명식 계산 실패 saju_id={saju_id}: {e}")
+        update_saju_charts(updates)
+        stats["updated"] += len(updates)
+        stats["batches"] += 1
+        print(f"🧮 backfill 배치 {stats['batches']}: {len(updates)}건 (누적 {stats['updated']})")
+        if max_rows is not None and stats["updated"] + stats["failed"] >= max_rows:
+            break
+    return stats
@@ -0,0 +1,191 @@
+# backend/logic/circuit_breaker.py
+"""
+LLM 호출용 서킷 브레이커 (closed → open → half_open → closed).
+
+- closed: 최근 WINDOW_SEC 동안의 호출 결과(실패/지연)를 집계, 비율이 임계치를 넘으면 open
+- open: OPEN_SEC 동안 호출 없이 즉시 CircuitOpenError → 호출부의 템플릿 폴백이 바로 실행됨
+- half_open: 프로브 호출 HALF_OPEN_PROBES건만 통과, 모두 성공하면 closed / 하나라도 실패하면 다시 open
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SEC = float(os.getenv("LLM_BREAKER_WINDOW_SEC", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+# 이 시간(초)보다 오래 걸린 성공 호출은 '느린 호출'로 집계
+BREAKER_SLOW_CALL_SEC = float(os.getenv("LLM_BREAKER_SLOW_CALL_SEC", "20"))
+BREAKER_SLOW_RATE = float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.8"))
+BREAKER_OPEN_SEC = float(os.getenv("LLM_BREAKER_OPEN_SEC", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", "1"))
+
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 있어 호출하지 않음 (retry_after: 다음 프로브까지 남은 초)"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 서킷 열림 — {retry_after:.0f}s 후 재시도")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+        breaker.before_call()          # open이면 CircuitOpenError
+        started = time.monotonic()
+        try:
+            ... 호출 ...
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.monotonic() - started)
+    """
+
+    def __init__(self, name: str, window_sec: float = BREAKER_WINDOW_SEC, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, slow_call_sec: float = BREAKER_SLOW_CALL_SEC,
+                 slow_rate: float = BREAKER_SLOW_RATE, open_sec: float = BREAKER_OPEN_SEC,
+                 half_open_probes: int = BREAKER_HALF_OPEN_PROBES, clock=time.monotonic):
+        self.name = name
+        self.window_sec = window_sec
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_sec = slow_call_sec
+        self.slow_rate = slow_rate
+        self.open_sec = open_sec
+        self.half_open_probes = max(1, half_open_probes)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._events = deque()  # (시각, 실패 여부, 느림 여부)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._opened_count = 0
+        self._last_error: Optional[str] = None
+
+    # ---------- 상태 전이 ----------
+
+    def _trim(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > self.window_sec:
+            self._events.popleft()
+
+    def _open(self, now: float, reason: str) -> None:
+        if self._state != STATE_OPEN:
+            self._opened_count += 1
+            print(f"🔌 [{self.name}] 서킷 열림: {reason} — {self.open_sec:.0f}s 동안 폴백 사용")
+        self._state = STATE_OPEN
+        self._opened_at = now
+        self._events.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _close(self) -> None:
+        print(f"✅ [{self.name}] 서킷 복구 (closed)")
+        self._state = STATE_CLOSED
+        self._events.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _evaluate(self, now: float) -> None:
+        self._trim(now)
+        total = len(self._events)
+        if total < self.min_calls:
+            return
+        failures = sum(1 for _, failed, _ in self._events if failed)
+        slow = sum(1 for _, failed, is_slow in self._events if not failed and is_slow)
+        if failures / total >= self.failure_rate:
+            self._open(now, f"실패율 {failures}/{total}")
+        elif slow / total >= self.slow_rate:
+            self._open(now, f"지연 호출 {slow}/{total} (>{self.slow_call_sec:.0f}s)")
+
+    # ---------- 호출부 API ----------
+
+    def before_call(self) -> None:
+        with self._lock:
+            now = self.clock()
+            if self._state == STATE_OPEN:
+                remaining = self.open_sec - (now - self._opened_at)
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self._state = STATE_HALF_OPEN
+                self._probes_in_flight = 0
+                self._probe_successes = 0
+                print(f"🔎 [{self.name}] 서킷 half-open — 복구 확인 호출 허용")
+            if self._state == STATE_HALF_OPEN:
+                if self._probes_in_flight + self._probe_successes >= self.half_open_probes:
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probes_in_flight += 1
+
+    def record_success(self, latency_sec: float) -> None:
+        with self._lock:
+            now = self.clock()
+            slow = latency_sec >= self.slow_call_sec
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if slow:
+                    self._open(now, f"프로브 지연 {latency_sec:.1f}s")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._close()
+                return
+            if self._state == STATE_CLOSED:
+                self._events.append((now, False, slow))
+                self._evaluate(now)
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            now = self.clock()
+            self._last_error = repr(error)[:200] if error is not None else None
+            if self._state == STATE_HALF_OPEN:
+                self._open(now, "프로브 실패")
+                return
+            if self._state == STATE_CLOSED:
+                self._events.append((now, True, False))
+                self._evaluate(now)
+
+    def release(self) -> None:
+        """성공/실패로 보기 어려운 종료(요청 오류 등) — half-open 프로브 자리만 반납"""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == STATE_OPEN and self.clock() - self._opened_at >= self.open_sec:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            total = len(self._events)
+            failures = sum(1 for _, failed, _ in self._events if failed)
+            slow = sum(1 for _, failed, is_slow in self._events if not failed and is_slow)
+            state = self._state
+            retry_after = 0.0
+            if state == STATE_OPEN:
+                retry_after = max(0.0, self.open_sec - (now - self._opened_at))
+                if retry_after == 0:
+                    state = STATE_HALF_OPEN
+            return {
+                "state": state,
+                "window_calls": total,
+                "window_failures": failures,
+                "window_slow": slow,
+                "retry_after_sec": round(retry_after, 1),
+                "rejected": self._rejected,
+                "opened_count": self._opened_count,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,112 @@
+# backend/logic/db.py
+"""
+SQLite 공용 연결 계층 (saju_db / user_db / payment_db / contact_db).
+
+네 모듈의 테이블은 모두 한 파일(APP_DB)에 있고 스키마는 logic/migrations.py 가 관리합니다.
+→ 결제 + 씨앗 적립처럼 여러 테이블에 걸친 쓰기도 연결 하나의 트랜잭션으로 처리.
+
+함수 호출마다 sqlite3.connect → close 하던 것을 스레드별로 오래 사는 연결 하나로 바꿉니다.
+- 연결은 (스레드, DB 파일)마다 1개 — sqlite3 연결은 스레드 간 공유하지 않음
+- journal_mode=WAL: 읽기가 쓰기를 막지 않음 / synchronous=NORMAL: WAL에서는 커밋마다 fsync 불필요
+- busy_timeout: 다른 스레드가 쓰는 중이면 바로 'database is locked' 대신 기다림
+- mmap_size: 읽기를 페이지 캐시에서 바로
+- cached_statements: 연결이 살아 있으므로 같은 SQL의 prepare 결과가 재사용됨
+
+    with app_connection() as conn:
+        conn.execute(...)
+        conn.commit()
+
+블록이 예외로 끝나거나 commit 하지 않은 쓰기가 남아 있으면 rollback (다음 사용자가 열린 트랜잭션을 물려받지 않게).
+
+async 라우트는 DB 함수를 직접 부르지 말고 run_db()로 await 합니다 (DB 전용 스레드 풀, 동시 실행 DB_EXECUTOR_WORKERS개).
+동기(def) 라우트는 FastAPI 스레드풀에서 돌므로 그대로 호출해도 됩니다.
+"""
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Union
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+# 앱 DB 파일 (사용자·사주·결제·문의)
+APP_DB = Path(os.getenv("APP_DB_PATH", str(Path(__file__).resolve().parent / "app.db")))
+# async 라우트용 DB 스레드 수 — 스레드마다 연결이 하나씩이므로 열린 연결 수의 상한이기도 함
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+
+_local = threading.local()
+
+
+def connect(path: Union[str, Path]) -> sqlite3.Connection:
+    """pragma를 적용한 새 연결 (공유하지 않는 단발성 용도 — 보통은 connection() 사용)"""
+    conn = sqlite3.connect(
+        str(path),
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=SQLITE_CACHED_STATEMENTS,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    return conn
+
+
+def _thread_conns() -> Dict[str, sqlite3.Connection]:
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    return conns
+
+
+def get_conn(path: Union[str, Path]) -> sqlite3.Connection:
+    """현재 스레드의 path 연결 (없으면 생성). close() 하지 말 것"""
+    conns = _thread_conns()
+    key = str(path)
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = connect(key)
+    return conn
+
+
+@contextmanager
+def connection(path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    conn = get_conn(path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def app_connection():
+    """앱 DB(APP_DB) 연결 — 호출 시점의 APP_DB 를 사용 (테스트에서 바꿀 수 있게)"""
+    return connection(APP_DB)
+
+
+def close_thread_connections() -> None:
+    """현재 스레드의 연결을 모두 닫음 (테스트/종료용)"""
+    conns = _thread_conns()
+    for conn in conns.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    conns.clear()
+
+
+_db_executor = ThreadPoolExecutor(max_workers=max(1, DB_EXECUTOR_WORKERS), thread_name_prefix="db")
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    동기 DB 함수를 DB 전용 스레드에서 실행하고 결과를 await (이벤트 루프를 막지 않음)
+
+        saju_id = await run_db(save_saju_for_user, user_id=user_id, ...)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
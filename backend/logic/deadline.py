@@ -0,0 +1,108 @@
+# backend/logic/deadline.py
+"""
+요청 단위 마감 시간(deadline).
+엔드포인트가 deadline_scope()로 열면, 그 안의 모든 LLM 호출(llm_client.chat_completion)이
+남은 시간만큼만 쿼터를 기다리고 OpenAI 타임아웃도 남은 시간으로 줄입니다.
+시간이 다 되면 호출하지 않고 DeadlineExceeded → 호출부가 그 섹션만 템플릿 폴백으로 채웁니다.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+DEFAULT_DEADLINE_SEC = float(os.getenv("INTERPRET_DEADLINE_SEC", "20"))
+# 헤더로 받을 수 있는 범위 (너무 짧으면 전부 폴백, 너무 길면 deadline 의미가 없음)
+MIN_DEADLINE_SEC = 2.0
+MAX_DEADLINE_SEC = float(os.getenv("MAX_DEADLINE_SEC", "60"))
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, what: str = ""):
+        super().__init__(f"deadline exceeded{f': {what}' if what else ''}")
+
+
+class Deadline:
+    """남은 시간 계산 + 시간 초과로 폴백된 섹션 기록"""
+
+    def __init__(self, budget_sec: float, clock=time.monotonic):
+        self.budget_sec = budget_sec
+        self._clock = clock
+        self.started = clock()
+        self.expires_at = self.started + budget_sec
+        self._lock = threading.Lock()
+        self._fallback_sections: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def note_fallback(self, section: str) -> None:
+        with self._lock:
+            if section not in self._fallback_sections:
+                self._fallback_sections.append(section)
+
+    @property
+    def fallback_sections(self) -> List[str]:
+        with self._lock:
+            return list(self._fallback_sections)
+
+    def metadata(self) -> dict:
+        sections = self.fallback_sections
+        return {
+            "budget_ms": int(self.budget_sec * 1000),
+            "elapsed_ms": int(self.elapsed() * 1000),
+            "partial": bool(sections),
+            "fallback_sections": sections,
+        }
+
+
+def parse_deadline_header(value: Optional[str], default_sec: float = DEFAULT_DEADLINE_SEC) -> float:
+    """X-Request-Deadline-Ms(남은 밀리초) → 초. 없거나 잘못된 값이면 기본값"""
+    if not value:
+        return default_sec
+    try:
+        sec = float(value) / 1000.0
+    except ValueError:
+        return default_sec
+    return min(MAX_DEADLINE_SEC, max(MIN_DEADLINE_SEC, sec))
+
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline):
+    """
+        with deadline_scope(Deadline(20)) as dl:
+            ... LLM 호출들 ...
+        dl.metadata()
+
+    report_scope 와 마찬가지로 스레드에서 실행되는 동기 함수 안에서 엽니다.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """현재 deadline이 있으면 timeout을 남은 시간 이하로"""
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    return remaining if timeout is None else min(timeout, remaining)
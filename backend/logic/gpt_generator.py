@@ -4,34 +4,157 @@
 GPT 기반 사주 해석 생성기
 """
 
+import contextvars
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Dict, List, Tuple
-from logic.theory_retriever import TheoryRetriever
+from logic.theory_retriever import get_corpus, get_retriever
+from logic.prompt_builder import PROMPT_BUDGETS, PromptBuilder
+from logic.analysis_codec import encode_analysis, encode_relations, encode_sinsal
+from logic.llm_client import (
+    chat_completion, is_rate_limited, rate_limit_backoff,
+    CircuitOpenError, DeadlineExceeded, SchedulerTimeout, PRIORITY_INTERACTIVE,
+)
+from logic.deadline import current_deadline
+from logic.llm_cache import prompt_key, section_cache
+from logic.llm_metrics import record_fallback
 from logic.saju_engine.core.ten_gods import calculate_ten_god
 import openai
 from openai import OpenAI
 
+# main.py 공용 클라이언트와 같은 상한 (SDK 기본값은 600초라 장애 시 요청이 사실상 멈춤)
+LLM_TIMEOUT_SEC = 30.0
+LLM_MAX_RETRIES = 2
+
+# 종합 해석 생성 방식: sections(섹션별 동시 생성 후 순서대로 이어 붙임) | single(호출 1번)
+COMPREHENSIVE_MODE = os.getenv("COMPREHENSIVE_MODE", "sections").strip().lower()
+# 섹션 1개당 시도 횟수 (SDK 자체 재시도와 별개로, 빈 응답/일시 오류 시 그 섹션만 다시 생성)
+SECTION_MAX_ATTEMPTS = int(os.getenv("COMPREHENSIVE_SECTION_ATTEMPTS", "2"))
+# 섹션 생성 스레드 수 (프로세스 전체 공유). 요청 1건은 최대 섹션 수만큼만 사용
+SECTION_WORKERS = int(os.getenv("COMPREHENSIVE_SECTION_WORKERS", "16"))
+
+COMPREHENSIVE_TONE_PROMPTS = {
+    'empathy': "당신은 따뜻하고 공감적인 사주 상담가입니다. 운명론적 결정론보다는 사람의 잠재력과 가능성에 집중하며, 격려와 지지의 메시지를 전달합니다.",
+    'reality': "당신은 냉철하고 객관적인 사주 전문가입니다. 사주 이론을 정확하게 분석하고, 현실적이고 논리적인 해석을 제공합니다.",
+    'fun': "당신은 재미있고 친근한 사주 해석가입니다. 친구같은 느낌으로 반말을 하죠. 밈과 이모지를 활용하여 Z세대 감성으로 쉽고 재미있게 사주를 해석합니다."
+}
+
+# 종합 해석 섹션 (이어 붙이는 순서 = 튜플 순서): (키, 제목, max_tokens)
+COMPREHENSIVE_SECTIONS = (
+    ("elements", "오행 에너지: 나를 움직이는 엔진과 브레이크", 1800),
+    ("strength", "신강약: 타고난 에너지의 총량", 900),
+    ("ten_gods", "십성: 관계와 역할의 패턴", 1000),
+    ("relations", "기운의 결합과 변신: 내 안의 숨겨진 반전 카드", 1400),
+    ("sinsal", "신살: 타고난 특별한 기운", 800),
+)
+
+# 모든 섹션 공통 용어 규칙 (system 고정 prefix)
+COMPREHENSIVE_COMMON_RULES = """⚠️ 용어 사용 공통 규칙 (필수)
+
+오행 개수 0개 → 「결핍」 사용
+오행 개수 1개 → 「부족」, 「약한 편」 등으로 표현 (결핍 ❌)
+오행 개수 2개 → 「적당」 등으로 표현
+오행 개수 3개 이상 → 「과다」 사용
+「과부하」라는 단어는 사용하지 않음
+의미는 서술로만 표현 (예: "너무 날카로워 스스로를 베기도 합니다")
+균형 잡힌 사주에서는 '과다 / 결핍 / 과부하' 단어 모두 사용 금지
+
+이 답변은 종합 리포트의 한 섹션입니다. 제목이나 인사말, 다른 섹션 내용 없이 이 섹션 본문만 작성하세요."""
+
+COMPREHENSIVE_SECTION_GUIDES = {
+    "elements": """[섹션 작성 가이드: 오행 에너지]
+사용자의 성격적 엔진과 브레이크를 현실적인 예시(돈, 사랑, 일)와 함께 입체적으로 서술하세요.
+1. 강한 오행 : "나를 움직이는 자동 반사적 습관" (600자)
+2. 약한 오행 : "무의식적 갈망과 심리적 사각지대" (600자)
+3. 균형 잡힌 사주라면 : "평온함 속에 숨겨진 야성의 부재" (400자)
+분량: 1000~1400자""",
+    "strength": """[섹션 작성 가이드: 신강약]
+신강/신약 유형과 점수를 근거로, 에너지를 밖으로 쓰는 방식과 채우는 방식을 설명하세요.
+득령/득지/득세 여부를 쉬운 말로 풀고, 일/관계에서 나타나는 모습과 균형을 잡는 실천 팁을 주세요.
+분량: 500~700자""",
+    "ten_gods": """[섹션 작성 가이드: 십성]
+많은 십성과 없는 십성을 중심으로 사람을 대하는 방식, 돈과 일을 다루는 방식을 설명하세요.
+십성 이름은 괄호 안 의미와 함께 한 번씩만 쓰고, 나머지는 쉬운 말로 풀어 쓰세요.
+분량: 600~800자""",
+    "relations": """[섹션 작성 가이드: 기운의 결합과 변신]
+두 기운이 만나 전혀 다른 제3의 기운으로 변하는 현상을 분석. 사용자가 이해하기 쉽게 "기운이 합쳐져 변했다"고 표현하세요.
+
+⚠️ 합 / 합화 분석 규칙 (필수)
+아래 3단계를 순서대로 판단하고, 해당되는 케이스만 현실 예시까지 구체적으로 작성하세요.
+A) "합이 있다" (결속/묶임/반전의 씨앗)
+B) "합이 작동한다" (실제로 삶에서 계속 발동되는 상태)
+C) "합화가 된다" (제3의 기운으로 변환)
+충이 있으면 부딪힘이 만드는 변화와 기회도 함께 설명하세요.
+분량: 700~1000자""",
+    "sinsal": """[섹션 작성 가이드: 신살]
+발견된 신살(귀인, 도화, 역마, 화개 등)을 타고난 재능과 매력으로 풀어 설명하세요.
+겁주는 표현 없이, 일/관계에서 살리는 방법을 함께 주세요.
+분량: 400~600자""",
+}
+
+# 톤 생성 방식: single(요청한 톤만) | all(한 번의 JSON 호출로 세 톤을 모두 받아 함께 캐시 → 톤 전환은 캐시에서)
+TONE_MODE = os.getenv("TONE_MODE", "single").strip().lower()
+TONES = ("empathy", "reality", "fun")
+# all 모드 응답 토큰 상한 = 단일 톤 상한 × 이 값
+ALL_TONES_TOKEN_FACTOR = 3
+
+
+def _all_tones_instruction(tone_prompts) -> str:
+    """세 톤 버전을 한 번에 요청하는 고정 블록 (톤과 무관하게 같은 텍스트라 prefix 캐시도 공유)"""
+    lines = [
+        "[톤별 버전]",
+        "같은 내용을 아래 세 가지 말투로 각각 한 편씩 작성하세요. 분량 기준은 버전 하나당입니다.",
+    ]
+    lines += [f"- {tone}: {tone_prompts[tone]}" for tone in TONES]
+    lines.append("")
+    lines.append('반드시 JSON 객체 하나로만 답하세요: {"empathy": "...", "reality": "...", "fun": "..."}')
+    return "\n".join(lines)
+
+
+def _parse_tone_variants(content: str):
+    """all 모드 응답 → {tone: 본문}. 세 톤이 모두 있어야 유효 (아니면 None → 재시도)"""
+    text = (content or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):]
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    variants = {tone: str(data.get(tone) or "").strip() for tone in TONES}
+    return variants if all(variants.values()) else None
+
+
+_section_pool = ThreadPoolExecutor(max_workers=max(1, SECTION_WORKERS), thread_name_prefix="llm-section")
+
 
 class GPTInterpretationGenerator:
     """GPT 기반 해석 생성기"""
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, priority=PRIORITY_INTERACTIVE):
         """
         Args:
             api_key: OpenAI API 키 (없으면 환경변수에서 로드)
+            priority: OpenAI 쿼터 스케줄러 우선순위 (llm_scheduler.PRIORITY_*)
         """
+        self.priority = priority
         if api_key:
-            self.client = OpenAI(api_key=api_key)
+            self.client = OpenAI(api_key=api_key, timeout=LLM_TIMEOUT_SEC, max_retries=LLM_MAX_RETRIES)
         else:
             # 환경변수에서 로드
             api_key_env = os.getenv('OPENAI_API_KEY')
             if api_key_env:
-                self.client = OpenAI(api_key=api_key_env)
+                self.client = OpenAI(api_key=api_key_env, timeout=LLM_TIMEOUT_SEC, max_retries=LLM_MAX_RETRIES)
             else:
                 print("⚠️  OpenAI API 키가 없습니다. 폴백 모드로 작동합니다.")
                 self.client = None
 
-        self.retriever = TheoryRetriever()
+        # 이론 코퍼스는 프로세스 전체에서 1회 로드 후 공유
+        self.retriever = get_retriever()
         self.harmony_theories = self._load_harmony_theories()
 
         # 월지(지지) 성향 및 가치관 키워드 매핑
@@ -88,35 +211,13 @@ class GPTInterpretationGenerator:
         }
 
     def _load_harmony_theories(self):
-        """theories 폴더에서 합화 관련 이론 로드"""
-        from pathlib import Path
-
-        theories_dir = Path(__file__).parent / 'theories'
-
-        theory_files = {
-            '천간합': '사주이론(천간합).txt',
-            '지지합': '사주이론(지지합).txt',
-            '천간합충': '사주이론(천간합,충).txt',
-        }
-
-        harmony_theories = {}
-
-        for key, filename in theory_files.items():
-            file_path = theories_dir / filename
-            try:
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        harmony_theories[key] = content
-                        print(f"✅ {key} 이론 로드: {len(content)}자")
-                else:
-                    print(f"⚠️  {filename} 파일 없음")
-                    harmony_theories[key] = ""
-            except Exception as e:
-                print(f"❌ {key} 이론 로드 오류: {e}")
-                harmony_theories[key] = ""
+        """합화 관련 이론 (천간합/지지합/천간합충) — 공유 코퍼스에서 가져옴"""
+        return get_corpus().harmony
 
-        return harmony_theories
+    def _theory_prefix(self) -> str:
+        """모든 해석 호출이 공유하는 고정 이론 — system 맨 앞에 두어 프롬프트 캐시 prefix로 사용"""
+        block = self.retriever.corpus.prefix_block
+        return f"[공통 사주 이론]\n{block}" if block else ""
 
     def _stem_to_element(self, stem):
         """천간 → 오행"""
@@ -487,6 +588,7 @@ class GPTInterpretationGenerator:
         final_counts = transformed_counts
 
         if not self.client:
+            record_fallback("element", "no_client", model="gpt-4o-mini")
             return self._fallback_element_interpretation(final_counts, tone)
 
         # 톤별 시스템 프롬프트
@@ -511,13 +613,7 @@ class GPTInterpretationGenerator:
 """
 
         # 사용자 프롬프트 구성
-        theory_section = f"\n\n참고 이론:\n{theories}" if theories else ""
-
-        user_prompt = f"""다음 사주의 오행 에너지를 분석해주세요:
-
-{elements_info}{theory_section}
-
-⚡ 합화(合化)가 있는 경우 (최우선 분석!):
+        guide = """⚡ 합화(合化)가 있는 경우 (최우선 분석!):
 1. 합화의 종류 식별 (천간합/지지합/삼합)
 2. 원래 오행 → 변화된 오행 명시
 3. 사주 전체에 미치는 영향:
@@ -537,16 +633,25 @@ class GPTInterpretationGenerator:
 형식: 친근하고 읽기 쉬운 문장, 구체적인 예시 포함
 """
 
+        # 고정 prefix(공통 이론 → 작성 가이드 → 톤) 뒤에 차트별 내용
+        pb = PromptBuilder("element", model="gpt-4o-mini")
+        pb.add_static("theory", self._theory_prefix())
+        pb.add_static("guide", guide)
+        pb.add_static("tone", system_prompt)
+        pb.add("elements", f"다음 사주의 오행 에너지를 분석해주세요:\n{elements_info}")
+        pb.add("theory", f"참고 이론 (이 사주 관련):\n{theories}" if theories else "", shrink=True)
+
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client,
+                call_name="element",
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=pb.messages(),
                 temperature=0.8,
-                max_tokens=3000
+                max_tokens=3000,
+                priority=self.priority,
             )
+            pb.log_usage(response)
 
             content = response.choices[0].message.content
             print(f"✅ GPT 해석 생성 완료: {len(content)}자")
@@ -554,6 +659,7 @@ class GPTInterpretationGenerator:
 
         except Exception as e:
             print(f"❌ GPT API 호출 실패: {e}")
+            record_fallback("element", e, model="gpt-4o-mini")
             return self._fallback_element_interpretation(final_counts, tone)
 
     def _extract_harmony_from_patterns(self, patterns):
@@ -576,9 +682,244 @@ class GPTInterpretationGenerator:
         Returns:
             str: GPT가 생성한 종합 해석 (3000~4000자)
         """
+        if COMPREHENSIVE_MODE == "single":
+            return self._generate_comprehensive_single(analysis, tone, theories)
+        return self._generate_comprehensive_sections(analysis, tone, theories)
+
+    def _generate_comprehensive_single(self, analysis, tone='empathy', theories=''):
+        """종합 해석을 호출 1번(max_tokens 5000)으로 생성 — COMPREHENSIVE_MODE=single"""
         if not self.client:
+            record_fallback("comprehensive", "no_client", model="gpt-4o")
             return self._fallback_comprehensive(analysis, tone)
 
+        # 톤별 시스템 프롬프트
+        system_prompt = COMPREHENSIVE_TONE_PROMPTS.get(tone, COMPREHENSIVE_TONE_PROMPTS['empathy'])
+
+        # 분석 결과 정리 (압축 표기, logic/analysis_codec.py)
+        patterns = analysis.get('patterns', [])
+        analysis_info = encode_analysis(analysis)
+        if self._extract_harmony_from_patterns(patterns):
+            analysis_info += "\n\n⚠️ 합화(→오행 표시)는 사주 해석에서 매우 중요한 요소입니다!"
+
+        guide = """작성 가이드 (용어 사용 규칙 반영본)
+
+이 섹션은 사용자의 성격적 엔진과 브레이크를 분석합니다. AI는 다음 세 가지 관점을 현실적인 예시(돈, 사랑, 일)와 함께 입체적으로 서술해야 합니다.
+
+⚠️ 용어 사용 공통 규칙 (필수)
+
+오행 개수 0개 → 「결핍」 사용
+오행 개수 1개 → 「부족」, 「약한 편」 등으로 표현 (결핍 ❌)
+오행 개수 2개 → 「적당」 등으로 표현
+오행 개수 3개 이상 → 「과다」 사용
+「과부하」라는 단어는 사용하지 않음
+의미는 서술로만 표현 (예: "너무 날카로워 스스로를 베기도 합니다")
+균형 잡힌 사주에서는 '과다 / 결핍 / 과부하' 단어 모두 사용 금지
+
+0. [최우선 분석] 기운의 결합과 변신: "내 안의 숨겨진 반전 카드" (1000자)
+
+두 기운이 만나 전혀 다른 제3의 기운으로 변하는 현상을 분석. 사용자가 이해하기 쉽게 "기운이 합쳐져 변했다"고 표현하세요.
+없으면 그냥 건너뛰어도됨.
+
+⚠️ 합 / 합화 분석 규칙 (필수)
+
+AI는 아래 3단계를 순서대로 판단하고, 해당되는 케이스만 현실 예시까지 구체적으로 작성하세요.
+
+A) "합이 있다" (결속/묶임/반전의 씨앗)
+B) "합이 작동한다" (실제로 삶에서 계속 발동되는 상태)
+C) "합화가 된다" (제3의 기운으로 변환)
+
+1. 강한 오행 : "나를 움직이는 자동 반사적 습관" (800자)
+2. 약한 오행 : "무의식적 갈망과 심리적 사각지대" (800자)
+3. 균형 잡힌 사주 : "평온함 속에 숨겨진 야성의 부재" (400자)
+
+분량: 3000~4000자
+"""
+
+        # 고정 prefix(공통 이론 → 작성 가이드 → 톤) 뒤에 차트별 내용
+        pb = PromptBuilder("comprehensive", model="gpt-4o")
+        pb.add_static("theory", self._theory_prefix())
+        pb.add_static("guide", guide)
+        pb.add_static("tone", system_prompt)
+        pb.add("analysis", f"다음 사주를 종합적으로 분석하여 상세한 해석을 작성해주세요:\n{analysis_info}")
+        pb.add("theory", f"참고 이론 (이 사주 관련):\n{theories}" if theories else "", shrink=True)
+
+        try:
+            response = chat_completion(
+                self.client,
+                call_name="comprehensive",
+                model="gpt-4o",
+                messages=pb.messages(),
+                temperature=0.8,
+                max_tokens=5000,
+                priority=self.priority,
+            )
+            pb.log_usage(response)
+
+            content = response.choices[0].message.content
+            print(f"✅ 종합 GPT 해석 생성 완료: {len(content)}자")
+            return content
+
+        except Exception as e:
+            print(f"❌ GPT API 호출 실패: {e}")
+            record_fallback("comprehensive", e, model="gpt-4o")
+            return self._fallback_comprehensive(analysis, tone)
+
+    def _comprehensive_section_inputs(self, analysis, theories=''):
+        """
+        종합 해석 섹션별 차트 데이터 (섹션 키 → user 프롬프트 본문, 압축 표기).
+        해당 내용이 없는 섹션(합충/신살 없음)은 빼서 호출하지 않음
+        """
+        inputs = {
+            "elements": encode_analysis(analysis, ("chart", "strength", "elements")),
+            "strength": encode_analysis(analysis, ("chart", "strength", "elements")),
+            "ten_gods": encode_analysis(analysis, ("chart", "strength", "ten_gods")),
+        }
+        if encode_relations(analysis):
+            inputs["relations"] = encode_analysis(analysis, ("chart", "elements", "relations"))
+        if encode_sinsal(analysis):
+            inputs["sinsal"] = encode_analysis(analysis, ("chart", "sinsal"))
+        return inputs
+
+    def _add_tone(self, pb, tone_prompts, tone):
+        """TONE_MODE=all 이면 세 톤을 함께 요청하는 블록, 아니면 해당 톤 프롬프트를 고정 섹션으로 추가"""
+        if TONE_MODE == "all":
+            pb.add_static("tones", _all_tones_instruction(tone_prompts))
+        else:
+            pb.add_static("tone", tone_prompts.get(tone, tone_prompts['empathy']))
+
+    def _complete_cached(self, pb, call_name, model, max_tokens, tone, temperature=0.8):
+        """
+        캐시 → GPT 호출 (실패/빈 응답 시 SECTION_MAX_ATTEMPTS까지 재시도, 429 는 deadline 안에서 쉬었다 재시도).
+        TONE_MODE=all 이면 세 톤을 JSON 하나로 받아 함께 캐시하고 요청한 톤을 반환
+
+        Returns:
+            str | None: 본문 (모든 시도 실패 시 None → 호출부가 템플릿 폴백 사용)
+        """
+        all_tones = TONE_MODE == "all"
+        if all_tones:
+            max_tokens *= ALL_TONES_TOKEN_FACTOR
+        messages = pb.messages()
+        tone = tone if tone in TONES else 'empathy'
+
+        cache_key = prompt_key(call_name, model, messages, max_tokens)
+        cached = section_cache.get(cache_key)
+        if cached is not None:
+            content = cached[tone] if all_tones else cached
+            print(f"♻️ [{call_name}] 캐시 사용: {len(content)}자")
+            return content
+
+        extra = {"response_format": {"type": "json_object"}} if all_tones else {}
+        for attempt in range(1, SECTION_MAX_ATTEMPTS + 1):
+            try:
+                response = chat_completion(
+                    self.client,
+                    call_name=call_name,
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    priority=self.priority,
+                    **extra,
+                )
+                pb.log_usage(response)
+                content = (response.choices[0].message.content or "").strip()
+                if all_tones:
+                    variants = _parse_tone_variants(content)
+                    if variants:
+                        section_cache.set(cache_key, variants)
+                        return variants[tone]
+                    print(f"⚠️ [{call_name}] 톤별 JSON 형식 오류 ({attempt}/{SECTION_MAX_ATTEMPTS})")
+                elif content:
+                    section_cache.set(cache_key, content)
+                    return content
+                else:
+                    print(f"⚠️ [{call_name}] 빈 응답 ({attempt}/{SECTION_MAX_ATTEMPTS})")
+            except (CircuitOpenError, SchedulerTimeout, DeadlineExceeded) as e:
+                # 다시 시도해도 같은 이유로 실패하므로 바로 폴백
+                print(f"❌ [{call_name}] GPT 호출 불가: {e}")
+                record_fallback(call_name, e, model=model)
+                return None
+            except Exception as e:
+                print(f"❌ [{call_name}] GPT API 호출 실패 ({attempt}/{SECTION_MAX_ATTEMPTS}): {e}")
+                deadline = current_deadline()
+                if attempt == SECTION_MAX_ATTEMPTS or (deadline is not None and deadline.expired):
+                    record_fallback(call_name, e, model=model)
+                    return None
+                if is_rate_limited(e):
+                    delay = rate_limit_backoff(e, attempt)
+                    if delay is None:
+                        record_fallback(call_name, e, model=model)
+                        return None
+                    print(f"⏳ [{call_name}] 429 — {delay:.1f}s 후 재시도")
+                    time.sleep(delay)
+        record_fallback(call_name, "invalid_response", model=model)
+        return None
+
+    def _generate_comprehensive_section(self, key, title, max_tokens, chart_text, tone, theories):
+        """종합 해석 섹션 1개 생성. Returns: 본문 | None (실패 → 섹션 폴백)"""
+        call_name = f"comprehensive.{key}"
+        # 고정 prefix(공통 이론 → 공통 규칙 → 톤 → 섹션 가이드) 뒤에 섹션별 차트 데이터
+        pb = PromptBuilder(call_name, model="gpt-4o", budget_tokens=PROMPT_BUDGETS["comprehensive_section"])
+        pb.add_static("theory", self._theory_prefix())
+        pb.add_static("rules", COMPREHENSIVE_COMMON_RULES)
+        self._add_tone(pb, COMPREHENSIVE_TONE_PROMPTS, tone)
+        pb.add_static("guide", COMPREHENSIVE_SECTION_GUIDES[key])
+        pb.add("analysis", f"다음 사주의 '{title}' 섹션을 작성해주세요:\n{chart_text}")
+        # 패턴별로 검색된 이론은 합충/신살 섹션에만 (나머지는 공통 이론 prefix로 충분)
+        if key in ("relations", "sinsal"):
+            pb.add("theory", f"참고 이론 (이 사주 관련):\n{theories}" if theories else "", shrink=True)
+        return self._complete_cached(pb, call_name, "gpt-4o", max_tokens, tone)
+
+    def _generate_comprehensive_sections(self, analysis, tone='empathy', theories=''):
+        """
+        종합 해석을 섹션별 작은 호출로 나눠 동시에 생성하고 COMPREHENSIVE_SECTIONS 순서로 이어 붙임.
+        전체 지연 ≈ 가장 긴 섹션 1개. 실패한 섹션만 템플릿으로 대체.
+        요청 deadline(deadline_scope)이 있으면 그때까지 끝난 섹션만 쓰고 나머지는 템플릿으로 채움
+        """
+        if not self.client:
+            record_fallback("comprehensive", "no_client", model="gpt-4o")
+            return self._fallback_comprehensive(analysis, tone)
+
+        inputs = self._comprehensive_section_inputs(analysis, theories)
+        sections = [spec for spec in COMPREHENSIVE_SECTIONS if spec[0] in inputs]
+
+        # 리포트 스코프(contextvar)가 섹션 스레드에도 보이도록 컨텍스트를 복사해서 실행
+        futures = [
+            _section_pool.submit(
+                contextvars.copy_context().run,
+                self._generate_comprehensive_section, key, title, max_tokens, inputs[key], tone, theories,
+            )
+            for key, title, max_tokens in sections
+        ]
+
+        deadline = current_deadline()
+        parts = []
+        failed = []
+        for (key, title, _), future in zip(sections, futures):
+            try:
+                content = future.result(timeout=deadline.remaining() if deadline is not None else None)
+            except FutureTimeout:
+                # 스레드는 계속 돌지만(OpenAI 타임아웃도 deadline으로 줄어 있음) 결과는 기다리지 않음
+                print(f"⏰ [comprehensive.{key}] deadline 초과, 템플릿으로 대체")
+                deadline.note_fallback(f"comprehensive.{key}")
+                record_fallback(f"comprehensive.{key}", "deadline", model="gpt-4o")
+                content = None
+            except Exception as e:
+                print(f"❌ [comprehensive.{key}] 섹션 생성 오류: {e}")
+                record_fallback(f"comprehensive.{key}", e, model="gpt-4o")
+                content = None
+            if content is None:
+                failed.append(key)
+                content = self._fallback_comprehensive_section(key, analysis)
+            parts.append(f"## {title}\n\n{content}")
+
+        if len(failed) == len(sections):
+            return self._fallback_comprehensive(analysis, tone)
+
+        result = "\n\n".join(parts)
+        print(f"✅ 종합 GPT 해석 생성 완료: {len(result)}자 (섹션 {len(sections)}개, 폴백 {failed or '없음'})")
+        return result
+
     # ============================================================
     # 섹션: 월지 기반 삶의 핵심 가치관/지향점
     # ============================================================
@@ -665,6 +1006,7 @@ class GPTInterpretationGenerator:
         )
 
         if not self.client:
+            record_fallback("core_values", "no_client", model="gpt-4o-mini")
             return self._fallback_core_values(day_stem, month_branch)
 
         tone_prompts = {
@@ -672,19 +1014,8 @@ class GPTInterpretationGenerator:
             'reality': "당신은 현실 감각이 뛰어난 사주 전문가입니다. 사주 이론을 바탕으로 핵심만 짚되, 지나친 공포 마케팅이나 단정적인 표현은 피하세요.",
             'fun': "당신은 친구 같은 말투의 사주 해석가입니다. 살짝 가벼운 농담을 섞되, 사용자의 자존감을 해치지 않도록 존중하는 태도를 유지하세요."
         }
-        system_prompt = tone_prompts.get(tone, tone_prompts['empathy'])
-
-        user_prompt = f"""
-아래 정보를 바탕으로 이 사람의 "삶의 핵심 가치관과 지향점"을 설명해 주세요.
 
-[기본 정보]
-- 일간(자기 본체): {day_stem}
-- 월지(삶의 엔진 자리): {branch_name}
-- 월지 자의/기질 키워드: {branch_keywords}
-- 일간 기준 월지의 십신(육친): {ten_god}
-- 십신 의미 요약: {ten_god_text}
-
-[작성 가이드]
+        guide = """[작성 가이드]
 1. 분량은 **400~500자 정도의 한 문단**으로 작성합니다. (너무 길게 쓰지 마세요)
 2. 이 사람이 무엇을 중요하게 여기며, 어떤 방향으로 살아가려 하는지
    - 가치관(무엇을 지키려고 하는가)
@@ -694,136 +1025,29 @@ class GPTInterpretationGenerator:
    일반인이 이해하기 쉬운 심리·가치 언어로만 풀어서 설명합니다.
 4. 운명론적으로 "원래 그렇다"라고 단정 짓지 말고,
    이 기질을 잘 썼을 때의 장점과 주의할 점을 함께 말해 주세요.
-5. 말투는 존댓말이고, 상담자가 사용자의 가능성을 응원하는 톤이면 좋습니다.
-"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.8,
-                max_tokens=900
-            )
-            content = response.choices[0].message.content
-            return content.strip()
-        except Exception as e:
-            print(f"❌ core_values GPT 호출 실패: {e}")
-            return self._fallback_core_values(day_stem, month_branch)
-
-        # 톤별 시스템 프롬프트
-        tone_prompts = {
-            'empathy': "당신은 따뜻하고 공감적인 사주 상담가입니다. 운명론적 결정론보다는 사람의 잠재력과 가능성에 집중하며, 격려와 지지의 메시지를 전달합니다.",
-            'reality': "당신은 냉철하고 객관적인 사주 전문가입니다. 사주 이론을 정확하게 분석하고, 현실적이고 논리적인 해석을 제공합니다.",
-            'fun': "당신은 재미있고 친근한 사주 해석가입니다. 친구같은 느낌으로 반말을 하죠. 밈과 이모지를 활용하여 Z세대 감성으로 쉽고 재미있게 사주를 해석합니다."
-        }
-
-        system_prompt = tone_prompts.get(tone, tone_prompts['empathy'])
-
-        # 분석 결과 정리
-        summary = analysis['summary']
-        element_count = summary['element_count']
-        ten_gods_count = summary['ten_gods_count']
-        patterns = analysis.get('patterns', [])
-
-        # 합화 정보 추출
-        harmony_transformations = self._extract_harmony_from_patterns(patterns)
-        harmony_section = ""
-        if harmony_transformations:
-            harmony_section = "\n\n🔥 합화(合化):\n"
-            for h in harmony_transformations:
-                harmony_section += f"- {h}\n"
-            harmony_section += "\n⚠️ 합화는 사주 해석에서 매우 중요한 요소입니다!"
-
-        analysis_info = f"""
-사주 기본 정보: 
-- 일간: {analysis['basic_info']['day_stem']}
-- 사주 팔자:
-  • 년주: {analysis['basic_info']['year']}
-  • 월주: {analysis['basic_info']['month']}
-  • 일주: {analysis['basic_info']['day']}
-  • 시주: {analysis['basic_info']['hour']}
-
-신강약 분석: 
-- 유형: {summary['strength']}
-- 점수: {summary['strength_score']}/100
-
-오행 분포: 
-- 木(목/나무): {element_count.get('wood', 0)}개
-- 火(화/불): {element_count.get('fire', 0)}개
-- 土(토/흙): {element_count.get('earth', 0)}개
-- 金(금/쇠): {element_count.get('metal', 0)}개
-- 水(수/물): {element_count.get('water', 0)}개
-
-십성 분포: 
-{self._format_ten_gods_detail(ten_gods_count)}
-
-발견된 패턴: 
-{self._format_patterns(patterns)}
-
-{harmony_section}
-"""
-
-        theory_section = f"\n\n참고 이론:\n{theories}" if theories else ""
-
-        user_prompt = f"""다음 사주를 종합적으로 분석하여 상세한 해석을 작성해주세요:
-
-{analysis_info}{theory_section}
-
-작성 가이드 (용어 사용 규칙 반영본)
-
-이 섹션은 사용자의 성격적 엔진과 브레이크를 분석합니다. AI는 다음 세 가지 관점을 현실적인 예시(돈, 사랑, 일)와 함께 입체적으로 서술해야 합니다.
-
-⚠️ 용어 사용 공통 규칙 (필수)
-
-오행 개수 0개 → 「결핍」 사용
-오행 개수 1개 → 「부족」, 「약한 편」 등으로 표현 (결핍 ❌)
-오행 개수 2개 → 「적당」 등으로 표현
-오행 개수 3개 이상 → 「과다」 사용
-「과부하」라는 단어는 사용하지 않음
-의미는 서술로만 표현 (예: "너무 날카로워 스스로를 베기도 합니다")
-균형 잡힌 사주에서는 '과다 / 결핍 / 과부하' 단어 모두 사용 금지
-
-0. [최우선 분석] 기운의 결합과 변신: "내 안의 숨겨진 반전 카드" (1000자)
-
-두 기운이 만나 전혀 다른 제3의 기운으로 변하는 현상을 분석. 사용자가 이해하기 쉽게 "기운이 합쳐져 변했다"고 표현하세요.
-없으면 그냥 건너뛰어도됨.
-
-⚠️ 합 / 합화 분석 규칙 (필수)
-
-AI는 아래 3단계를 순서대로 판단하고, 해당되는 케이스만 현실 예시까지 구체적으로 작성하세요.
-
-A) "합이 있다" (결속/묶임/반전의 씨앗)
-B) "합이 작동한다" (실제로 삶에서 계속 발동되는 상태)
-C) "합화가 된다" (제3의 기운으로 변환)
+5. 말투는 존댓말이고, 상담자가 사용자의 가능성을 응원하는 톤이면 좋습니다."""
 
-1. 강한 오행 : "나를 움직이는 자동 반사적 습관" (800자)
-2. 약한 오행 : "무의식적 갈망과 심리적 사각지대" (800자)
-3. 균형 잡힌 사주 : "평온함 속에 숨겨진 야성의 부재" (400자)
+        user_prompt = f"""
+아래 정보를 바탕으로 이 사람의 "삶의 핵심 가치관과 지향점"을 설명해 주세요.
 
-분량: 3000~4000자
+[기본 정보]
+- 일간(자기 본체): {day_stem}
+- 월지(삶의 엔진 자리): {branch_name}
+- 월지 자의/기질 키워드: {branch_keywords}
+- 일간 기준 월지의 십신(육친): {ten_god}
+- 십신 의미 요약: {ten_god_text}
 """
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.8,
-                max_tokens=5000
-            )
-
-            content = response.choices[0].message.content
-            print(f"✅ 종합 GPT 해석 생성 완료: {len(content)}자")
-            return content
+        # 고정 prefix(작성 가이드 → 톤) 뒤에 차트별 정보
+        pb = PromptBuilder("core_values", model="gpt-4o-mini")
+        pb.add_static("guide", guide)
+        self._add_tone(pb, tone_prompts, tone)
+        pb.add("core_values", user_prompt.strip())
 
-        except Exception as e:
-            print(f"❌ GPT API 호출 실패: {e}")
-            return self._fallback_comprehensive(analysis, tone)
+        content = self._complete_cached(pb, "core_values", "gpt-4o-mini", 900, tone)
+        if content is None:
+            return self._fallback_core_values(day_stem, month_branch)
+        return content
 
     def _format_ten_gods_detail(self, ten_gods):
         """십성 상세 포맷팅"""
@@ -912,6 +1136,29 @@ C) "합화가 된다" (제3의 기운으로 변환)
 상세한 해석은 GPT 서비스 연결 후 제공됩니다.
 """
 
+    def _fallback_comprehensive_section(self, key, analysis):
+        """섹션 하나만 GPT 생성에 실패했을 때 넣는 짧은 템플릿"""
+        summary = analysis['summary']
+        element_count = summary['element_count']
+        element_names = {
+            'wood': '木(나무)', 'fire': '火(불)', 'earth': '土(흙)',
+            'metal': '金(쇠)', 'water': '水(물)'
+        }
+        patterns = analysis.get('patterns', [])
+
+        if key == "elements":
+            strongest = max(element_count.items(), key=lambda x: x[1])
+            weakest = min(element_count.items(), key=lambda x: x[1])
+            return (f"가장 강한 오행은 {element_names[strongest[0]]} ({strongest[1]}개)이고, "
+                    f"가장 약한 오행은 {element_names[weakest[0]]} ({weakest[1]}개)입니다.")
+        if key == "strength":
+            return f"당신의 사주는 {summary['strength']} 성향입니다 ({summary['strength_score']}점)."
+        if key == "ten_gods":
+            return f"십성 분포:\n{self._format_ten_gods_detail(summary['ten_gods_count'])}"
+        if key == "relations":
+            return self._format_patterns([p for p in patterns if '합' in p or '충' in p])
+        return "\n".join(f"- {p}" for p in patterns if '합' not in p and '충' not in p)
+
     def _fallback_element_interpretation(self, element_counts, tone):
         """GPT 실패 시 폴백 해석"""
         total = sum(element_counts.values())
@@ -980,7 +1227,8 @@ C) "합화가 된다" (제3의 기운으로 변환)
         """
 
         # 1. 관련 이론 추출
-        theories = self.retriever.get_relevant_theories(analysis)
+        # (공통 이론은 system prefix에 들어가므로 여기서는 그 외 관련 이론만)
+        theories = self.retriever.get_relevant_theories(analysis, exclude_prefix=True)
 
         # 2. 분석 결과 요약
         summary = self._create_analysis_summary(analysis)
@@ -992,18 +1240,11 @@ C) "합화가 된다" (제3의 기운으로 변환)
             'fun': "당신은 친근하고 재미있는 친구 같은 사주 상담가입니다. 반말을 섞어 편하게 이야기하며, 핵심을 찌르는 조언을 합니다."
         }
 
-        # 4. GPT 프롬프트 구성
-        prompt = f"""다음 사주 분석 결과와 이론을 바탕으로 해석을 작성해주세요.
-
-[사주 분석 결과]
-{summary}
-
-[관련 사주 이론]
-{theories}
-
-[요구사항]
-1. 위 이론을 참고하여 정확하고 전문적인 해석 작성
-2. {tone} 톤에 맞춰 작성:
+        # 4. GPT 프롬프트 구성 (이론은 토큰 예산에 맞춰 문장 단위로 축소될 수 있음)
+        # 요구사항은 톤과 무관한 고정 텍스트 — 톤은 system 마지막 [톤] 블록으로만 지정
+        requirements = """[요구사항]
+1. 공통 이론과 사용자 메시지의 관련 이론을 참고하여 정확하고 전문적인 해석 작성
+2. 아래 [톤]에 지정된 톤에 맞춰 작성:
    - empathy: 따뜻하고 공감적, "당신", "~예요", "~입니다"
    - reality: 객관적이고 분석적, "~함", "~임", 데이터 중심
    - fun: 친근하고 재미있게, 반말 섞어서, "야", "너"
@@ -1019,20 +1260,30 @@ C) "합화가 된다" (제3의 기운으로 변환)
 6. 구체적이고 실용적인 조언 제공
 """
 
+        # 고정 prefix(공통 이론 → 요구사항 → 톤) 뒤에 차트별 내용
+        pb = PromptBuilder("section1", model="gpt-4o")
+        pb.add_static("theory", self._theory_prefix())
+        pb.add_static("requirements", requirements)
+        pb.add_static("tone", f"[톤] {tone}\n{system_prompts[tone]}")
+        pb.add("analysis", f"다음 사주 분석 결과와 이론을 바탕으로 해석을 작성해주세요.\n\n[사주 분석 결과]\n{summary}")
+        pb.add("theory", f"[관련 사주 이론]\n{theories}" if theories else "", shrink=True)
+
         # 5. GPT 호출
         if not self.client:
+            record_fallback("section1", "no_client", model="gpt-4o")
             return self._fallback_interpretation(analysis, tone)
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client,
+                call_name="section1",
                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompts[tone]},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=pb.messages(),
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=2000,
+                priority=self.priority,
             )
+            pb.log_usage(response)
 
             content = response.choices[0].message.content
 
@@ -1045,54 +1296,12 @@ C) "합화가 된다" (제3의 기운으로 변환)
 
         except Exception as e:
             print(f"❌ GPT 호출 실패: {e}")
+            record_fallback("section1", e, model="gpt-4o")
             return self._fallback_interpretation(analysis, tone)
 
     def _create_analysis_summary(self, analysis):
-        """분석 결과를 GPT가 읽기 쉬운 형식으로 요약"""
-
-        bi = analysis['basic_info']
-        strength = analysis['summary']['strength']
-        score = analysis['summary']['strength_score']
-        ten_gods = analysis['summary']['ten_gods_count']
-        element_count = analysis['summary']['element_count']
-        patterns = analysis.get('patterns', [])
-
-        summary = f"""
-사주 팔자 
-- 연주: {bi['year']}
-- 월주: {bi['month']}
-- 일주: {bi['day']}
-- 시주: {bi['hour']}
-
-일간 
-- {bi['day_stem']}
-
-신강약 
-- 유형: {strength}
-- 점수: {score}/100
-
-오행 분포 
-- 목(木): {element_count.get('wood', 0)}개
-- 화(火): {element_count.get('fire', 0)}개
-- 토(土): {element_count.get('earth', 0)}개
-- 금(金): {element_count.get('metal', 0)}개
-- 수(水): {element_count.get('water', 0)}개
-
-십성 분포 
-{self._format_ten_gods(ten_gods)}
-
-발견된 패턴 
-{', '.join(patterns) if patterns else '없음'}
-"""
-        return summary.strip()
-
-    def _format_ten_gods(self, ten_gods):
-        """십성을 읽기 쉽게 포맷"""
-        lines = []
-        for god, count in ten_gods.items():
-            if count > 0:
-                lines.append(f"- {god}: {count}개")
-        return "\n".join(lines) if lines else "- 없음"
+        """분석 결과를 GPT가 읽기 쉬운 압축 형식으로 요약 (logic/analysis_codec.py)"""
+        return encode_analysis(analysis)
 
     def _fallback_interpretation(self, analysis, tone):
         """GPT 실패 시 기본 해석"""
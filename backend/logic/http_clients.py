@@ -0,0 +1,71 @@
+# backend/logic/http_clients.py
+"""
+외부 API(카카오·구글 로그인, PortOne 결제)용 공용 httpx.AsyncClient — 제공자별로 하나씩.
+
+로그인 한 번에 토큰 교환 → 사용자 조회 두 번을 같은 호스트로 부르므로,
+요청마다 새 연결(TCP+TLS)을 여는 대신 keep-alive 연결을 재사용합니다.
+- 타임아웃·재시도·연결 수는 여기 상수에서만 설정
+- 재시도는 연결 단계 실패만 (httpx transport retries) — 인가 코드 교환처럼 두 번 보내면 안 되는 요청도 안전
+- h2 패키지가 설치돼 있으면 HTTP/2 (pip install h2), 없으면 HTTP/1.1 keep-alive
+- 기본 주소는 env 로 바꿀 수 있음 → 로컬 스텁 서버(provider_stub_server.py)로 로그인 지연 측정
+"""
+import asyncio
+import importlib.util
+import os
+from typing import Dict
+
+import httpx
+
+HTTP_TIMEOUT_SEC = float(os.getenv("HTTP_TIMEOUT_SEC", "10"))
+HTTP_CONNECT_TIMEOUT_SEC = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "3"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_SEC = float(os.getenv("HTTP_KEEPALIVE_SEC", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+# 제공자 → 기본 주소 (스텁 서버로 돌릴 때 env 로 교체)
+PROVIDER_BASE_URLS = {
+    "kakao_auth": os.getenv("KAKAO_AUTH_BASE", "https://kauth.kakao.com").rstrip("/"),
+    "kakao_api": os.getenv("KAKAO_API_BASE", "https://kapi.kakao.com").rstrip("/"),
+    "google_oauth": os.getenv("GOOGLE_OAUTH_BASE", "https://oauth2.googleapis.com").rstrip("/"),
+    "google_oidc": os.getenv("GOOGLE_OIDC_BASE", "https://openidconnect.googleapis.com").rstrip("/"),
+    "portone": os.getenv("PORTONE_API_BASE", "https://api.portone.io").rstrip("/"),
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _new_client(provider: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=PROVIDER_BASE_URLS[provider],
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SEC, connect=HTTP_CONNECT_TIMEOUT_SEC),
+        # transport 를 직접 넘기면 클라이언트의 limits/http2 인자는 무시되므로 transport 에 설정
+        transport=httpx.AsyncHTTPTransport(
+            retries=HTTP_MAX_RETRIES,
+            http2=HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_SEC,
+            ),
+        ),
+    )
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """provider(PROVIDER_BASE_URLS 키)별 공용 클라이언트 (처음 쓸 때 생성, 닫혔으면 다시 생성)"""
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _clients[provider] = _new_client(provider)
+    return client
+
+
+async def aclose_all() -> None:
+    """종료 시 열린 연결 정리 (FastAPI shutdown 훅)"""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+def stats() -> dict:
+    return {"http2": HTTP2_ENABLED, "open_clients": sorted(p for p, c in _clients.items() if not c.is_closed)}
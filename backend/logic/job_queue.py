@@ -0,0 +1,302 @@
+# backend/logic/job_queue.py
+"""
+오래 걸리는 GPT 분석용 백그라운드 작업 큐 (SQLite 저장).
+클라이언트가 끊기거나 서버가 재시작돼도 작업과 결과가 jobs.db에 남습니다.
+jobs.db 는 앱 DB와 별도 파일이지만 연결은 logic/db.py 공용 계층(스레드별 연결, WAL, busy_timeout)을 쓰고,
+워커/롱폴링의 DB 호출은 run_db 로 DB 전용 스레드에서 실행합니다.
+"""
+import asyncio
+import json
+import os
+import time
+import traceback
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from logic import db
+from logic.db import run_db
+
+DB_DIR = Path(__file__).resolve().parent
+JOBS_DB = Path(os.getenv("JOBS_DB_PATH") or (DB_DIR / "jobs.db"))
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+JOB_POLL_SEC = float(os.getenv("JOB_POLL_SEC", "1.0"))
+# 같은 dedupe_key 작업을 재사용하는 기간 (초) — 모바일 재시도 시 중복 과금/호출 방지
+JOB_DEDUPE_SEC = int(os.getenv("JOB_DEDUPE_SEC", str(60 * 60 * 24)))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_COLUMNS = "id, kind, status, payload, result, error, attempts, dedupe_key, created_at, started_at, finished_at"
+
+
+def get_conn():
+    """현재 스레드의 jobs.db 연결 (호출 시점의 JOBS_DB — 테스트에서 바꿀 수 있게)"""
+    return db.connection(JOBS_DB)
+
+
+def init_jobs_db():
+    with get_conn() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                dedupe_key TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe_key ON jobs(dedupe_key)")
+        conn.commit()
+
+
+def _row_to_job(row) -> dict:
+    return {
+        "id": row[0],
+        "kind": row[1],
+        "status": row[2],
+        "payload": json.loads(row[3]) if row[3] else None,
+        "result": json.loads(row[4]) if row[4] else None,
+        "error": row[5],
+        "attempts": row[6],
+        "dedupe_key": row[7],
+        "created_at": row[8],
+        "started_at": row[9],
+        "finished_at": row[10],
+    }
+
+
+def submit_job(kind: str, payload: dict, dedupe_key: Optional[str] = None) -> dict:
+    """
+    작업 등록. dedupe_key가 같은 작업이 기간 내에 실패 없이 있으면 새로 만들지 않고 그 작업을 반환.
+    Returns: job dict (+ "deduplicated": bool)
+    """
+    now = datetime.utcnow()
+    with get_conn() as conn:
+        if dedupe_key:
+            since = datetime.utcfromtimestamp(now.timestamp() - JOB_DEDUPE_SEC).isoformat()
+            cur = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ? AND status != ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedupe_key, STATUS_FAILED, since),
+            )
+            row = cur.fetchone()
+            if row:
+                job = _row_to_job(row)
+                job["deduplicated"] = True
+                return job
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, payload, attempts, dedupe_key, created_at) VALUES (?, ?, ?, ?, 0, ?, ?)",
+            (job_id, kind, STATUS_QUEUED, json.dumps(payload, ensure_ascii=False), dedupe_key, now.isoformat()),
+        )
+        # 커밋 전에 읽어야 워커가 먼저 가져간 상태가 아니라 등록 시점 상태를 반환함
+        cur = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+        job = _row_to_job(cur.fetchone())
+        conn.commit()
+    job["deduplicated"] = False
+    return job
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    with get_conn() as conn:
+        cur = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+        row = cur.fetchone()
+        return _row_to_job(row) if row else None
+
+
+def claim_next_job(kinds) -> Optional[dict]:
+    """가장 오래된 queued 작업 1건을 running으로 바꾸며 가져옴 (단일 UPDATE라 워커끼리 겹치지 않음)"""
+    kinds = list(kinds)
+    if not kinds:
+        return None
+    placeholders = ",".join("?" for _ in kinds)
+    with get_conn() as conn:
+        cur = conn.execute(
+            f"""
+            UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM jobs WHERE status = ? AND kind IN ({placeholders})
+                ORDER BY created_at LIMIT 1
+            ) AND status = ?
+            RETURNING {_COLUMNS}
+            """,
+            (STATUS_RUNNING, datetime.utcnow().isoformat(), STATUS_QUEUED, *kinds, STATUS_QUEUED),
+        )
+        row = cur.fetchone()
+        conn.commit()
+        return _row_to_job(row) if row else None
+
+
+def complete_job(job_id: str, result: dict) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE id = ?",
+            (STATUS_DONE, json.dumps(result, ensure_ascii=False), datetime.utcnow().isoformat(), job_id),
+        )
+        conn.commit()
+
+
+def fail_job(job_id: str, error: str, retry: bool) -> None:
+    """실패 기록. retry=True면 다시 queued로 돌려 다른 워커가 재시도"""
+    with get_conn() as conn:
+        if retry:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, started_at = NULL WHERE id = ?",
+                (STATUS_QUEUED, error, job_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (STATUS_FAILED, error, datetime.utcnow().isoformat(), job_id),
+            )
+        conn.commit()
+
+
+def requeue_interrupted_jobs() -> int:
+    """서버가 작업 도중 종료된 경우 running으로 남은 작업을 다시 queued로 (기동 시 1회)"""
+    with get_conn() as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+            (STATUS_QUEUED, STATUS_RUNNING),
+        )
+        conn.commit()
+        return cur.rowcount
+
+
+def count_jobs_by_status() -> Dict[str, int]:
+    with get_conn() as conn:
+        cur = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {row[0]: row[1] for row in cur.fetchall()}
+
+
+class JobWorkerPool:
+    """
+    asyncio 워커 풀. 핸들러는 동기 함수(payload → result dict)이며 스레드 풀에서 실행됩니다.
+
+        pool = JobWorkerPool()
+        pool.register("concern_analysis", handler)
+        await pool.start()
+        job = await pool.submit("concern_analysis", payload, dedupe_key=...)
+        job = await pool.wait_for(job["id"], timeout=25)
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 poll_sec: float = JOB_POLL_SEC):
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.poll_sec = poll_sec
+        self._handlers: Dict[str, Callable[[dict], dict]] = {}
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._running = False
+
+    def register(self, kind: str, handler: Callable[[dict], dict]) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        await run_db(init_jobs_db)
+        requeued = await run_db(requeue_interrupted_jobs)
+        if requeued:
+            print(f"♻️ 중단된 작업 {requeued}건 재등록")
+        self._wakeup = asyncio.Event()
+        self._running = True
+        self._tasks = [asyncio.ensure_future(self._worker(i)) for i in range(self.workers)]
+        print(f"✅ 작업 워커 {self.workers}개 시작")
+
+    async def stop(self) -> None:
+        self._running = False
+        for t in self._tasks:
+            t.cancel()
+        for t in self._tasks:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+
+    async def submit(self, kind: str, payload: dict, dedupe_key: Optional[str] = None) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"등록되지 않은 작업 종류: {kind}")
+        job = await run_db(submit_job, kind, payload, dedupe_key)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await run_db(get_job, job_id)
+
+    async def wait_for(self, job_id: str, timeout: float = 0) -> Optional[dict]:
+        """롱폴링: 작업이 끝나거나 timeout(초)이 지날 때까지 기다린 뒤 현재 상태 반환"""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            job = await self.get(job_id)
+            if job is None or job["status"] in (STATUS_DONE, STATUS_FAILED):
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            event = self._finished.setdefault(job_id, asyncio.Event())
+            try:
+                # 같은 프로세스 워커가 끝내면 즉시 깨어나고, 아니면 poll_sec마다 DB 재확인
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, self.poll_sec))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "running": self._running,
+            "kinds": sorted(self._handlers),
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        while self._running:
+            try:
+                job = await run_db(claim_next_job, list(self._handlers))
+            except Exception as e:
+                print(f"⚠️ 작업 조회 실패 (worker {worker_id}): {e}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_sec)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run_job(job)
+
+    async def _run_job(self, job: dict) -> None:
+        loop = asyncio.get_running_loop()
+        handler = self._handlers[job["kind"]]
+        started = time.monotonic()
+        try:
+            result = await loop.run_in_executor(None, handler, job["payload"])
+            await run_db(complete_job, job["id"], result)
+            print(f"✅ 작업 완료 {job['kind']} {job['id'][:8]} ({time.monotonic() - started:.1f}s)")
+        except Exception as e:
+            retry = job["attempts"] < self.max_attempts
+            print(f"❌ 작업 실패 {job['kind']} {job['id'][:8]} (시도 {job['attempts']}, 재시도={retry}): {e}")
+            traceback.print_exc()
+            await run_db(fail_job, job["id"], str(e)[:500], retry)
+            if retry:
+                self._wakeup.set()
+                return
+        event = self._finished.pop(job["id"], None)
+        if event is not None:
+            event.set()
@@ -0,0 +1,86 @@
+# backend/logic/llm_cache.py
+"""
+LLM 생성 결과 캐시 (프로세스 내 TTL + LRU).
+같은 프롬프트(messages + 모델 + max_tokens)면 같은 키가 되므로, 차트/톤/프롬프트가 바뀌면 자연히 새로 생성됩니다.
+GPT가 실제로 생성한 결과만 넣고, 템플릿 폴백은 넣지 않습니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from logic.single_flight import make_key
+
+LLM_CACHE_TTL_SEC = float(os.getenv("LLM_CACHE_TTL_SEC", str(60 * 60 * 24)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+
+def prompt_key(namespace: str, model: str, messages: list, max_tokens: int) -> str:
+    return make_key(namespace, model=model, messages=messages, max_tokens=max_tokens)
+
+
+class TTLCache:
+    """스레드 안전 TTL 캐시. 가득 차면 가장 오래 안 쓴 항목부터 제거"""
+
+    def __init__(self, name: str, ttl_sec: float = LLM_CACHE_TTL_SEC, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 clock=time.monotonic):
+        self.name = name
+        self.ttl_sec = ttl_sec
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl_sec <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "ttl_sec": self.ttl_sec,
+            }
+
+
+# 종합 해석 섹션별 결과
+section_cache = TTLCache("comprehensive_sections")
@@ -0,0 +1,235 @@
+# backend/logic/llm_client.py
+"""
+모든 OpenAI chat 호출이 지나가는 단일 진입점.
+호출 전에 스케줄러에서 모델별 RPM/TPM 쿼터를 우선순위대로 확보하고, 호출 후 실제 usage로 보정합니다.
+서킷 브레이커가 열려 있으면 호출 없이 즉시 CircuitOpenError를 던져 호출부 폴백이 바로 실행됩니다.
+429(쿼터 초과)는 OpenAI 장애가 아니므로 브레이커 실패로 세지 않고, 호출부가 rate_limit_backoff 만큼 쉬었다 재시도합니다.
+"""
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from logic.circuit_breaker import CircuitBreaker, CircuitOpenError
+from logic.deadline import DeadlineExceeded, clamp_timeout, current_deadline
+from logic.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PAID,
+    SchedulerTimeout,
+    scheduler,
+)
+from logic.llm_metrics import (
+    OUTCOME_CIRCUIT_OPEN,
+    OUTCOME_DEADLINE,
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_QUEUE_TIMEOUT,
+    current_endpoint,
+    metrics,
+    note_call_cost,
+)
+from logic.prompt_builder import cached_prompt_tokens, count_messages_tokens
+
+# OpenAI 장애는 모델과 무관하게 오므로 프로바이더 단위 브레이커 1개
+breaker = CircuitBreaker("openai")
+
+# 우선순위별 쿼터 대기 상한 (초). 넘기면 SchedulerTimeout → 호출부 폴백
+QUEUE_TIMEOUTS = {
+    PRIORITY_PAID: float(os.getenv("LLM_QUEUE_TIMEOUT_PAID", "60")),
+    PRIORITY_INTERACTIVE: float(os.getenv("LLM_QUEUE_TIMEOUT_INTERACTIVE", "20")),
+    PRIORITY_BACKGROUND: float(os.getenv("LLM_QUEUE_TIMEOUT_BACKGROUND", "120")),
+}
+
+# 429 재시도 전 대기 (Retry-After 헤더가 없으면 1s, 2s, 4s … 를 상한까지)
+RATE_LIMIT_BACKOFF_SEC = float(os.getenv("LLM_RATE_LIMIT_BACKOFF_SEC", "1"))
+RATE_LIMIT_BACKOFF_MAX_SEC = float(os.getenv("LLM_RATE_LIMIT_BACKOFF_MAX_SEC", "8"))
+
+__all__ = [
+    "chat_completion",
+    "PRIORITY_PAID",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_BACKGROUND",
+    "SchedulerTimeout",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "breaker",
+    "is_rate_limited",
+    "rate_limit_backoff",
+    "prompt_cache_stats",
+]
+
+# 호출 종류별 프롬프트 캐시 적중 집계 (usage.prompt_tokens_details.cached_tokens)
+_cache_lock = threading.Lock()
+_cache_stats = defaultdict(lambda: {
+    "calls": 0, "prompt_tokens": 0, "cached_tokens": 0,
+    "hit_calls": 0, "hit_latency_sec": 0.0, "miss_latency_sec": 0.0,
+})
+
+
+def _record_cache_usage(call_name: str, response, latency_sec: float) -> None:
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if prompt_tokens is None:
+        return
+    cached = cached_prompt_tokens(response) or 0
+    with _cache_lock:
+        st = _cache_stats[call_name]
+        st["calls"] += 1
+        st["prompt_tokens"] += prompt_tokens
+        st["cached_tokens"] += cached
+        if cached:
+            st["hit_calls"] += 1
+            st["hit_latency_sec"] += latency_sec
+        else:
+            st["miss_latency_sec"] += latency_sec
+
+
+def prompt_cache_stats() -> dict:
+    """호출 종류별 캐시 적중률과 적중/미적중 평균 지연 (적중 시 절약된 지연 추정용)"""
+    with _cache_lock:
+        result = {}
+        for name, st in _cache_stats.items():
+            misses = st["calls"] - st["hit_calls"]
+            hit_avg = st["hit_latency_sec"] / st["hit_calls"] if st["hit_calls"] else None
+            miss_avg = st["miss_latency_sec"] / misses if misses else None
+            result[name] = {
+                "calls": st["calls"],
+                "hit_calls": st["hit_calls"],
+                "cached_token_ratio": round(st["cached_tokens"] / st["prompt_tokens"], 3) if st["prompt_tokens"] else 0.0,
+                "cached_tokens": st["cached_tokens"],
+                "prompt_tokens": st["prompt_tokens"],
+                "avg_latency_hit_sec": round(hit_avg, 3) if hit_avg is not None else None,
+                "avg_latency_miss_sec": round(miss_avg, 3) if miss_avg is not None else None,
+            }
+        return result
+
+
+def _is_client_error(error: BaseException) -> bool:
+    """요청 자체가 잘못된 4xx(429·408·409 제외)는 장애가 아니므로 브레이커 실패로 세지 않음"""
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 409, 429)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def rate_limit_backoff(error: BaseException, attempt: int) -> Optional[float]:
+    """
+    429 뒤 재시도 전 대기 시간(초). Retry-After 헤더가 있으면 그 값, 없으면 지수 backoff (지터 포함).
+    요청 deadline 안에 기다렸다 다시 호출할 시간이 없으면 None → 호출부 폴백
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        delay = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        base = RATE_LIMIT_BACKOFF_SEC * 2 ** (attempt - 1)
+        delay = random.uniform(base / 2, base)
+    delay = min(max(delay, 0.0), RATE_LIMIT_BACKOFF_MAX_SEC)
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() <= delay:
+        return None
+    return delay
+
+
+def chat_completion(client, *, call_name: str, model: str, messages: list, max_tokens: int,
+                    temperature: float = 0.7, priority: int = PRIORITY_INTERACTIVE,
+                    queue_timeout: Optional[float] = None, **kwargs):
+    """
+    client.chat.completions.create 래퍼 (동기, 스레드에서 호출).
+    쿼터 추정치 = 입력 토큰 추정 + max_tokens (응답 최대치까지 미리 잡고, 끝나면 실제 usage로 돌려줌)
+    요청 deadline(deadline_scope)이 있으면 쿼터 대기와 OpenAI 타임아웃을 남은 시간 이하로 줄이고,
+    이미 지났으면 호출 없이 DeadlineExceeded
+    """
+    endpoint = current_endpoint()
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        deadline.note_fallback(call_name)
+        metrics.record_call(endpoint=endpoint, section=call_name, model=model, latency_sec=0.0,
+                            outcome=OUTCOME_DEADLINE)
+        raise DeadlineExceeded(call_name)
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        metrics.record_call(endpoint=endpoint, section=call_name, model=model, latency_sec=0.0,
+                            outcome=OUTCOME_CIRCUIT_OPEN, error=str(e))
+        raise
+    estimated = count_messages_tokens(messages, model) + max_tokens
+    timeout = clamp_timeout(queue_timeout if queue_timeout is not None else QUEUE_TIMEOUTS.get(priority))
+    try:
+        waited = scheduler.acquire(model, estimated, priority, timeout=timeout)
+    except BaseException as e:
+        breaker.release()
+        if isinstance(e, SchedulerTimeout):
+            if deadline is not None and deadline.expired:
+                deadline.note_fallback(call_name)
+            metrics.record_call(endpoint=endpoint, section=call_name, model=model, latency_sec=0.0,
+                                outcome=OUTCOME_QUEUE_TIMEOUT, error=str(e))
+        raise
+    if waited >= 1.0:
+        print(f"⏳ [{call_name}] {model} 쿼터 대기 {waited:.1f}s")
+    if deadline is not None and hasattr(client, "with_options"):
+        # 남은 시간 안에 끝나야 하므로 SDK 재시도 없이 1회, 타임아웃 = 남은 시간
+        client = client.with_options(timeout=max(deadline.remaining(), 0.1), max_retries=0)
+    response = None
+    started = time.monotonic()
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs,
+        )
+        latency = time.monotonic() - started
+        breaker.record_success(latency)
+        _record_cache_usage(call_name, response, latency)
+        _record_success(endpoint, call_name, model, latency, response)
+        return response
+    except Exception as e:
+        if deadline is not None and deadline.expired:
+            # 우리가 줄인 타임아웃에 걸린 것이므로 OpenAI 장애로 세지 않음
+            deadline.note_fallback(call_name)
+            breaker.release()
+        elif _is_client_error(e) or is_rate_limited(e):
+            # 429 는 우리 쿼터 초과 — 몰려도 다른 엔드포인트(유료 고민 분석 등)까지 막지 않도록
+            breaker.release()
+        else:
+            breaker.record_failure(e)
+        metrics.record_call(endpoint=endpoint, section=call_name, model=model,
+                            latency_sec=time.monotonic() - started, outcome=OUTCOME_ERROR,
+                            error=f"{type(e).__name__}: {e}"[:300])
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    finally:
+        usage = getattr(response, "usage", None)
+        actual = getattr(usage, "total_tokens", None)
+        # 실패한 호출은 응답 토큰을 쓰지 않았으므로 max_tokens 분만 돌려줌
+        if actual is None:
+            actual = estimated - max_tokens
+        scheduler.settle(model, estimated, actual)
+
+
+def _record_success(endpoint: str, call_name: str, model: str, latency: float, response) -> None:
+    usage = getattr(response, "usage", None)
+    choices = getattr(response, "choices", None) or []
+    finish_reason = getattr(choices[0], "finish_reason", None) if choices else None
+    if finish_reason == "length":
+        print(f"✂️ [{call_name}] max_tokens 도달로 응답 잘림")
+    cost = metrics.record_call(
+        endpoint=endpoint,
+        section=call_name,
+        model=model,
+        latency_sec=latency,
+        outcome=OUTCOME_OK,
+        prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+        cached_tokens=cached_prompt_tokens(response) or 0,
+        finish_reason=finish_reason,
+    )
+    note_call_cost(cost)
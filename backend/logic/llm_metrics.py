@@ -0,0 +1,284 @@
+# backend/logic/llm_metrics.py
+"""
+LLM 호출 계측: 엔드포인트 × 섹션별 지연/토큰/비용/결과 히스토그램 (프로세스 내 집계).
+
+- 모든 호출은 llm_client.chat_completion 에서 record_call 로 기록됩니다.
+- 엔드포인트와 리포트 단위 비용은 report_scope() 로 묶습니다 (스레드에서 실행되는 동기 코드 안에서 열기).
+- LLM_METRICS_NDJSON=경로 를 지정하면 호출마다 1줄씩 NDJSON으로도 남깁니다 (오프라인 분석용).
+"""
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+# USD / 1M tokens (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000)
+COST_BUCKETS_USD = (0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2)
+# 백분위 계산용 최근 샘플 수
+RESERVOIR_SIZE = 1000
+
+METRICS_NDJSON = os.getenv("LLM_METRICS_NDJSON", "").strip()
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_CIRCUIT_OPEN = "circuit_open"
+OUTCOME_QUEUE_TIMEOUT = "queue_timeout"
+OUTCOME_DEADLINE = "deadline"
+
+
+def call_cost_usd(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    price_in, price_cached, price_out = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o"])
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * price_in + cached_tokens * price_cached + completion_tokens * price_out) / 1_000_000
+
+
+class Histogram:
+    """고정 버킷 누적 카운트 + 최근 샘플 기반 p50/p95/p99"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    def percentile(self, p: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        k = min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))
+        return ordered[k]
+
+    def snapshot(self, digits: int = 1) -> dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, digits) if self.count else 0,
+            "p50": round(self.percentile(50), digits),
+            "p95": round(self.percentile(95), digits),
+            "p99": round(self.percentile(99), digits),
+            "max": round(self.max, digits),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _SeriesStats:
+    """(endpoint, section, model) 한 묶음"""
+
+    def __init__(self):
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.outcomes = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = 0.0
+        self.truncated = 0
+        self.fallbacks = 0
+
+    def snapshot(self) -> dict:
+        ok = self.outcomes.get(OUTCOME_OK, 0)
+        return {
+            "calls": sum(self.outcomes.values()),
+            "outcomes": dict(self.outcomes),
+            "latency_ms": self.latency_ms.snapshot(),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost_usd": round(self.cost_usd, 5),
+            "truncated": self.truncated,
+            "truncated_rate": round(self.truncated / ok, 3) if ok else 0.0,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class LLMMetrics:
+    def __init__(self, ndjson_path: str = METRICS_NDJSON):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._reports = {}  # endpoint -> {"cost": Histogram, "latency_ms": Histogram}
+        self.ndjson_path = ndjson_path
+        self.started_at = datetime.utcnow().isoformat()
+
+    def _get(self, endpoint: str, section: str, model: str) -> _SeriesStats:
+        key = (endpoint, section, model)
+        st = self._series.get(key)
+        if st is None:
+            st = self._series[key] = _SeriesStats()
+        return st
+
+    def record_call(self, *, endpoint: str, section: str, model: str, latency_sec: float, outcome: str,
+                    prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0,
+                    finish_reason: Optional[str] = None, error: Optional[str] = None) -> float:
+        cost = call_cost_usd(model, prompt_tokens, completion_tokens, cached_tokens)
+        with self._lock:
+            st = self._get(endpoint, section, model)
+            st.outcomes[outcome] = st.outcomes.get(outcome, 0) + 1
+            if outcome == OUTCOME_OK:
+                st.latency_ms.observe(latency_sec * 1000)
+            st.prompt_tokens += prompt_tokens
+            st.completion_tokens += completion_tokens
+            st.cached_tokens += cached_tokens
+            st.cost_usd += cost
+            if finish_reason == "length":
+                st.truncated += 1
+        self._append_ndjson({
+            "type": "llm_call",
+            "ts": datetime.utcnow().isoformat(),
+            "endpoint": endpoint,
+            "section": section,
+            "model": model,
+            "outcome": outcome,
+            "latency_ms": round(latency_sec * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "finish_reason": finish_reason,
+            "cost_usd": round(cost, 6),
+            "error": error,
+        })
+        return cost
+
+    def record_fallback(self, endpoint: str, section: str, model: str = "-", reason: str = "") -> None:
+        with self._lock:
+            self._get(endpoint, section, model).fallbacks += 1
+        self._append_ndjson({
+            "type": "fallback",
+            "ts": datetime.utcnow().isoformat(),
+            "endpoint": endpoint,
+            "section": section,
+            "reason": reason[:200],
+        })
+
+    def record_report(self, endpoint: str, cost_usd: float, latency_sec: float, calls: int, fallbacks: int) -> None:
+        with self._lock:
+            rep = self._reports.get(endpoint)
+            if rep is None:
+                rep = self._reports[endpoint] = {
+                    "cost_usd": Histogram(COST_BUCKETS_USD),
+                    "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+                    "with_fallback": 0,
+                }
+            rep["cost_usd"].observe(cost_usd)
+            rep["latency_ms"].observe(latency_sec * 1000)
+            if fallbacks:
+                rep["with_fallback"] += 1
+        self._append_ndjson({
+            "type": "report",
+            "ts": datetime.utcnow().isoformat(),
+            "endpoint": endpoint,
+            "cost_usd": round(cost_usd, 6),
+            "latency_ms": round(latency_sec * 1000, 1),
+            "llm_calls": calls,
+            "fallbacks": fallbacks,
+        })
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = {}
+            for (endpoint, section, model), st in sorted(self._series.items()):
+                calls.setdefault(endpoint, {})[f"{section}:{model}"] = st.snapshot()
+            reports = {
+                endpoint: {
+                    "cost_usd": rep["cost_usd"].snapshot(digits=5),
+                    "latency_ms": rep["latency_ms"].snapshot(),
+                    "with_fallback": rep["with_fallback"],
+                }
+                for endpoint, rep in sorted(self._reports.items())
+            }
+            return {"since": self.started_at, "calls": calls, "reports": reports}
+
+    def _append_ndjson(self, record: dict) -> None:
+        if not self.ndjson_path:
+            return
+        line = json.dumps(record, ensure_ascii=False)
+        try:
+            with self._lock:
+                with open(self.ndjson_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ LLM 메트릭 NDJSON 기록 실패: {e}")
+
+
+metrics = LLMMetrics()
+
+
+# ==================== 리포트 단위 스코프 ====================
+
+class ReportScope:
+    """한 요청(리포트)에서 발생한 LLM 호출 비용/횟수/폴백 누적"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.cost_usd = 0.0
+        self.calls = 0
+        self.fallbacks = 0
+        self.started = time.monotonic()
+
+
+_current_scope: contextvars.ContextVar = contextvars.ContextVar("llm_report_scope", default=None)
+# 한 리포트의 섹션들이 여러 스레드에서 동시에 누적하므로 보호
+_scope_lock = threading.Lock()
+
+
+def current_endpoint() -> str:
+    scope = _current_scope.get()
+    return scope.endpoint if scope is not None else "-"
+
+
+@contextmanager
+def report_scope(endpoint: str):
+    """
+        with report_scope("interpret-gpt") as report:
+            ... GPT 호출들 ...
+        report.cost_usd  # 이 리포트에 든 비용
+
+    run_in_executor 는 contextvar를 복사하지 않으므로 스레드에서 실행되는 함수 안에서 엽니다.
+    """
+    scope = ReportScope(endpoint)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        if scope.calls or scope.fallbacks:
+            metrics.record_report(endpoint, scope.cost_usd, time.monotonic() - scope.started,
+                                  scope.calls, scope.fallbacks)
+
+
+def note_call_cost(cost_usd: float) -> None:
+    scope = _current_scope.get()
+    if scope is not None:
+        with _scope_lock:
+            scope.cost_usd += cost_usd
+            scope.calls += 1
+
+
+def record_fallback(section: str, reason=None, model: str = "-") -> None:
+    """템플릿 폴백 사용 기록 (현재 리포트 스코프의 엔드포인트 기준)"""
+    scope = _current_scope.get()
+    if scope is not None:
+        with _scope_lock:
+            scope.fallbacks += 1
+    metrics.record_fallback(current_endpoint(), section, model, str(reason or ""))
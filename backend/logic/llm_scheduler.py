@@ -0,0 +1,219 @@
+# backend/logic/llm_scheduler.py
+"""
+OpenAI 호출 스케줄러: 모델별 RPM/TPM 토큰 버킷 + 우선순위 대기열.
+유료 분석(PAID) > 화면 대기 중인 요청(INTERACTIVE) > 미리 생성(BACKGROUND) 순으로 쿼터를 배정합니다.
+한도는 env(LLM_RPM_* / LLM_TPM_*)로 설정한 것만 적용 — 설정하지 않은 한도는 대기 없이 통과.
+그때 OpenAI 429 는 브레이커 실패로 세지 않고(llm_client), 섹션 호출은 deadline 안에서 backoff 후 재시도,
+deadline 없는 호출은 OpenAI SDK 재시도가 처리
+호출부는 스레드에서 동기 실행되므로 threading.Condition 기반으로 블로킹 대기합니다.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+PRIORITY_PAID = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_PAID: "paid",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def _limit(name: str) -> Optional[int]:
+    """env 한도 (미설정·0 이하면 None = 제한 없음)"""
+    value = int(os.getenv(name) or 0)
+    return value if value > 0 else None
+
+
+# 모델별 분당 요청 수 / 분당 토큰 수 — OpenAI 계정 티어의 실제 한도를 env로 설정할 때만 적용
+MODEL_LIMITS = {
+    "gpt-4o": {"rpm": _limit("LLM_RPM_GPT_4O"), "tpm": _limit("LLM_TPM_GPT_4O")},
+    "gpt-4o-mini": {"rpm": _limit("LLM_RPM_GPT_4O_MINI"), "tpm": _limit("LLM_TPM_GPT_4O_MINI")},
+}
+DEFAULT_LIMITS = {"rpm": _limit("LLM_RPM_DEFAULT"), "tpm": _limit("LLM_TPM_DEFAULT")}
+
+
+class SchedulerTimeout(Exception):
+    """대기 시간 초과 (호출부에서 폴백으로 처리)"""
+
+
+class SystemClock:
+    """실제 시계. 테스트에서는 now()/wait()를 가진 가짜 시계로 교체"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def wait(self, cond: threading.Condition, timeout: Optional[float]) -> None:
+        cond.wait(timeout)
+
+
+class TokenBucket:
+    """용량 capacity, 초당 refill_rate 만큼 채워지는 버킷"""
+
+    def __init__(self, capacity: float, refill_rate: float, now: float):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.level = float(capacity)
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_rate)
+            self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        if self.level >= amount:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float("inf")
+        return (amount - self.level) / self.refill_rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+def _bucket(per_minute: Optional[int], now: float) -> Optional[TokenBucket]:
+    return TokenBucket(per_minute, per_minute / 60.0, now) if per_minute else None
+
+
+class _ModelState:
+    def __init__(self, limits: dict, now: float):
+        # None = 제한 없음
+        self.rpm = _bucket(limits.get("rpm"), now)
+        self.tpm = _bucket(limits.get("tpm"), now)
+        self.queue = []  # heap of (priority, seq)
+        self.granted = {p: 0 for p in PRIORITY_NAMES}
+        self.timeouts = {p: 0 for p in PRIORITY_NAMES}
+        self.wait_total = {p: 0.0 for p in PRIORITY_NAMES}
+        self.wait_max = {p: 0.0 for p in PRIORITY_NAMES}
+
+
+class LLMScheduler:
+    """
+        waited = scheduler.acquire("gpt-4o", est_tokens, PRIORITY_PAID)
+        ... 호출 ...
+        scheduler.settle("gpt-4o", est_tokens, actual_tokens)
+    """
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None, clock=None):
+        self.limits = limits if limits is not None else MODEL_LIMITS
+        self.clock = clock or SystemClock()
+        self._cond = threading.Condition()
+        self._models: Dict[str, _ModelState] = {}
+        self._seq = itertools.count()
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = _ModelState(self.limits.get(model, DEFAULT_LIMITS), self.clock.now())
+            self._models[model] = state
+        return state
+
+    def acquire(self, model: str, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> float:
+        """
+        RPM 1회 + TPM tokens 만큼 쿼터를 확보할 때까지 대기.
+        같은 모델 대기열의 맨 앞(우선순위 → 도착 순)만 쿼터를 가져갈 수 있습니다.
+        Returns: 대기한 시간(초). timeout 초과 시 SchedulerTimeout.
+        """
+        with self._cond:
+            state = self._state(model)
+            entry = (priority, next(self._seq))
+            heapq.heappush(state.queue, entry)
+            start = self.clock.now()
+            need = self._tpm_charge(state, tokens)
+            try:
+                while True:
+                    now = self.clock.now()
+                    wait: Optional[float] = None
+                    if state.queue[0] == entry:
+                        buckets = [(b, n) for b, n in ((state.rpm, 1), (state.tpm, need)) if b is not None]
+                        for bucket, _ in buckets:
+                            bucket.refill(now)
+                        wait = max((bucket.time_until(n) for bucket, n in buckets), default=0.0)
+                        if wait <= 0:
+                            for bucket, n in buckets:
+                                bucket.take(n)
+                            heapq.heappop(state.queue)
+                            waited = now - start
+                            state.granted[priority] += 1
+                            state.wait_total[priority] += waited
+                            state.wait_max[priority] = max(state.wait_max[priority], waited)
+                            self._cond.notify_all()
+                            return waited
+                    if timeout is not None:
+                        left = timeout - (now - start)
+                        if left <= 0:
+                            raise SchedulerTimeout(f"{model} 쿼터 대기 {timeout:.1f}s 초과")
+                        wait = left if wait is None else min(wait, left)
+                    self.clock.wait(self._cond, wait)
+            except BaseException:
+                if entry in state.queue:
+                    state.queue.remove(entry)
+                    heapq.heapify(state.queue)
+                    state.timeouts[priority] += 1
+                    self._cond.notify_all()
+                raise
+
+    @staticmethod
+    def _tpm_charge(state: _ModelState, tokens: int) -> float:
+        """acquire 때 TPM 버킷에서 실제로 가져가는 양 (버킷 용량보다 큰 요청은 용량만큼)"""
+        if state.tpm is None:
+            return 0.0
+        return min(float(tokens), state.tpm.capacity)
+
+    def settle(self, model: str, estimated: int, actual: Optional[int]) -> None:
+        """
+        호출 후 실제 사용 토큰으로 TPM 버킷 보정 (가져간 양보다 적게 썼으면 돌려주고, 많이 썼으면 더 차감).
+        estimated 는 acquire 에 넘긴 값 — 용량으로 잘린 경우 잘린 양 기준으로 맞춤
+        """
+        if actual is None:
+            return
+        with self._cond:
+            state = self._state(model)
+            if state.tpm is None:
+                return
+            diff = self._tpm_charge(state, estimated) - float(actual)
+            if diff > 0:
+                state.tpm.give_back(diff)
+            else:
+                state.tpm.take(-diff)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = self.clock.now()
+            result = {}
+            for model, state in self._models.items():
+                for bucket in (state.rpm, state.tpm):
+                    if bucket is not None:
+                        bucket.refill(now)
+                depth = {name: 0 for name in PRIORITY_NAMES.values()}
+                for priority, _ in state.queue:
+                    depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+                result[model] = {
+                    "queue_depth": depth,
+                    "rpm_available": round(state.rpm.level, 1) if state.rpm else None,
+                    "tpm_available": round(state.tpm.level) if state.tpm else None,
+                    "granted": {PRIORITY_NAMES[p]: n for p, n in state.granted.items()},
+                    "timeouts": {PRIORITY_NAMES[p]: n for p, n in state.timeouts.items()},
+                    "wait_avg_sec": {
+                        PRIORITY_NAMES[p]: round(state.wait_total[p] / state.granted[p], 3) if state.granted[p] else 0.0
+                        for p in PRIORITY_NAMES
+                    },
+                    "wait_max_sec": {PRIORITY_NAMES[p]: round(v, 3) for p, v in state.wait_max.items()},
+                }
+            return result
+
+
+# 프로세스 공용 스케줄러
+scheduler = LLMScheduler()
@@ -0,0 +1,224 @@
+# backend/logic/migrations.py
+"""
+앱 DB(logic/db.py APP_DB) 스키마 마이그레이션.
+
+번호 순서대로 한 번씩만 적용하고 schema_migrations 에 기록합니다.
+부팅 때는 schema_migrations 를 한 번 읽어 남은 게 없으면 바로 끝 (테이블·컬럼을 매번 다시 확인하지 않음).
+- 마이그레이션 하나 = 트랜잭션 하나 (BEGIN IMMEDIATE — 워커 여러 개가 동시에 떠도 한 번만 적용)
+- 이미 배포된 마이그레이션은 고치지 말고 새 번호로 추가 (ALTER TABLE 등)
+- 003 import_legacy_files: 예전 파일별 DB(users.db / saju.db / payments.db / contact.db)가
+  같은 폴더에 있으면 행을 id 그대로 옮겨 옴. 옛 파일은 지우지 않으니 확인 후 직접 정리
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from logic import db
+
+LEGACY_IMPORT_CHUNK = 1000
+
+
+def _create_users(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider TEXT NOT NULL,
+            provider_id TEXT NOT NULL,
+            email TEXT,
+            nickname TEXT,
+            created_at TEXT NOT NULL,
+            last_login TEXT NOT NULL,
+            seed_balance INTEGER DEFAULT 0,
+            UNIQUE(provider, provider_id)
+        )
+    """)
+    # 씨앗 증감 원장 (추가만 가능 — 잔액 변경과 같은 트랜잭션에서 기록)
+    conn.execute("""
+        CREATE TABLE seed_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            delta INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            ref TEXT,
+            created_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_seed_ledger_user_id ON seed_ledger(user_id, id)")
+    # 결제 충전은 주문번호(ref)당 한 번만
+    conn.execute("CREATE UNIQUE INDEX idx_seed_ledger_purchase_ref ON seed_ledger(ref) WHERE reason = 'purchase'")
+    conn.execute("""
+        CREATE TRIGGER trg_seed_ledger_no_update BEFORE UPDATE ON seed_ledger
+        BEGIN SELECT RAISE(ABORT, 'seed_ledger is append-only'); END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_seed_ledger_no_delete BEFORE DELETE ON seed_ledger
+        BEGIN SELECT RAISE(ABORT, 'seed_ledger is append-only'); END
+    """)
+
+
+def _create_saju_payments_inquiries(conn: sqlite3.Connection) -> None:
+    # 명식 컬럼(solar_datetime ~ chart_version)은 logic/chart_compute.py CHART_COLUMNS
+    conn.execute("""
+        CREATE TABLE saju (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            relation TEXT,
+            birthdate TEXT NOT NULL,
+            birth_time TEXT,
+            calendar_type TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            solar_datetime TEXT,
+            year_idx INTEGER,
+            month_idx INTEGER,
+            day_idx INTEGER,
+            hour_idx INTEGER,
+            chart_summary TEXT,
+            chart_version INTEGER
+        )
+    """)
+    # 목록 정렬(created_at DESC, id DESC)과 키셋 조건을 인덱스 순서 그대로 읽도록 (user_id 단독 조회/COUNT 도 겸함)
+    conn.execute("CREATE INDEX idx_saju_user_created ON saju(user_id, created_at DESC, id DESC)")
+    conn.execute("""
+        CREATE TABLE payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            payment_id TEXT NOT NULL,
+            order_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            product_key TEXT,
+            account_id INTEGER,
+            seeds INTEGER DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX idx_payments_order_id ON payments(order_id)")
+    # /payment/create 에서 발급한 주문 (상품과 로그인 사용자를 확인 시점까지 보관)
+    conn.execute("""
+        CREATE TABLE payment_orders (
+            order_id TEXT PRIMARY KEY,
+            user_id TEXT,
+            account_id INTEGER,
+            product_key TEXT,
+            amount INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE inquiries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+
+# 예전 파일 → 옮길 테이블
+LEGACY_FILES = {
+    "users.db": ("users", "seed_ledger"),
+    "saju.db": ("saju",),
+    "payments.db": ("payments", "payment_orders"),
+    "contact.db": ("inquiries",),
+}
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _import_legacy_files(conn: sqlite3.Connection) -> None:
+    main_file = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main"), "")
+    if not main_file:
+        return
+    folder = Path(main_file).parent
+    for filename, tables in LEGACY_FILES.items():
+        path = folder / filename
+        if not path.exists():
+            continue
+        legacy = sqlite3.connect(str(path))
+        try:
+            for table in tables:
+                # 옛 파일에는 나중에 추가된 컬럼(seed_balance, 명식 컬럼 등)이 없을 수 있으므로 공통 컬럼만
+                legacy_columns = set(_columns(legacy, table))
+                columns = [c for c in _columns(conn, table) if c in legacy_columns]
+                if not columns:
+                    continue
+                names = ", ".join(columns)
+                cur = legacy.execute(f"SELECT {names} FROM {table}")
+                copied = 0
+                while True:
+                    rows = cur.fetchmany(LEGACY_IMPORT_CHUNK)
+                    if not rows:
+                        break
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({', '.join('?' * len(columns))})", rows
+                    )
+                    copied += len(rows)
+                print(f"📦 {filename}:{table} → {copied}행 이전")
+        finally:
+            legacy.close()
+
+
+def _unique_payment_id(conn: sqlite3.Connection) -> None:
+    # PortOne 결제 하나는 주문 하나에만 (같은 결제 ID로 다른 주문 적립 방지)
+    duplicates = conn.execute(
+        "SELECT payment_id, COUNT(*) FROM payments GROUP BY payment_id HAVING COUNT(*) > 1"
+    ).fetchall()
+    if duplicates:
+        raise RuntimeError(f"payments.payment_id 중복 — 확인 후 정리 필요: {duplicates[:10]}")
+    conn.execute("CREATE UNIQUE INDEX idx_payments_payment_id ON payments(payment_id)")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "users_and_seed_ledger", _create_users),
+    (2, "saju_payments_inquiries", _create_saju_payments_inquiries),
+    (3, "import_legacy_files", _import_legacy_files),
+    (4, "unique_payment_id", _unique_payment_id),
+]
+
+
+def migrate(path: Optional[Path] = None) -> List[int]:
+    """남은 마이그레이션을 번호 순으로 적용하고 적용한 번호 목록을 반환"""
+    with db.connection(path or db.APP_DB) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+        )
+        applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+        done = []
+        for version, name, apply in MIGRATIONS:
+            if version in applied:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 다른 워커가 먼저 적용했을 수 있음 (쓰기 잠금을 잡은 뒤 다시 확인)
+                if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                    conn.rollback()
+                    continue
+                apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.utcnow().isoformat()),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            done.append(version)
+            print(f"🗄️ 마이그레이션 {version:03d}_{name} 적용")
+        return done
+
+
+def current_version(path: Optional[Path] = None) -> int:
+    with db.connection(path or db.APP_DB) as conn:
+        try:
+            row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+        except sqlite3.OperationalError:
+            return 0  # 아직 마이그레이션 전
+    return row[0] or 0
@@ -0,0 +1,128 @@
+# backend/logic/payment_confirm.py
+"""
+결제 확인(/payment/confirm) — 같은 주문을 여러 번 확인해도 PortOne 조회·저장·씨앗 적립이 한 번만 일어나게.
+
+1) payments 에 order_id 기록이 있으면 PortOne 을 부르지 않고 저장된 결과를 바로 반환
+2) 같은 order_id 의 동시 확인은 프로세스 안에서 하나로 병합 (SingleFlight)
+3) 검증 후 씨앗 적립(씨앗 상품일 때)과 payments 기록을 한 트랜잭션으로 (payment_db.record_paid_order)
+   다른 워커 프로세스와 겹쳐도 order_id·payment_id 유니크 제약으로 한 번만 반영됩니다.
+검증: PortOne 결제를 조회해 status(PAID), 결제 ID(= 프론트가 paymentId 로 넘긴 orderId), 금액, 통화가
+/payment/create 에서 저장한 주문과 모두 맞아야 기록합니다. PortOne 시크릿이 없으면 검증할 수 없으므로 503.
+적립 대상은 주문 발급 때의 로그인 사용자, 없으면 확인 요청의 로그인 사용자 (요청 본문의 user_id 는 쓰지 않음).
+검증에 실패하면 아무것도 저장하지 않으므로 재시도 시 다시 검증합니다.
+"""
+from typing import Awaitable, Callable, Optional
+
+from logic.db import run_db
+from logic.payment_db import get_order, get_payment, record_paid_order
+from logic.single_flight import SingleFlight
+
+PAID_STATUSES = ("PAID", "paid")
+PAYMENT_CURRENCY = "KRW"
+
+
+class PaymentError(Exception):
+    """확인 실패 (라우트에서 status_code/detail 그대로 HTTPException 으로)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _result(record: dict, payment_id: str, duplicate: bool) -> dict:
+    if record["payment_id"] != payment_id:
+        raise PaymentError(409, "이미 다른 결제로 확인된 주문입니다.")
+    return {
+        "success": True,
+        "order_id": record["order_id"],
+        "seeds_credited": record["seeds"] or 0,
+        "account_id": record["account_id"],
+        "duplicate": duplicate,
+    }
+
+
+class PaymentConfirmer:
+    """
+    fetch_payment(payment_id) -> PortOne 결제 조회 응답 (id, status, amount.total, currency)
+                                 None 이면 검증 불가 — 시크릿 미설정, 확인 요청은 503
+    seed_products: product_key → {"seeds": n, ...}
+    """
+
+    def __init__(self, fetch_payment: Optional[Callable[[str], Awaitable[dict]]], seed_products: dict):
+        self.fetch_payment = fetch_payment
+        self.seed_products = seed_products
+        self.flight = SingleFlight("payment_confirm")
+        self._verified = 0
+        self._replayed = 0
+        self._rejected = 0
+
+    async def confirm(self, user_id: str, payment_id: str, order_id: str, account_id: Optional[int] = None) -> dict:
+        """account_id: 확인 요청의 로그인 사용자 (세션에서 확인한 값만)"""
+        record = await run_db(get_payment, order_id)
+        if record is not None:
+            self._replayed += 1
+            return _result(record, payment_id, duplicate=True)
+        try:
+            record = await self.flight.do(
+                f"payment:{order_id}", lambda: self._verify_and_record(user_id, payment_id, order_id, account_id)
+            )
+        except PaymentError:
+            self._rejected += 1
+            raise
+        return _result(record, payment_id, duplicate=False)
+
+    async def _verify(self, payment_id: str, order: dict) -> None:
+        """PortOne 결제가 주문과 맞는지 확인 (맞지 않으면 PaymentError)"""
+        if self.fetch_payment is None:
+            raise PaymentError(503, "결제 검증이 설정되지 않았습니다.")
+        self._verified += 1
+        try:
+            payment = await self.fetch_payment(payment_id)
+        except Exception as e:
+            print(f"⚠️ PortOne 결제 검증 실패: {e}")
+            raise PaymentError(502, "결제 검증 실패")
+        if payment.get("status") not in PAID_STATUSES:
+            raise PaymentError(400, "결제 상태가 완료가 아닙니다.")
+        amount = (payment.get("amount") or {}).get("total")
+        mismatch = [
+            name for name, ok in (
+                ("orderId", payment.get("id") == order["order_id"]),
+                ("amount", amount == order["amount"]),
+                ("currency", payment.get("currency") == PAYMENT_CURRENCY),
+            ) if not ok
+        ]
+        if mismatch:
+            print(f"⚠️ 결제·주문 불일치 ({', '.join(mismatch)}): payment_id={payment_id}, order_id={order['order_id']}, "
+                  f"amount={amount}/{order['amount']}")
+            raise PaymentError(400, "결제 정보가 주문과 일치하지 않습니다.")
+
+    async def _verify_and_record(self, user_id: str, payment_id: str, order_id: str,
+                                 account_id: Optional[int]) -> dict:
+        # 병합 직전에 다른 요청이 끝냈을 수 있음
+        record = await run_db(get_payment, order_id)
+        if record is not None:
+            return record
+        order = await run_db(get_order, order_id)
+        if order is None:
+            print(f"⚠️ 발급 기록 없는 주문 확인: order_id={order_id}")
+            raise PaymentError(404, "주문을 찾을 수 없습니다.")
+        product_key = order["product_key"]
+        seeds = (self.seed_products.get(product_key) or {}).get("seeds", 0)
+        # 적립 대상: 주문 발급 때 로그인 사용자 → 확인 요청의 로그인 사용자
+        account_id = order["account_id"] or account_id
+        if seeds and not account_id:
+            raise PaymentError(401, "씨앗을 적립할 로그인 사용자를 확인할 수 없습니다.")
+        await self._verify(payment_id, order)
+
+        record = await run_db(record_paid_order, user_id, payment_id, order_id, account_id, product_key, seeds)
+        if record is None:
+            # order_id 는 비어 있는데 기록되지 않음 → 같은 payment_id 가 다른 주문에 이미 쓰임
+            raise PaymentError(409, "이미 다른 주문에 사용된 결제입니다.")
+        if record["seeds"]:
+            print(f"🌱 씨앗 적립: user_id={account_id}, +{seeds} (order_id={order_id})")
+        return record
+
+    def stats(self) -> dict:
+        return {"verified": self._verified, "replayed": self._replayed, "rejected": self._rejected,
+                **self.flight.stats()}
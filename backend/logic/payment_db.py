@@ -1,45 +1,90 @@
 # backend/logic/payment_db.py
 """결제 내역 저장용 SQLite."""
 import sqlite3
-from pathlib import Path
 from datetime import datetime
 
-DB_DIR = Path(__file__).resolve().parent
-PAYMENTS_DB = DB_DIR / "payments.db"
+from logic.db import app_connection
+from logic.user_db import add_seeds
+
+_PAYMENT_COLUMNS = ("user_id", "payment_id", "order_id", "status", "created_at", "product_key", "account_id", "seeds")
 
 
 def get_conn():
-    return sqlite3.connect(PAYMENTS_DB)
-
-
-def init_payments_db():
-    conn = get_conn()
-    try:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS payments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                payment_id TEXT NOT NULL,
-                order_id TEXT NOT NULL,
-                status TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
+    return app_connection()
+
+
+def create_order(order_id: str, user_id: str | None, account_id: int | None, product_key: str | None, amount: int):
+    with get_conn() as conn:
         conn.execute(
-            "CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_order_id ON payments(order_id)"
+            "INSERT INTO payment_orders (order_id, user_id, account_id, product_key, amount, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (order_id, user_id, account_id, product_key, amount, datetime.utcnow().isoformat()),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
-def save_payment(user_id: str, payment_id: str, order_id: str, status: str = "paid"):
-    conn = get_conn()
-    try:
-        conn.execute(
-            "INSERT INTO payments (user_id, payment_id, order_id, status, created_at) VALUES (?, ?, ?, ?, ?)",
-            (user_id, payment_id, order_id, status, datetime.utcnow().isoformat()),
+def get_order(order_id: str) -> dict | None:
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT order_id, user_id, account_id, product_key, amount, created_at FROM payment_orders WHERE order_id = ?",
+            (order_id,),
+        ).fetchone()
+    if not row:
+        return None
+    return dict(zip(("order_id", "user_id", "account_id", "product_key", "amount", "created_at"), row))
+
+
+def get_payment(order_id: str) -> dict | None:
+    """order_id로 저장된 결제 확인 기록 (없으면 None)"""
+    with get_conn() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(_PAYMENT_COLUMNS)} FROM payments WHERE order_id = ?",
+            (order_id,),
+        ).fetchone()
+    return dict(zip(_PAYMENT_COLUMNS, row)) if row else None
+
+
+def save_payment(
+    user_id: str,
+    payment_id: str,
+    order_id: str,
+    status: str = "paid",
+    product_key: str | None = None,
+    account_id: int | None = None,
+    seeds: int = 0,
+) -> bool:
+    """결제 기록 저장. 같은 order_id 또는 payment_id가 이미 있으면 저장하지 않고 False"""
+    with get_conn() as conn:
+        cur = conn.execute(
+            "INSERT INTO payments (user_id, payment_id, order_id, status, created_at, product_key, account_id, seeds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (user_id, payment_id, order_id, status, datetime.utcnow().isoformat(), product_key, account_id, seeds),
         )
         conn.commit()
-    finally:
-        conn.close()
+        return cur.rowcount == 1
+
+
+def record_paid_order(user_id: str, payment_id: str, order_id: str, account_id: int | None,
+                      product_key: str | None, seeds: int) -> dict | None:
+    """
+    검증된 결제 반영: 씨앗 적립(seeds > 0 이고 적립 대상이 있을 때)과 결제 기록을 한 트랜잭션으로.
+    같은 order_id 가 이미 기록돼 있으면 적립까지 되돌리고 기존 기록을 반환합니다.
+    payment_id 가 다른 주문에 이미 쓰였으면 마찬가지로 되돌리고 None (이 order_id 기록이 없으므로).
+    """
+    with get_conn() as conn:
+        try:
+            credited = 0
+            if seeds and account_id and add_seeds(conn, account_id, seeds, "purchase", ref=order_id) is not None:
+                credited = seeds
+            cur = conn.execute(
+                "INSERT INTO payments (user_id, payment_id, order_id, status, created_at, product_key, account_id, seeds) "
+                "VALUES (?, ?, ?, 'paid', ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                (user_id, payment_id, order_id, datetime.utcnow().isoformat(), product_key, account_id, credited),
+            )
+            if cur.rowcount == 1:
+                conn.commit()
+            else:
+                conn.rollback()  # 다른 요청이 먼저 기록함 (또는 payment_id 재사용)
+        except sqlite3.IntegrityError:
+            conn.rollback()  # 같은 주문 적립이 이미 있음 (다른 요청이 먼저 기록함)
+    return get_payment(order_id)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 예산 기반 프롬프트 조립기
+
+- 토큰 수는 tiktoken이 설치돼 있으면 실제 인코더로, 없으면 오프라인 보정 근사치로 계산합니다.
+- 섹션별 토큰 상한을 두고, 넘치면 문장 경계에서 자릅니다 (글자 수 슬라이싱 대체).
+- 호출마다 추정 토큰과 응답 usage의 실제 prompt_tokens(캐시 적중 토큰 포함)를 로그로 남깁니다.
+- 고정 섹션(add_static)은 system 메시지 앞부분에 그대로 이어 붙여, 호출 간 byte 단위로 같은 prefix를 만듭니다.
+  OpenAI는 1024토큰 이상 같은 prefix를 캐시해 할인/가속하므로 차트별 내용은 항상 그 뒤(user)에 둡니다.
+"""
+
+import hashlib
+import re
+from typing import List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성
+    tiktoken = None
+
+# 호출별 전체 입력(system + user) 토큰 예산
+PROMPT_BUDGETS = {
+    "element": 6000,
+    "comprehensive": 9000,
+    "comprehensive_section": 5000,
+    "core_values": 1500,
+    "section1": 6000,
+    "concern": 3000,
+}
+
+# tiktoken 없을 때 쓰는 글자 종류별 토큰 가중치 (인코더별 한국어 평균 토큰 비율 기준 근사치).
+# 정확한 값이 필요하면 tiktoken을 설치하면 자동으로 실제 인코더를 사용합니다.
+_CHAR_WEIGHTS = {
+    "o200k_base": {"hangul": 0.85, "cjk": 1.0, "ascii": 0.27, "other": 0.6},
+    "cl100k_base": {"hangul": 1.35, "cjk": 1.3, "ascii": 0.27, "other": 0.8},
+}
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+_CJK_RE = re.compile(r"[一-鿿㐀-䶿]")
+_ASCII_RE = re.compile(r"[\x00-\x7f]")
+
+# 문장 경계: 마침표류 뒤 공백, 또는 줄바꿈
+_SENTENCE_END_RE = re.compile(r"[.!?。…](?=\s)|\n")
+
+TRUNCATION_MARK = "\n... (이하 생략)"
+
+_encoders = {}
+
+
+def _encoding_name(model: str) -> str:
+    m = (model or "").lower()
+    if m.startswith("gpt-4o") or m.startswith("o1") or m.startswith("gpt-4.1"):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+def _get_encoder(encoding: str):
+    if tiktoken is None:
+        return None
+    if encoding not in _encoders:
+        try:
+            _encoders[encoding] = tiktoken.get_encoding(encoding)
+        except Exception:
+            _encoders[encoding] = None
+    return _encoders[encoding]
+
+
+def estimate_tokens(text: str, model: str = "gpt-4o") -> int:
+    """텍스트 토큰 수 (tiktoken 우선, 없으면 보정 근사치)"""
+    if not text:
+        return 0
+    encoding = _encoding_name(model)
+    encoder = _get_encoder(encoding)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    w = _CHAR_WEIGHTS[encoding]
+    hangul = len(_HANGUL_RE.findall(text))
+    cjk = len(_CJK_RE.findall(text))
+    ascii_ = len(_ASCII_RE.findall(text))
+    other = len(text) - hangul - cjk - ascii_
+    return int(hangul * w["hangul"] + cjk * w["cjk"] + ascii_ * w["ascii"] + other * w["other"] + 0.5)
+
+
+def trim_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o", mark: str = TRUNCATION_MARK) -> str:
+    """max_tokens 안에 들어가도록 문장 경계에서 자름. 이미 들어가면 그대로 반환"""
+    if not text or max_tokens <= 0:
+        return ""
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(mark, model)
+    cuts = [m.end() for m in _SENTENCE_END_RE.finditer(text)]
+    # 문장 경계가 없으면 문단 대신 글자 단위로라도 자름
+    if not cuts:
+        cuts = list(range(1, len(text)))
+    # 경계 위치 중 예산에 맞는 가장 긴 prefix를 이분 탐색
+    lo, hi = 0, len(cuts)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if estimate_tokens(text[:cuts[mid]], model) <= limit:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return ""
+    return text[:cuts[lo - 1]].rstrip() + mark
+
+
+class _Section:
+    __slots__ = ("name", "text", "max_tokens", "shrink", "tokens")
+
+    def __init__(self, name, text, max_tokens, shrink):
+        self.name = name
+        self.text = text or ""
+        self.max_tokens = max_tokens
+        self.shrink = shrink
+        self.tokens = 0
+
+
+def cached_prompt_tokens(response) -> Optional[int]:
+    """응답 usage.prompt_tokens_details.cached_tokens (SDK 버전에 따라 객체 또는 dict)"""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        return None
+    if isinstance(details, dict):
+        return details.get("cached_tokens")
+    return getattr(details, "cached_tokens", None)
+
+
+class PromptBuilder:
+    """
+    섹션 단위 프롬프트 조립기.
+
+        pb = PromptBuilder("comprehensive", model="gpt-4o")
+        pb.add_static("guide", GUIDE)             # 고정: system 앞부분 (호출 간 동일)
+        pb.add_static("tone", tone_prompt)        # 톤별로만 달라지는 부분은 고정 섹션 맨 뒤
+        pb.add("analysis", analysis_info)         # 가변: user
+        pb.add("theory", theories, max_tokens=3500, shrink=True)
+        messages = pb.messages()
+        ... 호출 후 pb.log_usage(response)
+
+    - max_tokens: 섹션 자체 상한 (넘치면 문장 경계에서 자름)
+    - shrink=True: 전체 예산 초과 시 줄여도 되는 섹션 (이론 발췌 등)
+    - 고정 섹션은 자르지 않음 (잘리면 prefix가 호출마다 달라져 캐시가 깨짐)
+    """
+
+    def __init__(self, call_name: str, model: str = "gpt-4o", budget_tokens: Optional[int] = None):
+        self.call_name = call_name
+        self.model = model
+        self.budget_tokens = budget_tokens if budget_tokens is not None else PROMPT_BUDGETS.get(call_name)
+        self.sections: List[_Section] = []
+        self.static_sections: List[_Section] = []
+        self.system_tokens = 0
+        self.estimated_tokens = 0
+        self.prefix_hash = ""
+
+    def add_static(self, name: str, text: str) -> "PromptBuilder":
+        if text:
+            self.static_sections.append(_Section(name, text, None, False))
+        return self
+
+    def system_text(self, system_prompt: str = "") -> str:
+        """고정 섹션들 + system_prompt 를 이어 붙인 system 메시지"""
+        parts = [s.text for s in self.static_sections]
+        if system_prompt:
+            parts.append(system_prompt)
+        return "\n\n".join(parts)
+
+    def add(self, name: str, text: str, max_tokens: Optional[int] = None, shrink: bool = False) -> "PromptBuilder":
+        if text:
+            self.sections.append(_Section(name, text, max_tokens, shrink))
+        return self
+
+    def build(self, system_prompt: str = "") -> str:
+        """섹션별 상한 → 전체 예산 순으로 맞춘 뒤 user 프롬프트 반환"""
+        for s in self.sections:
+            if s.max_tokens is not None:
+                s.text = trim_to_tokens(s.text, s.max_tokens, self.model)
+            s.tokens = estimate_tokens(s.text, self.model)
+        for s in self.static_sections:
+            s.tokens = estimate_tokens(s.text, self.model)
+        system = self.system_text(system_prompt)
+        self.system_tokens = estimate_tokens(system, self.model)
+        # 같은 prefix인지 로그로 확인할 수 있도록 system 해시 기록
+        self.prefix_hash = hashlib.sha1(system.encode("utf-8")).hexdigest()[:8] if system else ""
+
+        if self.budget_tokens:
+            fixed = self.system_tokens + sum(s.tokens for s in self.sections if not s.shrink)
+            shrinkable = [s for s in self.sections if s.shrink]
+            total_shrinkable = sum(s.tokens for s in shrinkable)
+            room = max(self.budget_tokens - fixed, 0)
+            if total_shrinkable > room:
+                # 줄일 수 있는 섹션들에 남은 예산을 현재 크기 비율로 배분
+                for s in shrinkable:
+                    share = room * s.tokens // total_shrinkable if total_shrinkable else 0
+                    s.text = trim_to_tokens(s.text, share, self.model)
+                    s.tokens = estimate_tokens(s.text, self.model)
+
+        user_prompt = "\n\n".join(s.text for s in self.sections if s.text)
+        self.estimated_tokens = self.system_tokens + estimate_tokens(user_prompt, self.model)
+        return user_prompt
+
+    def messages(self, system_prompt: str = "") -> list:
+        """system(고정) + user(가변) 메시지 목록 (build 포함)"""
+        user_prompt = self.build(system_prompt)
+        return [
+            {"role": "system", "content": self.system_text(system_prompt)},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def breakdown(self) -> str:
+        static = "+".join(f"{s.name}:{s.tokens}" for s in self.static_sections)
+        system = f"system={self.system_tokens}" + (f"({static})" if static else "")
+        if self.prefix_hash:
+            system += f"#{self.prefix_hash}"
+        parts = [system] + [f"{s.name}={s.tokens}" for s in self.sections if s.text]
+        return ", ".join(parts)
+
+    def log_usage(self, response=None) -> None:
+        """추정 토큰 + (있으면) 응답 usage의 실제 prompt/completion 토큰 로그"""
+        usage = getattr(response, "usage", None)
+        actual = getattr(usage, "prompt_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+        budget = f"/{self.budget_tokens}" if self.budget_tokens else ""
+        if actual is not None:
+            print(
+                f"🧮 [{self.call_name}] prompt_tokens={actual} (추정 {self.estimated_tokens}{budget}, "
+                f"cached {cached_prompt_tokens(response) or 0}), "
+                f"completion_tokens={completion} | {self.breakdown()}"
+            )
+        else:
+            print(f"🧮 [{self.call_name}] 추정 prompt_tokens={self.estimated_tokens}{budget} | {self.breakdown()}")
+
+
+def count_messages_tokens(messages: list, model: str = "gpt-4o") -> int:
+    """chat 메시지 목록의 대략적인 입력 토큰 (메시지당 오버헤드 4토큰 포함)"""
+    return sum(estimate_tokens(m.get("content") or "", model) + 4 for m in messages) + 2
+
+
+def log_prompt_tokens(call_name: str, messages: list, response=None, model: str = "gpt-4o") -> None:
+    """PromptBuilder 없이 조립한 메시지용 토큰 로그 (추정치 + 응답 usage 실제값)"""
+    estimated = count_messages_tokens(messages, model)
+    usage = getattr(response, "usage", None)
+    actual = getattr(usage, "prompt_tokens", None)
+    if actual is not None:
+        print(f"🧮 [{call_name}] prompt_tokens={actual} (추정 {estimated}, cached {cached_prompt_tokens(response) or 0}), "
+              f"completion_tokens={getattr(usage, 'completion_tokens', None)}")
+    else:
+        print(f"🧮 [{call_name}] 추정 prompt_tokens={estimated}")
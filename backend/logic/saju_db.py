@@ -1,112 +1,114 @@
 """사주 저장용 SQLite. 로그인한 user_id별로 저장되며, 로그인/재접속 시 초기화되지 않고 계속 유지됩니다."""
-import sqlite3
-from pathlib import Path
+import base64
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple
 
-DB_DIR = Path(__file__).resolve().parent
-SAJU_DB = DB_DIR / "saju.db"
+from logic.chart_compute import CHART_COLUMNS, chart_from_columns, chart_to_columns
+from logic.db import app_connection
 
+# /api/saju/list 한 페이지 최대 개수
+SAJU_PAGE_MAX = 100
 
-def get_conn():
-    return sqlite3.connect(SAJU_DB)
+_SAJU_COLUMNS = (
+    "id, user_id, name, relation, birthdate, birth_time, calendar_type, gender, created_at, "
+    + ", ".join(CHART_COLUMNS)
+)
 
 
-def init_saju_db():
-    """saju 테이블 초기화."""
-    conn = get_conn()
-    try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS saju (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                relation TEXT,
-                birthdate TEXT NOT NULL,
-                birth_time TEXT,
-                calendar_type TEXT NOT NULL,
-                gender TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_saju_user_id ON saju(user_id)"
-        )
-        conn.commit()
-    finally:
-        conn.close()
+def get_conn():
+    return app_connection()
 
 
 def get_saju_count_for_user(user_id: int) -> int:
     """해당 user_id의 사주 개수 반환."""
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         cur = conn.execute(
             "SELECT COUNT(*) FROM saju WHERE user_id = ?",
             (user_id,),
         )
         row = cur.fetchone()
         return int(row[0]) if row and row[0] is not None else 0
-    finally:
-        conn.close()
 
 
 def get_saju_by_id(saju_id: int, user_id: int) -> Optional[dict]:
     """saju_id에 해당하는 사주 한 건 조회. user_id가 일치할 때만 반환."""
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         cur = conn.execute(
-            "SELECT id, user_id, name, relation, birthdate, birth_time, calendar_type, gender, created_at FROM saju WHERE id = ? AND user_id = ?",
+            f"SELECT {_SAJU_COLUMNS} FROM saju WHERE id = ? AND user_id = ?",
             (saju_id, user_id),
         )
         row = cur.fetchone()
-        if not row:
-            return None
-        return {
-            "id": row[0],
-            "user_id": row[1],
-            "name": row[2],
-            "relation": row[3],
-            "birthdate": row[4],
-            "birth_time": row[5],
-            "calendar_type": row[6],
-            "gender": row[7],
-            "created_at": row[8],
-        }
-    finally:
-        conn.close()
+        return _row_to_dict(row) if row else None
+
+
+def _row_to_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "name": row[2],
+        "relation": row[3],
+        "birthdate": row[4],
+        "birth_time": row[5],
+        "calendar_type": row[6],
+        "gender": row[7],
+        "created_at": row[8],
+        # 계산 전(backfill 대기)이거나 옛 버전이면 None
+        "chart": chart_from_columns(tuple(row[9:])),
+    }
 
 
 def get_saju_list_for_user(user_id: int) -> List[dict]:
     """해당 user_id의 사주 전체 목록 (최신 생성 순) 반환."""
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         cur = conn.execute(
-            "SELECT id, user_id, name, relation, birthdate, birth_time, calendar_type, gender, created_at "
-            "FROM saju WHERE user_id = ? ORDER BY created_at DESC",
+            f"SELECT {_SAJU_COLUMNS} FROM saju WHERE user_id = ? ORDER BY created_at DESC, id DESC",
             (user_id,),
         )
-        rows = cur.fetchall()
-        result: List[dict] = []
-        for row in rows:
-            result.append(
-                {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "name": row[2],
-                    "relation": row[3],
-                    "birthdate": row[4],
-                    "birth_time": row[5],
-                    "calendar_type": row[6],
-                    "gender": row[7],
-                    "created_at": row[8],
-                }
-            )
-        return result
-    finally:
-        conn.close()
+        return [_row_to_dict(row) for row in cur.fetchall()]
+
+
+def encode_list_cursor(row: dict) -> str:
+    """페이지 마지막 항목 → 다음 페이지 커서 (created_at, id)"""
+    raw = f"{row['created_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_list_cursor(cursor: str) -> Tuple[str, int]:
+    """잘못된 커서면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, saju_id = raw.rsplit("|", 1)
+        return created_at, int(saju_id)
+    except Exception as e:
+        raise ValueError(f"잘못된 커서: {cursor!r}") from e
+
+
+def get_saju_page_for_user(user_id: int, limit: int, after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    키셋 페이지네이션 (최신 생성 순). after 는 이전 페이지의 next_cursor.
+    OFFSET 없이 인덱스에서 커서 위치부터 limit개만 읽으므로 뒤쪽 페이지도 비용이 같습니다.
+    Returns: (rows, next_cursor — 마지막 페이지면 None)
+    """
+    limit = max(1, min(limit, SAJU_PAGE_MAX))
+    # 한 개 더 읽어 다음 페이지 유무 판단
+    rows = get_saju_rows_after(user_id, limit + 1, decode_list_cursor(after) if after else None)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_list_cursor(rows[-1])
+    return rows, None
+
+
+def get_saju_rows_after(user_id: int, limit: int, after: Optional[Tuple[str, int]] = None) -> List[dict]:
+    """(created_at, id) 키 after 다음부터 최신 생성 순으로 limit개 (내보내기처럼 끝까지 이어 읽을 때)"""
+    sql = f"SELECT {_SAJU_COLUMNS} FROM saju WHERE user_id = ?"
+    params: list = [user_id]
+    if after:
+        sql += " AND (created_at, id) < (?, ?)"
+        params += list(after)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    with get_conn() as conn:
+        return [_row_to_dict(row) for row in conn.execute(sql, params).fetchall()]
 
 
 def save_saju_for_user(
@@ -117,20 +119,20 @@ def save_saju_for_user(
     birth_time: Optional[str],
     calendar_type: str,
     gender: str,
+    chart: Optional[dict] = None,
 ) -> int:
-    """새 사주 한 건 저장 후 row id 반환."""
+    """새 사주 한 건 저장 후 row id 반환. chart 는 chart_compute.compute_chart 결과 (없으면 NULL)."""
     now = datetime.utcnow().isoformat()
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         conn.execute(
-            """
+            f"""
             INSERT INTO saju (
                 user_id, name, relation,
                 birthdate, birth_time,
                 calendar_type, gender,
-                created_at
+                created_at, {", ".join(CHART_COLUMNS)}
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(CHART_COLUMNS))})
             """,
             (
                 user_id,
@@ -141,12 +143,43 @@ def save_saju_for_user(
                 calendar_type,
                 gender,
                 now,
+                *chart_to_columns(chart),
             ),
         )
         conn.commit()
         cur = conn.execute("SELECT last_insert_rowid()")
         row = cur.fetchone()
         return int(row[0]) if row and row[0] is not None else 0
-    finally:
-        conn.close()
 
+
+
+def update_saju_charts(updates: List[Tuple[int, dict]]) -> None:
+    """[(saju_id, chart)] 명식 컬럼 일괄 갱신 (한 트랜잭션)"""
+    if not updates:
+        return
+    assignments = ", ".join(f"{column} = ?" for column in CHART_COLUMNS)
+    with get_conn() as conn:
+        conn.executemany(
+            f"UPDATE saju SET {assignments} WHERE id = ?",
+            [(*chart_to_columns(chart), saju_id) for saju_id, chart in updates],
+        )
+        conn.commit()
+
+
+def iter_rows_needing_chart(version: int, batch_size: int) -> Iterator[List[tuple]]:
+    """
+    명식이 없거나 version 보다 옛 버전인 행을 id 순 배치로 [(id, birthdate, birth_time, calendar_type)].
+    id 키셋으로 읽으므로 전체를 메모리에 올리지 않고, 실패로 남은 행 때문에 같은 배치를 반복하지 않습니다.
+    """
+    last_id = 0
+    while True:
+        with get_conn() as conn:
+            batch = conn.execute(
+                "SELECT id, birthdate, birth_time, calendar_type FROM saju "
+                "WHERE id > ? AND (chart_version IS NULL OR chart_version < ?) ORDER BY id LIMIT ?",
+                (last_id, version, batch_size),
+            ).fetchall()
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        yield batch
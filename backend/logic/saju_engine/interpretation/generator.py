@@ -40,6 +40,10 @@ class InterpretationGenerator:
         patterns = match_patterns(analysis)
         analysis['patterns'] = patterns
 
+        return self._render(analysis, tone, sections)
+
+    def _render(self, analysis, tone, sections=None):
+        """패턴 매칭이 끝난 analysis로 섹션 렌더링"""
         # 섹션 선택
         if sections is None:
             sections = list(self.sections.keys())
@@ -65,10 +69,11 @@ class InterpretationGenerator:
                 'fun': [...]
             }
         """
+        # 패턴 매칭은 톤과 무관하므로 한 번만
+        analysis['patterns'] = match_patterns(analysis)
         return {
-            'empathy': self.generate(analysis, tone='empathy', sections=sections),
-            'reality': self.generate(analysis, tone='reality', sections=sections),
-            'fun': self.generate(analysis, tone='fun', sections=sections)
+            tone: self._render(analysis, tone, sections)
+            for tone in ('empathy', 'reality', 'fun')
         }
 
 
@@ -0,0 +1,100 @@
+# backend/logic/saju_export.py
+"""
+저장한 사주 목록 내보내기 (/api/saju/export?format=ndjson|csv).
+
+목록 전체를 메모리에 올리지 않고 (created_at, id) 키셋으로 청크씩 읽어 바로 텍스트로 만들어 흘려보냅니다.
+- 명식은 저장된 컬럼(chart_compute.chart_from_columns)을 그대로 쓰고,
+  아직 계산 안 된 행만 청크 단위로 계산 → 같은 청크에서 saju 테이블에 한 번에 저장 (다음 내보내기/목록은 계산 없음)
+- 첫 청크는 작게(EXPORT_FIRST_CHUNK) 읽어 응답이 바로 시작되게
+- export_chunk() 는 DB 스레드(run_db)에서 한 청크씩 호출 — sqlite 연결/커서를 스레드 사이로 넘기지 않음
+"""
+import csv
+import io
+import json
+import os
+from typing import List, Optional, Tuple
+
+from logic.chart_compute import ELEMENT_KEYS, PILLAR_KEYS, compute_chart, render_chart
+from logic.saju_db import get_saju_rows_after, update_saju_charts
+
+EXPORT_FIRST_CHUNK = 20
+EXPORT_CHUNK_SIZE = int(os.getenv("SAJU_EXPORT_CHUNK_SIZE", "200"))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+_ROW_FIELDS = ("id", "name", "relation", "birthdate", "birth_time", "calendar_type", "gender", "created_at")
+_CHART_FIELDS = ("solar_datetime", *PILLAR_KEYS, "day_stem", "strength", "strength_score")
+EXPORT_FIELDS = (*_ROW_FIELDS, *_CHART_FIELDS, *ELEMENT_KEYS)
+
+
+def fill_missing_charts(rows: List[dict], db=None) -> int:
+    """chart 가 없는 행만 계산해 채우고 saju 테이블에도 저장. 계산한 행 수 반환 (실패한 행은 chart=None 그대로)"""
+    updates = []
+    for row in rows:
+        if row["chart"] is not None:
+            continue
+        try:
+            chart = compute_chart(row["birthdate"], row["birth_time"], row["calendar_type"], db)
+        except Exception as e:
+            print(f"⚠️ 내보내기 명식 계산 실패 saju_id={row['id']}: {e}")
+            continue
+        row["chart"] = render_chart(chart)
+        updates.append((row["id"], chart))
+    update_saju_charts(updates)
+    return len(updates)
+
+
+def export_record(row: dict) -> dict:
+    """saju 행 → 내보내기 한 줄 (EXPORT_FIELDS 순서, 명식 없으면 빈 값)"""
+    chart = row["chart"] or {}
+    counts = chart.get("element_counts") or {}
+    record = {k: row[k] for k in _ROW_FIELDS}
+    record.update({k: chart.get(k) for k in _CHART_FIELDS})
+    record.update({k: counts.get(k) for k in ELEMENT_KEYS})
+    return record
+
+
+def csv_header() -> str:
+    # BOM: 엑셀에서 한글이 깨지지 않게
+    return "\ufeff" + _csv_lines([EXPORT_FIELDS])
+
+
+def _csv_lines(values: list) -> str:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\r\n").writerows(values)
+    return buf.getvalue()
+
+
+# 엑셀 등에서 수식으로 해석되는 첫 글자 (사용자가 입력한 이름·관계에 들어올 수 있음)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_cell(value) -> str:
+    """CSV 한 칸: None → 빈 값, 수식으로 시작하는 문자열은 앞에 ' 를 붙여 글자로"""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_records(records: List[dict], fmt: str) -> str:
+    if fmt == "csv":
+        return _csv_lines([[csv_cell(r[k]) for k in EXPORT_FIELDS] for r in records])
+    return "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+
+
+def export_chunk(user_id: int, fmt: str, after: Optional[Tuple[str, int]] = None,
+                 limit: int = EXPORT_CHUNK_SIZE, db=None) -> Tuple[str, Optional[Tuple[str, int]]]:
+    """
+    after 다음 limit개 행 → (인코딩된 텍스트, 다음 청크 키 — 마지막 청크면 None)
+    """
+    rows = get_saju_rows_after(user_id, limit, after)
+    if not rows:
+        return "", None
+    fill_missing_charts(rows, db)
+    text = encode_records([export_record(r) for r in rows], fmt)
+    next_after = (rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+    return text, next_after
@@ -0,0 +1,72 @@
+# backend/logic/session_cache.py
+"""
+로그인 사용자 확인 + 자주 읽는 사용자 데이터 TTL 캐시 (프로세스 내).
+
+한 화면이 /api/me, /api/seeds, /api/saju/count 를 연달아 부르면 요청마다
+쿠키(kakao:… → users 조회) 또는 Bearer 토큰(HMAC 검증) 확인과 단일 컬럼 조회가 반복됩니다.
+- session_users: 쿠키 값/토큰 → user_id (확인에 성공한 것만 저장)
+- profiles / balances / saju_counts: user_id → 프로필 / 씨앗 잔액 / 사주 개수
+값이 바뀌는 곳(씨앗 차감, 결제, 사주 저장)에서 invalidate_user() 로 바로 지웁니다.
+다른 워커 프로세스의 변경은 TTL 안에서만 늦게 보입니다 (차감 자체는 DB 조건부 UPDATE라 항상 정확).
+"""
+import os
+from typing import Callable, Optional
+
+from logic.llm_cache import TTLCache
+
+SESSION_CACHE_TTL_SEC = float(os.getenv("SESSION_CACHE_TTL_SEC", "60"))
+USER_CACHE_TTL_SEC = float(os.getenv("USER_CACHE_TTL_SEC", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+session_users = TTLCache("session_users", ttl_sec=SESSION_CACHE_TTL_SEC, max_entries=USER_CACHE_MAX_ENTRIES)
+profiles = TTLCache("user_profiles", ttl_sec=USER_CACHE_TTL_SEC, max_entries=USER_CACHE_MAX_ENTRIES)
+balances = TTLCache("seed_balances", ttl_sec=USER_CACHE_TTL_SEC, max_entries=USER_CACHE_MAX_ENTRIES)
+saju_counts = TTLCache("saju_counts", ttl_sec=USER_CACHE_TTL_SEC, max_entries=USER_CACHE_MAX_ENTRIES)
+
+# None 은 '캐시 없음'과 구분이 안 되므로 없는 프로필은 이 값으로 저장
+_MISSING = object()
+
+
+def resolve_user_id(
+    cookie: Optional[str],
+    bearer: Optional[str],
+    lookup_session: Callable[[str], Optional[int]],
+    verify_token: Callable[[str], Optional[int]],
+) -> Optional[int]:
+    """쿠키 우선, 없거나 확인 실패면 Bearer 토큰. 실패 결과는 캐시하지 않음 (임의 토큰으로 캐시를 채우지 못하게)"""
+    for kind, value, resolve in (("cookie", cookie, lookup_session), ("bearer", bearer, verify_token)):
+        if not value:
+            continue
+        key = f"{kind}:{value}"
+        user_id = session_users.get(key)
+        if user_id is None:
+            user_id = resolve(value)
+            if user_id is not None:
+                session_users.set(key, user_id)
+        if user_id is not None:
+            return user_id
+    return None
+
+
+def cached(cache: TTLCache, user_id: int, load: Callable[[int], object]):
+    """cache[user_id] 가 없으면 load(user_id) 후 저장 (None 결과도 저장)"""
+    key = str(user_id)
+    value = cache.get(key)
+    if value is None:
+        value = load(user_id)
+        cache.set(key, _MISSING if value is None else value)
+    return None if value is _MISSING else value
+
+
+def invalidate_user(user_id, *, profile: bool = False, balance: bool = False, saju_count: bool = False) -> None:
+    key = str(user_id)
+    if profile:
+        profiles.delete(key)
+    if balance:
+        balances.delete(key)
+    if saju_count:
+        saju_counts.delete(key)
+
+
+def stats() -> dict:
+    return {cache.name: cache.stats() for cache in (session_users, profiles, balances, saju_counts)}
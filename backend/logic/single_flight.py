@@ -0,0 +1,70 @@
+# backend/logic/single_flight.py
+"""동일 요청 병합(single-flight). 같은 키의 호출이 진행 중이면 새로 호출하지 않고 첫 호출 결과를 함께 기다립니다."""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def _normalize(value: Any) -> Any:
+    """키 생성용 정규화: 문자열은 앞뒤 공백 제거 + 연속 공백 1칸으로."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(namespace: str, **parts: Any) -> str:
+    """정규화한 요청 값으로 single-flight 키 생성 (예: pillars, tone, concern)."""
+    raw = json.dumps(_normalize(parts), ensure_ascii=False, sort_keys=True)
+    return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+class SingleFlight:
+    """
+    프로세스 내 in-flight 요청 병합기.
+    첫 호출은 Task로 실행되고, 같은 키의 후속 호출은 그 Task 결과를 await 합니다.
+    첫 요청 클라이언트가 끊겨도(Cancel) Task는 계속 실행되어 나머지 대기자가 결과를 받습니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._calls = 0
+        self._executed = 0
+        self._coalesced = 0
+        self._errors = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._calls += 1
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self._coalesced += 1
+            return await asyncio.shield(task)
+
+        self._executed += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # 대기자가 모두 끊긴 경우에도 "exception was never retrieved" 경고가 나지 않도록 조회
+        if task.exception() is not None:
+            self._errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self._calls,
+            "executed": self._executed,
+            "coalesced": self._coalesced,
+            "errors": self._errors,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,137 @@
+# backend/logic/speculative.py
+"""
+interpret-gpt 선생성(speculative pre-generation).
+사용자는 saju-preview → /api/analysis/deduct → 결과 페이지 → /saju/interpret-gpt 순서로 움직이므로,
+사주 저장/미리보기 시점에 같은 차트의 해석을 낮은 우선순위로 미리 만들어 LLM 캐시(section_cache)에 넣어 둡니다.
+
+- 예산: 사용자별 하루 SPECULATIVE_DAILY_BUDGET건까지만 선생성 (같은 차트 재요청은 예산을 쓰지 않음)
+- hit: 선생성한 차트를 실제 interpret-gpt 가 요청함 (완료 후 = ready, 생성 중 = inflight)
+- waste: SPECULATIVE_WINDOW_SEC 동안 아무도 요청하지 않은 선생성
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from logic.llm_cache import LLM_CACHE_TTL_SEC
+
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "1") == "1"
+SPECULATIVE_DAILY_BUDGET = int(os.getenv("SPECULATIVE_DAILY_BUDGET", "5"))
+# 이 시간 안에 요청되지 않으면 낭비로 집계 (기본: 캐시 TTL — 캐시에 남아 있는 동안은 쓸모가 있음)
+SPECULATIVE_WINDOW_SEC = float(os.getenv("SPECULATIVE_WINDOW_SEC", str(LLM_CACHE_TTL_SEC)))
+SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", "2"))
+# 미리보기 단계에서는 톤을 모르므로 결과 페이지 기본 톤으로 생성
+SPECULATIVE_TONE = os.getenv("SPECULATIVE_TONE", "empathy")
+
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+OVER_BUDGET = "over_budget"
+DISABLED = "disabled"
+
+
+class _Entry:
+    __slots__ = ("future", "created_at", "claimed")
+
+    def __init__(self, future: Future, created_at: float):
+        self.future = future
+        self.created_at = created_at
+        self.claimed = False
+
+
+class SpeculativePrefetcher:
+    """
+        prefetcher = SpeculativePrefetcher(run=lambda payload: ...)
+        prefetcher.submit(user_id, key, payload)   # 저장/미리보기 시점
+        pending = prefetcher.claim(key)            # interpret-gpt 시점 (아직 생성 중이면 Future)
+    """
+
+    def __init__(self, run: Callable[[dict], None], daily_budget: int = SPECULATIVE_DAILY_BUDGET,
+                 window_sec: float = SPECULATIVE_WINDOW_SEC, workers: int = SPECULATIVE_WORKERS,
+                 enabled: bool = SPECULATIVE_ENABLED, clock=time.time):
+        self._run = run
+        self.daily_budget = daily_budget
+        self.window_sec = window_sec
+        self.enabled = enabled
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="speculative")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._day = ""
+        self._used_today: Dict[str, int] = {}
+        self._counts = {
+            "queued": 0, "duplicates": 0, "over_budget": 0, "failed": 0,
+            "hits_ready": 0, "hits_inflight": 0, "misses": 0, "wasted": 0,
+        }
+
+    def _today(self) -> str:
+        return time.strftime("%Y-%m-%d", time.localtime(self._clock()))
+
+    def _prune(self, now: float) -> None:
+        """창이 지난 항목 제거 — 한 번도 요청되지 않았으면 낭비"""
+        for key in [k for k, e in self._entries.items() if now - e.created_at >= self.window_sec]:
+            if not self._entries.pop(key).claimed:
+                self._counts["wasted"] += 1
+
+    def submit(self, user_id, key: str, payload: dict) -> str:
+        if not self.enabled or self.daily_budget <= 0:
+            return DISABLED
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            if key in self._entries:
+                self._counts["duplicates"] += 1
+                return DUPLICATE
+            today = self._today()
+            if today != self._day:
+                self._day, self._used_today = today, {}
+            budget_key = str(user_id)
+            if self._used_today.get(budget_key, 0) >= self.daily_budget:
+                self._counts["over_budget"] += 1
+                return OVER_BUDGET
+            self._used_today[budget_key] = self._used_today.get(budget_key, 0) + 1
+            future = self._executor.submit(self._run, payload)
+            self._entries[key] = _Entry(future, now)
+            self._counts["queued"] += 1
+        future.add_done_callback(self._on_done)
+        return QUEUED
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled() or future.exception() is None:
+            return
+        print(f"⚠️ 선생성 실패: {future.exception()}")
+        with self._lock:
+            self._counts["failed"] += 1
+
+    def claim(self, key: str) -> Optional[Future]:
+        """실제 요청 시점에 호출. 선생성이 아직 진행 중이면 그 Future를 반환 (호출부가 기다릴지 결정)"""
+        with self._lock:
+            self._prune(self._clock())
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            if not entry.claimed:
+                entry.claimed = True
+                self._counts["hits_ready" if entry.future.done() else "hits_inflight"] += 1
+            return None if entry.future.done() else entry.future
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune(self._clock())
+            c = dict(self._counts)
+            hits = c["hits_ready"] + c["hits_inflight"]
+            requests = hits + c["misses"]
+            # 결론이 난 선생성(요청됨 또는 창 만료) 중 낭비 비율
+            settled = hits + c["wasted"]
+            return {
+                **c,
+                "hit_rate": round(hits / requests, 3) if requests else 0.0,
+                "waste_rate": round(c["wasted"] / settled, 3) if settled else 0.0,
+                "pending": sum(1 for e in self._entries.values() if not e.claimed),
+                "daily_budget": self.daily_budget,
+                "enabled": self.enabled,
+            }
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+이론 텍스트 BM25 검색 인덱스
+
+- 이론 파일을 제목(#)/문단 단위 청크로 나누고, 순수 Python BM25 역색인을 만듭니다.
+- 분석 결과(합/충/신살/십성 과다·부재)로 질의를 만들어 토큰 예산 안에서 상위 청크만 돌려줍니다.
+- 인덱스는 코퍼스 버전별로 JSON 파일에 저장해 두고, 다음 기동 시 그대로 읽어 씁니다.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from logic.prompt_builder import estimate_tokens
+from logic.theory_retriever import TheoryCorpus, get_corpus
+
+INDEX_FORMAT = 2
+CACHE_DIR = Path(os.getenv("THEORY_INDEX_DIR") or (Path(__file__).parent / ".cache"))
+
+# 청크 크기 (글자 수)
+MAX_CHUNK_CHARS = 900
+MIN_CHUNK_CHARS = 200
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HEADING_RE = re.compile(r"^\s*(#{1,6})\s+(.*\S)\s*$")
+_TAG_RE = re.compile(r"^\s*<([^<>]+)>\s*$")
+_HANGUL_RUN_RE = re.compile(r"[가-힣]+")
+_HANJA_RE = re.compile(r"[一-鿿]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# 한자 → 한글 독음 (질의 확장용: 辰酉 → 진유)
+_HANJA_READING = {
+    '甲': '갑', '乙': '을', '丙': '병', '丁': '정', '戊': '무', '己': '기', '庚': '경', '辛': '신', '壬': '임', '癸': '계',
+    '子': '자', '丑': '축', '寅': '인', '卯': '묘', '辰': '진', '巳': '사', '午': '오', '未': '미',
+    '申': '신', '酉': '유', '戌': '술', '亥': '해',
+}
+
+# 십성 그룹 (과다/부재 판단용)
+_TEN_GOD_GROUPS = {
+    '비겁': ('비견', '겁재'),
+    '식상': ('식신', '상관'),
+    '재성': ('편재', '정재'),
+    '관성': ('편관', '정관'),
+    '인성': ('편인', '정인'),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """한글은 음절 bigram(1음절 단어는 unigram), 한자는 글자 단위, 영숫자는 단어 단위"""
+    text = (text or "").lower()
+    tokens = []
+    for run in _HANGUL_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(_HANJA_RE.findall(text))
+    tokens.extend(_WORD_RE.findall(text))
+    return tokens
+
+
+# =====================================================
+# 청크 분할
+# =====================================================
+
+def chunk_theory(source: str, text: str) -> List[dict]:
+    """
+    이론 텍스트 1개를 청크로 분할.
+    제목이 바뀌면 새 청크, 한 청크가 MAX_CHUNK_CHARS를 넘으면 문단 경계에서 나눕니다.
+    """
+    chunks: List[dict] = []
+    headings: List[str] = []
+    paragraphs: List[str] = []
+    current: List[str] = []
+
+    def flush_paragraph():
+        if current:
+            para = "\n".join(current).strip()
+            if para:
+                paragraphs.append(para)
+            current.clear()
+
+    def flush_chunk():
+        flush_paragraph()
+        if not paragraphs:
+            return
+        heading = " > ".join(headings)
+        buf: List[str] = []
+        size = 0
+        for para in paragraphs:
+            if buf and size + len(para) > MAX_CHUNK_CHARS:
+                chunks.append({"source": source, "heading": heading, "text": "\n\n".join(buf)})
+                buf, size = [], 0
+            buf.append(para)
+            size += len(para) + 2
+        if buf:
+            # 너무 짧은 꼬리는 같은 제목의 직전 청크에 붙임
+            tail = "\n\n".join(buf)
+            if (len(tail) < MIN_CHUNK_CHARS and chunks and chunks[-1]["source"] == source
+                    and chunks[-1]["heading"] == heading):
+                chunks[-1]["text"] += "\n\n" + tail
+            else:
+                chunks.append({"source": source, "heading": heading, "text": tail})
+        paragraphs.clear()
+
+    for line in text.splitlines():
+        m = _HEADING_RE.match(line)
+        if m:
+            flush_chunk()
+            level = len(m.group(1))
+            del headings[level - 1:]
+            headings.extend([""] * (level - 1 - len(headings)))
+            headings.append(m.group(2))
+            headings[:] = [h for h in headings if h]
+            continue
+        if _TAG_RE.match(line):
+            continue
+        if not line.strip():
+            flush_paragraph()
+            continue
+        current.append(line.rstrip())
+    flush_chunk()
+    return chunks
+
+
+# =====================================================
+# BM25 인덱스
+# =====================================================
+
+class TheoryIndex:
+    """청크 목록 + BM25 역색인"""
+
+    def __init__(self, version: str, chunks: List[dict], postings: Dict[str, List[list]], doc_lens: List[int]):
+        self.version = version
+        self.chunks = chunks
+        self.postings = postings
+        self.doc_lens = doc_lens
+        n = len(doc_lens)
+        self.avg_len = (sum(doc_lens) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+        for chunk in chunks:
+            chunk.setdefault("tokens", estimate_tokens(chunk["text"]))
+
+    @classmethod
+    def build(cls, corpus: TheoryCorpus) -> "TheoryIndex":
+        chunks: List[dict] = []
+        seen = set()
+        for source, text in corpus.theories.items():
+            if not text:
+                continue
+            for chunk in chunk_theory(source, text):
+                # 여러 파일에 똑같이 실린 문단(예: 천간합 / 천간합,충)은 한 번만 색인
+                if chunk["text"] in seen:
+                    continue
+                seen.add(chunk["text"])
+                chunks.append(chunk)
+
+        postings: Dict[str, List[list]] = defaultdict(list)
+        doc_lens: List[int] = []
+        for doc_id, chunk in enumerate(chunks):
+            # 제목도 본문과 함께 색인
+            terms = tokenize(chunk["heading"] + "\n" + chunk["text"])
+            doc_lens.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings[term].append([doc_id, tf])
+        return cls(corpus.version, chunks, dict(postings), doc_lens)
+
+    def search(self, query: str, top_k: int = 8, budget_tokens: Optional[int] = None,
+               max_per_source: int = 3, skip: Optional[Callable[[dict], bool]] = None) -> List[dict]:
+        """
+        BM25 상위 청크 반환. budget_tokens가 있으면 점수순으로 예산 안에 들어가는 청크만 담습니다.
+        skip(chunk)이 True인 청크는 건너뜀 (예: 프롬프트 고정 prefix에 이미 들어간 청크)
+        """
+        q_terms = Counter(tokenize(query))
+        if not q_terms or not self.chunks:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, q_tf in q_terms.items():
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in plist:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lens[doc_id] / (self.avg_len or 1))
+                scores[doc_id] += q_tf * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        results: List[dict] = []
+        used = 0
+        per_source: Counter = Counter()
+        for doc_id, score in ranked:
+            if len(results) >= top_k:
+                break
+            chunk = self.chunks[doc_id]
+            if per_source[chunk["source"]] >= max_per_source:
+                continue
+            if skip is not None and skip(chunk):
+                continue
+            if budget_tokens is not None and used + chunk["tokens"] > budget_tokens:
+                continue
+            used += chunk["tokens"]
+            per_source[chunk["source"]] += 1
+            results.append({**chunk, "id": doc_id, "score": round(score, 4)})
+        return results
+
+    # ---------- 직렬화 ----------
+
+    def to_dict(self) -> dict:
+        return {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "chunks": self.chunks,
+            "postings": self.postings,
+            "doc_lens": self.doc_lens,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TheoryIndex":
+        return cls(data["version"], data["chunks"], data["postings"], data["doc_lens"])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["TheoryIndex"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != INDEX_FORMAT:
+            return None
+        return cls.from_dict(data)
+
+
+def _cache_path(version: str) -> Path:
+    return CACHE_DIR / f"theory_index_{version}.json"
+
+
+_index: Optional[TheoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> TheoryIndex:
+    """현재 코퍼스 버전의 인덱스 반환 (캐시 파일이 있으면 로드, 없으면 빌드 후 저장)"""
+    global _index
+    corpus = get_corpus()
+    index = _index
+    if index is not None and index.version == corpus.version:
+        return index
+    with _index_lock:
+        if _index is not None and _index.version == corpus.version:
+            return _index
+        path = _cache_path(corpus.version)
+        index = TheoryIndex.load(path)
+        if index is None or index.version != corpus.version:
+            index = TheoryIndex.build(corpus)
+            try:
+                index.save(path)
+            except OSError as e:
+                print(f"⚠️ 이론 인덱스 저장 실패: {e}")
+            print(f"📚 이론 인덱스 빌드: {len(index.chunks)}개 청크 (version {index.version})")
+        _index = index
+        return index
+
+
+# =====================================================
+# 분석 결과 → 질의
+# =====================================================
+
+def _with_reading(chars: str) -> str:
+    """'辰酉' → '辰酉 진유'"""
+    hanja = "".join(c for c in chars if c in _HANJA_READING)
+    reading = "".join(_HANJA_READING[c] for c in hanja)
+    return f"{hanja} {reading}" if hanja else ""
+
+
+def build_query(analysis: dict) -> str:
+    """분석 결과에서 실제 등장한 합/충/신살/십성 특징으로 검색 질의 생성"""
+    parts: List[str] = []
+    summary = analysis.get("summary") or {}
+
+    strength = summary.get("strength")
+    if isinstance(strength, str) and strength:
+        parts.append(strength)
+
+    hc = analysis.get("harmony_clash") or {}
+    labels = {
+        "cheongan_hap": "천간합 합화",
+        "cheongan_chung": "천간충",
+        "jiji_yukhap": "육합",
+        "jiji_samhap": "삼합",
+        "jiji_banhap": "반합",
+        "jiji_chung": "지지충 충",
+    }
+    for key, label in labels.items():
+        for item in hc.get(key) or []:
+            chars = _with_reading(str(item.get("chars", "")))
+            suffix = "충" if "충" in label else "합"
+            # 예: "辰酉 진유 육합 진유합"
+            reading = chars.split(" ")[-1] if chars else ""
+            parts.append(f"{chars} {label} {reading}{suffix} {item.get('name', '')}".strip())
+
+    sinsal_labels = {
+        "cheonul_gwiin": "천을귀인",
+        "dohwa": "도화살",
+        "yeokma": "역마살",
+        "hwagae": "화개살",
+        "wolgong": "월공",
+        "munchang_gwiin": "문창귀인",
+    }
+    ss = analysis.get("sinsal") or {}
+    for key, label in sinsal_labels.items():
+        if ss.get(key):
+            parts.append(label)
+
+    ten_gods = summary.get("ten_gods_count") or {}
+    for group, members in _TEN_GOD_GROUPS.items():
+        count = sum(ten_gods.get(m, 0) for m in members)
+        if count >= 3:
+            parts.append(f"{group} 과다 " + " ".join(m for m in members if ten_gods.get(m)))
+        elif count == 0:
+            parts.append(f"{group} 부재")
+
+    basic = analysis.get("basic_info") or {}
+    if basic.get("day_stem"):
+        parts.append(f"일간 {_with_reading(basic['day_stem'])}")
+    month = basic.get("month") or ""
+    if len(month) >= 2:
+        parts.append(f"월지 {_with_reading(month[1])}")
+
+    return "\n".join(p for p in parts if p)
+
+
+def format_chunks(chunks: List[dict]) -> str:
+    """검색된 청크를 출처별로 묶어 프롬프트용 텍스트로 변환 (원문 순서 유지)"""
+    grouped: Dict[str, List[dict]] = {}
+    for chunk in sorted(chunks, key=lambda c: c["id"]):
+        grouped.setdefault(chunk["source"], []).append(chunk)
+    sections = []
+    for source, items in grouped.items():
+        body = "\n\n".join(
+            (f"### {c['heading']}\n{c['text']}" if c["heading"] else c["text"]) for c in items
+        )
+        sections.append(f"## {source} 이론\n\n{body}")
+    return "\n\n---\n\n".join(sections)
+
+
+def test_index():
+    """테스트"""
+    from logic.saju_engine.core.analyzer import analyze_full_saju
+
+    analysis = analyze_full_saju('癸', {'year': '庚辰', 'month': '乙酉', 'day': '癸未', 'hour': '庚申'})
+    query = build_query(analysis)
+    print("질의:\n" + query)
+    results = get_index().search(query, top_k=8, budget_tokens=4000)
+    for r in results:
+        print(f"  {r['score']:7.3f}  [{r['source']}] {r['heading'][:50]} ({r['tokens']}토큰)")
+
+
+if __name__ == "__main__":
+    test_index()
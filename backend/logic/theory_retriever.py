@@ -4,58 +4,239 @@
 사주 이론 검색 시스템 (RAG)
 """
 
+import hashlib
 import os
+import threading
+import time
+from itertools import product
 from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+from logic.prompt_builder import trim_to_tokens
+
+# backend/logic/theories
+THEORY_DIR = Path(__file__).parent / "theories"
+
+# 실제 파일명으로 매핑
+THEORY_FILES = {
+    '신강약': '사주이론(신강 신약).txt',
+    '오행십신': '사주이론(오행, 육친과 십신).txt',
+    '천간': '사주이론(천간).txt',
+    '지지': '사주이론(지지).txt',
+    '천간합': '사주이론(천간합).txt',
+    '천간충': '사주이론(천간합,충).txt',
+    '지지합': '사주이론(지지합).txt',
+    '지지충': '사주이론(지지충).txt',
+    '귀인신살': '사주이론(각종귀인,신살).txt',
+    '십이운성': '사주이론(십이운성).txt',
+    '통근투출': '사주이론(통근과투출).txt',
+    '기본구성': '사주이론(기본사주 구성).txt',
+}
+
+# 합화 계산용 이론 (GPTInterpretationGenerator.harmony_theories 키 → 코퍼스 키)
+HARMONY_THEORY_KEYS = {
+    '천간합': '천간합',
+    '지지합': '지지합',
+    '천간합충': '천간충',
+}
+
+# 프롬프트에 들어가는 고정 발췌 (키 → 제목, 토큰 상한). 문장 경계에서 자름
+SECTION_SPECS = {
+    '신강약': ('신강약 이론', 1800),
+    '오행십신': ('오행과 십신 이론', 2400),
+    '기본구성': ('기본 구성', 1200),
+    '천간합': ('천간합 이론', 1200),
+    '천간충': ('천간충 이론', 1200),
+    '지지합': ('지지합 이론', 1200),
+    '지지충': ('지지충 이론', 1200),
+    '귀인신살': ('신살 이론', 1800),
+}
+
+# 조합 블록 전체 토큰 상한
+MAX_COMBINED_TOKENS = 9000
+
+# 모든 해석 프롬프트의 고정 prefix에 들어가는 공통 이론 (차트와 무관, 프롬프트 캐시용)
+PREFIX_THEORY_KEYS = ('신강약', '오행십신')
+PREFIX_THEORY_TOKENS = 2500
+
+# get_relevant_theories 방식: bm25(분석 특징으로 청크 검색) | prefix(고정 발췌 블록)
+RETRIEVAL_MODE = os.getenv("THEORY_RETRIEVAL", "bm25").strip().lower()
+RETRIEVAL_TOP_K = int(os.getenv("THEORY_TOP_K", "8"))
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv("THEORY_TOKEN_BUDGET", "3500"))
+
+# 파일 변경 확인 주기 (초). 0이면 자동 재로드 안 함
+RELOAD_CHECK_SEC = float(os.getenv("THEORY_RELOAD_CHECK_SEC", "30"))
+
+
+def _combine(sections) -> str:
+    """발췌 섹션들을 구분선으로 합치고 길이 제한 적용"""
+    sections = [s for s in sections if s]
+    if not sections:
+        return ""
+    return trim_to_tokens("\n\n---\n\n".join(sections), MAX_COMBINED_TOKENS)
+
+
+def _pattern_flags(patterns) -> Tuple[bool, bool, bool, bool]:
+    """패턴 목록 → (천간합충, 지지합, 지지충형해파, 신살) 플래그"""
+    texts = [str(p) for p in patterns]
+    return (
+        any('천간합' in p or '천간충' in p for p in texts),
+        any('육합' in p or '삼합' in p or '방합' in p for p in texts),
+        any('충' in p or '형' in p or '해' in p or '파' in p for p in texts),
+        any('도화' in p or '역마' in p or '화개' in p or '귀인' in p for p in texts),
+    )
+
+
+class TheoryCorpus:
+    """
+    한 번 로드한 이론 텍스트와 미리 잘라 둔 발췌/조합 블록 (불변, 프로세스 전체 공유).
+    재로드 시에는 새 객체를 만들어 참조만 교체하므로 읽는 쪽은 락이 필요 없습니다.
+    """
+
+    def __init__(self, theories: Dict[str, str], signature: tuple):
+        self.theories = MappingProxyType(dict(theories))
+        self.signature = signature
+        digest = hashlib.sha1()
+        for key in sorted(self.theories):
+            digest.update(key.encode('utf-8'))
+            digest.update(self.theories[key].encode('utf-8'))
+        # 내용 기준 버전 (파생 캐시/인덱스 무효화 키로 사용)
+        self.version = digest.hexdigest()[:12]
+        self.loaded_at = time.time()
+
+        self.harmony = MappingProxyType({
+            hkey: (self.theories.get(ckey) or "").strip()
+            for hkey, ckey in HARMONY_THEORY_KEYS.items()
+        })
+
+        sections = {}
+        for key, (title, max_tokens) in SECTION_SPECS.items():
+            text = self.theories.get(key)
+            sections[key] = f"## {title}\n\n{trim_to_tokens(text, max_tokens)}" if text else ""
+        self.sections = MappingProxyType(sections)
+
+        # search_theories용 고정 블록
+        self.search_block = _combine([sections['신강약'], sections['오행십신'], sections['기본구성']])
+
+        # 프롬프트 고정 prefix용 공통 이론 (byte 단위로 항상 같은 텍스트)
+        self.prefix_block = trim_to_tokens(
+            _combine([sections[k] for k in PREFIX_THEORY_KEYS]), PREFIX_THEORY_TOKENS
+        )
+
+        # get_relevant_theories용: 패턴 플래그 16가지 조합을 미리 조립
+        # (extra_blocks: prefix에 이미 들어간 공통 이론을 뺀 나머지)
+        blocks = {}
+        extra_blocks = {}
+        for flags in product((False, True), repeat=4):
+            cheongan, jiji_hap, jiji_chung, sinsal = flags
+            parts = []
+            if cheongan:
+                parts += [sections['천간합'], sections['천간충']]
+            if jiji_hap:
+                parts.append(sections['지지합'])
+            if jiji_chung:
+                parts.append(sections['지지충'])
+            if sinsal:
+                parts.append(sections['귀인신살'])
+            blocks[flags] = _combine([sections['신강약'], sections['오행십신']] + parts)
+            extra_blocks[flags] = _combine(parts)
+        self.blocks = MappingProxyType(blocks)
+        self.extra_blocks = MappingProxyType(extra_blocks)
+
+    def is_empty(self) -> bool:
+        return all(not v for v in self.theories.values())
+
+    def relevant_block(self, patterns, exclude_prefix: bool = False) -> str:
+        flags = _pattern_flags(patterns)
+        return self.extra_blocks[flags] if exclude_prefix else self.blocks[flags]
+
+
+def _file_signature(theory_dir) -> tuple:
+    """파일별 (이름, mtime_ns, size) — 변경 감지용"""
+    sig = []
+    for key, filename in THEORY_FILES.items():
+        try:
+            st = os.stat(os.path.join(theory_dir, filename))
+            sig.append((filename, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((filename, None, None))
+    return tuple(sig)
+
+
+def load_corpus(theory_dir=None) -> TheoryCorpus:
+    """theories 폴더의 모든 이론 파일을 읽어 TheoryCorpus 생성"""
+    theory_dir = theory_dir or THEORY_DIR
+    signature = _file_signature(theory_dir)
+    theories = {}
+
+    if not os.path.exists(theory_dir):
+        print(f"⚠️  theories 폴더가 없습니다: {theory_dir}")
+        print(f"💡 이론 없이 GPT 기본 해석으로 진행합니다.")
+        return TheoryCorpus(theories, signature)
+
+    for key, filename in THEORY_FILES.items():
+        filepath = os.path.join(theory_dir, filename)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                theories[key] = f.read()
+        except Exception as e:
+            print(f"⚠️ {key} 이론 파일 로드 실패: {e}")
+            theories[key] = ""
+
+    corpus = TheoryCorpus(theories, signature)
+    loaded = sum(1 for v in theories.values() if v)
+    total = sum(len(v) for v in theories.values())
+    print(f"📚 이론 코퍼스 로드: {loaded}/{len(THEORY_FILES)}개, {total}자 (version {corpus.version})")
+    return corpus
+
+
+_corpus: Optional[TheoryCorpus] = None
+_corpus_lock = threading.Lock()
+_last_check = 0.0
+
+
+def reload_corpus(force: bool = False) -> bool:
+    """
+    파일이 바뀌었으면 새 코퍼스를 만들어 원자적으로 교체합니다.
+    Returns: 교체했으면 True
+    """
+    global _corpus, _last_check
+    with _corpus_lock:
+        _last_check = time.monotonic()
+        if _corpus is not None and not force and _file_signature(THEORY_DIR) == _corpus.signature:
+            return False
+        _corpus = load_corpus(THEORY_DIR)
+        return True
+
+
+def get_corpus() -> TheoryCorpus:
+    """공유 코퍼스 반환. 최초 1회 로드, 이후 RELOAD_CHECK_SEC 주기로 파일 변경만 확인"""
+    corpus = _corpus
+    if corpus is None:
+        reload_corpus()
+        return _corpus
+    if RELOAD_CHECK_SEC > 0 and time.monotonic() - _last_check >= RELOAD_CHECK_SEC:
+        reload_corpus()
+        return _corpus
+    return corpus
 
 
 class TheoryRetriever:
-    """사주 이론 검색기"""
+    """사주 이론 검색기 (기본 경로는 공유 코퍼스 사용)"""
 
     def __init__(self, theory_dir=None):
-        if theory_dir is None:
-            # backend/theories 경로로 설정 (logic 폴더 기준 상위)
-            theory_dir = Path(__file__).parent / "theories"
-
-        self.theory_dir = theory_dir
-
-        if not os.path.exists(self.theory_dir):
-            print(f"⚠️  theories 폴더가 없습니다: {self.theory_dir}")
-            print(f"💡 이론 없이 GPT 기본 해석으로 진행합니다.")
-            self.theories = {}
-        else:
-            self.theories = self._load_all_theories()
-
-    def _load_all_theories(self):
-        """모든 이론 파일 로드"""
-        theories = {}
-
-        # 실제 파일명으로 매핑
-        theory_files = {
-            '신강약': '사주이론(신강 신약).txt',
-            '오행십신': '사주이론(오행, 육친과 십신).txt',
-            '천간': '사주이론(천간).txt',
-            '지지': '사주이론(지지).txt',
-            '천간합': '사주이론(천간합).txt',
-            '천간충': '사주이론(천간합,충).txt',
-            '지지합': '사주이론(지지합).txt',
-            '지지충': '사주이론(지지충).txt',
-            '귀인신살': '사주이론(각종귀인,신살).txt',
-            '십이운성': '사주이론(십이운성).txt',
-            '통근투출': '사주이론(통근과투출).txt',
-            '기본구성': '사주이론(기본사주 구성).txt',
-        }
-
-        for key, filename in theory_files.items():
-            filepath = os.path.join(self.theory_dir, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    theories[key] = f.read()
-                print(f"✅ {key} 이론 로드: {len(theories[key])}자")
-            except Exception as e:
-                print(f"⚠️ {key} 이론 파일 로드 실패: {e}")
-                theories[key] = ""
+        self.theory_dir = theory_dir or THEORY_DIR
+        # 기본 경로가 아니면 별도 코퍼스를 로드 (테스트/실험용)
+        self._own_corpus = load_corpus(theory_dir) if theory_dir is not None else None
+
+    @property
+    def corpus(self) -> TheoryCorpus:
+        return self._own_corpus or get_corpus()
 
-        return theories
+    @property
+    def theories(self):
+        return self.corpus.theories
 
     def search_theories(self, day_stem, pillars, element_counts):
         """
@@ -67,100 +248,56 @@ class TheoryRetriever:
             element_counts: 오행 카운트 dict
 
         Returns:
-            str: 관련 이론 텍스트
+            str: 관련 이론 텍스트 (신강약 + 오행십신 + 기본구성)
         """
-        if not self.theories or all(not v for v in self.theories.values()):
-            return ""
-
-        relevant = []
-
-        # 1. 신강약 이론 (필수)
-        if self.theories.get('신강약'):
-            relevant.append(f"## 신강약 이론\n\n{self.theories['신강약'][:3000]}")
-
-        # 2. 오행/십신 이론 (필수)
-        if self.theories.get('오행십신'):
-            relevant.append(f"## 오행과 십신 이론\n\n{self.theories['오행십신'][:4000]}")
-
-        # 3. 기본구성 이론
-        if self.theories.get('기본구성'):
-            relevant.append(f"## 기본 구성\n\n{self.theories['기본구성'][:2000]}")
-
-        # 조합해서 반환
-        if not relevant:
+        corpus = self.corpus
+        if corpus.is_empty():
             return ""
+        return corpus.search_block
 
-        combined = "\n\n---\n\n".join(relevant)
-
-        # 토큰 제한 (GPT-4 context window 고려)
-        if len(combined) > 15000:
-            combined = combined[:15000] + "\n\n... (이하 생략)"
-
-        return combined
-
-    def get_relevant_theories(self, analysis):
+    def get_relevant_theories(self, analysis, exclude_prefix=False):
         """
         분석 결과에 맞는 이론 추출
 
         Args:
             analysis: analyze_full_saju 결과
+            exclude_prefix: True면 프롬프트 고정 prefix(corpus.prefix_block)에 이미 들어간 내용 제외
 
         Returns:
             str: 관련 이론들을 조합한 텍스트
+                 (bm25: 토큰 예산 안의 상위 청크 / prefix: 패턴 조합별로 미리 조립된 블록)
         """
-        if not self.theories or all(not v for v in self.theories.values()):
+        corpus = self.corpus
+        if corpus.is_empty():
             return ""
+        if RETRIEVAL_MODE == "bm25" and self._own_corpus is None:
+            try:
+                from logic.theory_index import build_query, format_chunks, get_index
+                prefix = corpus.prefix_block if exclude_prefix else ""
+                chunks = get_index().search(
+                    build_query(analysis),
+                    top_k=RETRIEVAL_TOP_K,
+                    budget_tokens=RETRIEVAL_TOKEN_BUDGET,
+                    skip=(lambda c: c["text"] in prefix) if prefix else None,
+                )
+                if chunks:
+                    return format_chunks(chunks)
+            except Exception as e:
+                print(f"⚠️ 이론 인덱스 검색 실패, 고정 발췌 사용: {e}")
+        return corpus.relevant_block(analysis.get('patterns', []), exclude_prefix=exclude_prefix)
 
-        relevant = []
-
-        # 1. 신강약 이론 (필수)
-        if self.theories.get('신강약'):
-            relevant.append(f"## 신강약 이론\n\n{self.theories['신강약'][:3000]}")
-
-        # 2. 오행/십신 이론 (필수)
-        if self.theories.get('오행십신'):
-            relevant.append(f"## 오행과 십신 이론\n\n{self.theories['오행십신'][:4000]}")
-
-        # 3. 패턴별 이론
-        patterns = analysis.get('patterns', [])
-
-        # 천간합/충
-        if any('천간합' in str(p) or '천간충' in str(p) for p in patterns):
-            if self.theories.get('천간합'):
-                relevant.append(f"## 천간합 이론\n\n{self.theories['천간합'][:2000]}")
-            if self.theories.get('천간충'):
-                relevant.append(f"## 천간충 이론\n\n{self.theories['천간충'][:2000]}")
-
-        # 지지합/충
-        if any('육합' in str(p) or '삼합' in str(p) or '방합' in str(p) for p in patterns):
-            if self.theories.get('지지합'):
-                relevant.append(f"## 지지합 이론\n\n{self.theories['지지합'][:2000]}")
-
-        if any('충' in str(p) or '형' in str(p) or '해' in str(p) or '파' in str(p) for p in patterns):
-            if self.theories.get('지지충'):
-                relevant.append(f"## 지지충 이론\n\n{self.theories['지지충'][:2000]}")
-
-        # 4. 귀인/신살 (있는 경우만)
-        if any('도화' in str(p) or '역마' in str(p) or '화개' in str(p) or '귀인' in str(p) for p in patterns):
-            if self.theories.get('귀인신살'):
-                relevant.append(f"## 신살 이론\n\n{self.theories['귀인신살'][:3000]}")
-
-        # 조합해서 반환
-        if not relevant:
-            return ""
 
-        combined = "\n\n---\n\n".join(relevant)
+_retriever = TheoryRetriever()
 
-        # 토큰 제한
-        if len(combined) > 15000:
-            combined = combined[:15000] + "\n\n... (이하 생략)"
 
-        return combined
+def get_retriever() -> TheoryRetriever:
+    """공유 TheoryRetriever 반환"""
+    return _retriever
 
 
 def test_retriever():
     """테스트"""
-    retriever = TheoryRetriever()
+    retriever = get_retriever()
 
     # 테스트용 분석 결과
     test_analysis = {
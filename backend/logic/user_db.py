@@ -1,44 +1,13 @@
 # backend/logic/user_db.py
 """사용자 저장용 SQLite (카카오/구글/이메일 로그인)."""
 import sqlite3
-from pathlib import Path
 from datetime import datetime
 
-DB_DIR = Path(__file__).resolve().parent
-USERS_DB = DB_DIR / "users.db"
+from logic.db import app_connection
 
 
 def get_conn():
-    return sqlite3.connect(USERS_DB)
-
-
-def init_user_db():
-    conn = get_conn()
-    try:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                provider_id TEXT NOT NULL,
-                email TEXT,
-                nickname TEXT,
-                created_at TEXT NOT NULL,
-                last_login TEXT NOT NULL,
-                UNIQUE(provider, provider_id)
-            )
-        """)
-        conn.execute(
-            "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_provider_provider_id ON users(provider, provider_id)"
-        )
-        conn.commit()
-        # 씨앗 잔액 컬럼 (기존 DB에 없으면 추가)
-        try:
-            conn.execute("ALTER TABLE users ADD COLUMN seed_balance INTEGER DEFAULT 0")
-            conn.commit()
-        except sqlite3.OperationalError:
-            pass  # column already exists
-    finally:
-        conn.close()
+    return app_connection()
 
 
 def get_or_create_user(
@@ -52,8 +21,7 @@ def get_or_create_user(
     없으면 INSERT, 있으면 last_login만 UPDATE 후 id 반환.
     """
     now = datetime.utcnow().isoformat()
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         cur = conn.execute(
             "SELECT id FROM users WHERE provider = ? AND provider_id = ?",
             (provider, provider_id),
@@ -74,8 +42,6 @@ def get_or_create_user(
         conn.commit()
         cur = conn.execute("SELECT last_insert_rowid()")
         return cur.fetchone()[0]
-    finally:
-        conn.close()
 
 
 def get_user_id_from_session(session_value: str) -> int | None:
@@ -100,16 +66,13 @@ def get_user_id_from_session(session_value: str) -> int | None:
     if s.startswith("kakao:"):
         provider_id = s[6:].strip()
         if provider_id:
-            conn = get_conn()
-            try:
+            with get_conn() as conn:
                 cur = conn.execute(
                     "SELECT id FROM users WHERE provider = 'kakao' AND provider_id = ?",
                     (provider_id,),
                 )
                 row = cur.fetchone()
                 return int(row[0]) if row else None
-            finally:
-                conn.close()
     return None
 
 
@@ -117,8 +80,7 @@ def get_user_by_id(user_id: int) -> dict | None:
     """user_id로 사용자 정보(provider, email, nickname) 반환."""
     if not user_id:
         return None
-    conn = get_conn()
-    try:
+    with get_conn() as conn:
         cur = conn.execute(
             "SELECT provider, email, nickname FROM users WHERE id = ?",
             (user_id,),
@@ -131,52 +93,76 @@ def get_user_by_id(user_id: int) -> dict | None:
             "email": (row[1] or "").strip() or None,
             "nickname": (row[2] or "").strip() or None,
         }
-    finally:
-        conn.close()
 
 
 def get_seed_balance(user_id: int) -> int:
     """user_id의 씨앗 잔액 반환. 컬럼 없으면 0."""
     if not user_id:
         return 0
-    conn = get_conn()
-    try:
-        cur = conn.execute(
-            "SELECT seed_balance FROM users WHERE id = ?",
-            (user_id,),
-        )
-        row = cur.fetchone()
-        if not row:
-            return 0
+    with get_conn() as conn:
         try:
-            return int(row[0]) if row[0] is not None else 0
-        except (TypeError, ValueError):
-            return 0
-    except sqlite3.OperationalError:
-        return 0  # seed_balance column missing
-    finally:
-        conn.close()
+            cur = conn.execute(
+                "SELECT seed_balance FROM users WHERE id = ?",
+                (user_id,),
+            )
+            row = cur.fetchone()
+            if not row:
+                return 0
+            try:
+                return int(row[0]) if row[0] is not None else 0
+            except (TypeError, ValueError):
+                return 0
+        except sqlite3.OperationalError:
+            return 0  # seed_balance column missing
 
 
-def deduct_seed(user_id: int, amount: int = 1) -> tuple[bool, int]:
+def deduct_seed(user_id: int, amount: int = 1, reason: str = "analysis", ref: str | None = None) -> tuple[bool, int]:
     """
     user_id의 씨앗을 amount만큼 차감합니다.
+    잔액 확인과 차감을 조건부 UPDATE 한 문장으로 처리해 동시 요청이 와도 잔액이 음수가 되지 않고,
+    같은 트랜잭션에서 seed_ledger에 기록합니다.
     Returns: (success, remaining_balance)
     """
     if not user_id or amount < 1:
         return False, get_seed_balance(user_id or 0)
-    current = get_seed_balance(user_id)
-    if current < amount:
-        return False, current
-    conn = get_conn()
-    try:
-        conn.execute(
-            "UPDATE users SET seed_balance = seed_balance - ? WHERE id = ?",
-            (amount, user_id),
-        )
-        conn.commit()
-        return True, current - amount
-    except sqlite3.OperationalError:
-        return False, current
-    finally:
-        conn.close()
+    with get_conn() as conn:
+        try:
+            row = conn.execute(
+                "UPDATE users SET seed_balance = seed_balance - ? "
+                "WHERE id = ? AND seed_balance >= ? RETURNING seed_balance",
+                (amount, user_id, amount),
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return False, get_seed_balance(user_id)
+            conn.execute(
+                "INSERT INTO seed_ledger (user_id, delta, balance_after, reason, ref, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, -amount, row[0], reason, ref, datetime.utcnow().isoformat()),
+            )
+            conn.commit()
+            return True, int(row[0])
+        except sqlite3.OperationalError:
+            conn.rollback()
+            return False, get_seed_balance(user_id)
+
+
+def add_seeds(conn, user_id: int, amount: int, reason: str, ref: str | None = None) -> int | None:
+    """
+    열린 트랜잭션 안에서 잔액 += amount 와 seed_ledger 기록 (commit 은 호출한 쪽에서).
+    결제 반영처럼 다른 테이블 쓰기와 한 트랜잭션으로 묶을 때 사용. 사용자가 없으면 None.
+    reason="purchase"는 ref(주문번호)당 한 번만 — 중복이면 sqlite3.IntegrityError.
+    """
+    row = conn.execute(
+        "UPDATE users SET seed_balance = COALESCE(seed_balance, 0) + ? WHERE id = ? RETURNING seed_balance",
+        (amount, user_id),
+    ).fetchone()
+    if row is None:
+        return None
+    conn.execute(
+        "INSERT INTO seed_ledger (user_id, delta, balance_after, reason, ref, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (user_id, amount, row[0], reason, ref, datetime.utcnow().isoformat()),
+    )
+    return int(row[0])
+
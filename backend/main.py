@@ -9,7 +9,8 @@ from auth_google2 import router as google_router
 import os
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from datetime import datetime
 import asyncio
@@ -74,61 +75,91 @@ if DB is None:
     raise RuntimeError(f"solar_terms_db.json 로드 실패: {DB_PATH}")
 
 from logic.saju_db import (
-    init_saju_db,
     get_saju_count_for_user,
     get_saju_by_id,
     get_saju_list_for_user,
+    get_saju_page_for_user,
     save_saju_for_user,
+    update_saju_charts,
 )
+from logic.chart_compute import calculate_pillars, compute_chart, render_chart
+from logic import saju_export
 from logic.user_db import get_user_id_from_session, get_user_by_id, get_seed_balance, deduct_seed
 from logic.session_token import verify_session_token
+from logic.db import run_db
+from logic.payment_confirm import PaymentConfirmer, PaymentError
+from logic import http_clients
+from logic import session_cache
+from logic.single_flight import SingleFlight, make_key
+from logic.prompt_builder import PromptBuilder, log_prompt_tokens
+from logic.job_queue import JobWorkerPool
+from logic.llm_client import chat_completion, CircuitOpenError, PRIORITY_PAID, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from logic.llm_client import breaker as llm_breaker, prompt_cache_stats
+from logic.llm_cache import section_cache
+from logic.analysis_codec import encode_analysis
+from logic.deadline import DEADLINE_HEADER, Deadline, deadline_scope, parse_deadline_header
+from logic.llm_metrics import metrics as llm_metrics, record_fallback, report_scope
+from logic.llm_scheduler import scheduler as llm_scheduler
+from logic.speculative import SpeculativePrefetcher, SPECULATIVE_TONE
+
+# 동일 GPT 요청 병합 (더블탭/프론트 재시도 시 중복 호출 방지)
+interpret_flight = SingleFlight("interpret-gpt")
+concern_flight = SingleFlight("concern-analysis")
 
 
 def get_user_id_from_request(request: Request) -> Optional[int]:
-    """쿠키 또는 Authorization Bearer 토큰으로 user_id 반환. 모바일 크로스 도메인 시 토큰 사용."""
-    raw = request.cookies.get("hsaju_session")
-    user_id = get_user_id_from_session(raw) if raw else None
-    if user_id is not None:
-        return user_id
+    """
+    쿠키 또는 Authorization Bearer 토큰으로 user_id 반환. 모바일 크로스 도메인 시 토큰 사용.
+    한 요청 안에서는 한 번만 확인하고(request.state), 확인 결과는 session_cache 에 TTL 캐시.
+    라우트에서는 Depends(get_user_id_from_request) 로 받습니다.
+    """
+    if hasattr(request.state, "user_id"):
+        return request.state.user_id
     auth = request.headers.get("Authorization")
-    if auth and auth.startswith("Bearer "):
-        token = auth[7:].strip()
-        return verify_session_token(token)
-    return None
+    bearer = auth[7:].strip() if auth and auth.startswith("Bearer ") else None
+    user_id = session_cache.resolve_user_id(
+        request.cookies.get("hsaju_session"), bearer, get_user_id_from_session, verify_session_token
+    )
+    request.state.user_id = user_id
+    return user_id
 
-# 결제 DB 초기화
-try:
-    from logic.payment_db import init_payments_db
-    init_payments_db()
-    print("✅ 결제 DB 초기화 완료")
-except Exception as e:
-    print(f"⚠️ 결제 DB 초기화: {e}")
 
-# 사용자 DB 초기화
-try:
-    from logic.user_db import init_user_db
-    init_user_db()
-    print("✅ 사용자 DB 초기화 완료")
-except Exception as e:
-    print(f"⚠️ 사용자 DB 초기화: {e}")
+def _cached_profile(user_id: int) -> Optional[dict]:
+    return session_cache.cached(session_cache.profiles, user_id, get_user_by_id)
+
+
+def _cached_seed_balance(user_id: int) -> int:
+    return session_cache.cached(session_cache.balances, user_id, get_seed_balance)
 
-# 사주 DB 초기화
+
+def _cached_saju_count(user_id: int) -> int:
+    return session_cache.cached(session_cache.saju_counts, user_id, get_saju_count_for_user)
+
+# 앱 DB (사용자·사주·결제·문의 — 한 파일) 스키마: 남은 마이그레이션만 적용
 try:
-    init_saju_db()
-    print("✅ 사주 DB 초기화 완료")
+    from logic.migrations import migrate, current_version
+    migrate()
+    print(f"✅ 앱 DB 준비 완료 (스키마 버전 {current_version()})")
 except Exception as e:
-    print(f"⚠️ 사주 DB 초기화: {e}")
+    print(f"⚠️ 앱 DB 마이그레이션: {e}")
 
-# 문의 DB 초기화
+# 문의 저장
 save_inquiry = None
 try:
-    from logic.contact_db import init_contact_db, save_inquiry
-    init_contact_db()
-    print("✅ 문의 DB 초기화 완료")
+    from logic.contact_db import save_inquiry
 except Exception as e:
-    print(f"⚠️ 문의 DB 초기화: {e}")
+    print(f"⚠️ 문의 DB: {e}")
     save_inquiry = None
 
+# 이론 코퍼스/검색 인덱스 미리 로드 (요청마다 파일을 다시 읽지 않도록)
+try:
+    from logic.theory_retriever import get_corpus
+    from logic.theory_index import get_index
+    get_corpus()
+    get_index()
+except Exception as e:
+    print(f"⚠️ 이론 코퍼스 로드: {e}")
+
 # ==================== 루트 경로 추가 ====================
 
 @app.get("/ping")
@@ -146,6 +177,7 @@ def root():
         "version": "0.1.0",
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs",
             "redoc": "/redoc",
             "openapi": "/openapi.json",
@@ -154,23 +186,49 @@ def root():
             "saju_interpret_gpt": "/saju/interpret-gpt",
             "saju_summary_gpt": "/saju/summary-gpt",
             "saju_concern_analysis": "/saju/concern-analysis",
+            "saju_concern_analysis_jobs": "/saju/concern-analysis/jobs",
             "payment_confirm": "/payment/confirm",
             "payment_create": "/payment/create"
         }
     }
 
 
+@app.get("/api/session")
+def get_session(user_id: Optional[int] = Depends(get_user_id_from_request)):
+    """
+    /api/me + /api/seeds + /api/saju/count 를 한 번에 (화면 진입 시 왕복 1회).
+    쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
+    """
+    empty = {"ok": False, "provider": None, "email": None, "nickname": None, "seeds": 0, "saju_count": 0}
+    if user_id is None:
+        return empty
+    try:
+        user = _cached_profile(user_id)
+        if not user:
+            return empty
+        return {
+            "ok": True,
+            "provider": user.get("provider"),
+            "email": user.get("email"),
+            "nickname": user.get("nickname"),
+            "seeds": _cached_seed_balance(user_id),
+            "saju_count": _cached_saju_count(user_id),
+        }
+    except Exception as e:
+        print(f"⚠️ /api/session 조회 실패: {e}")
+        return empty
+
+
 @app.get("/api/saju/count")
-def get_saju_count(request: Request):
+def get_saju_count(user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
     현재 계정의 저장된 사주 개수를 반환합니다.
     쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         return {"count": 0}
     try:
-        count = get_saju_count_for_user(user_id)
+        count = _cached_saju_count(user_id)
         return {"count": count}
     except Exception as e:
         print(f"⚠️ /api/saju/count DB 조회 실패: {e}")
@@ -178,16 +236,15 @@ def get_saju_count(request: Request):
 
 
 @app.get("/api/me")
-def get_me(request: Request):
+def get_me(user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
     현재 로그인한 사용자 정보(provider, email, nickname)를 반환합니다.
     쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         return {"ok": False, "provider": None, "email": None, "nickname": None}
     try:
-        user = get_user_by_id(user_id)
+        user = _cached_profile(user_id)
         if not user:
             return {"ok": False, "provider": None, "email": None, "nickname": None}
         return {
@@ -202,16 +259,15 @@ def get_me(request: Request):
 
 
 @app.get("/api/seeds")
-def get_seeds(request: Request):
+def get_seeds(user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
     현재 로그인한 사용자의 씨앗 잔액을 반환합니다.
     쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         return {"seeds": 0}
     try:
-        seeds = get_seed_balance(user_id)
+        seeds = _cached_seed_balance(user_id)
         return {"seeds": seeds}
     except Exception as e:
         print(f"⚠️ /api/seeds 조회 실패: {e}")
@@ -219,15 +275,15 @@ def get_seeds(request: Request):
 
 
 @app.post("/api/analysis/deduct")
-def deduct_analysis_seed(request: Request):
+def deduct_analysis_seed(user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
     사주 분석 1회 차감. 씨앗 1개를 차감하고 성공 시 남은 잔액을 반환합니다.
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
     try:
         success, remaining = deduct_seed(user_id, 1)
+        session_cache.invalidate_user(user_id, balance=True)
         if not success:
             return {
                 "success": False,
@@ -444,7 +500,27 @@ def split_pillar(pillar: str) -> tuple:
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {
+        "ok": True,
+        "single_flight": {
+            "interpret_gpt": interpret_flight.stats(),
+            "concern_analysis": concern_flight.stats(),
+        },
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_breaker": llm_breaker.stats(),
+        "prompt_cache": prompt_cache_stats(),
+        "section_cache": section_cache.stats(),
+        "speculative": speculative.stats(),
+        "session_cache": session_cache.stats(),
+        "http_clients": http_clients.stats(),
+        "payment_confirm": payment_confirmer.stats(),
+    }
+
+
+@app.get("/metrics")
+def llm_metrics_endpoint():
+    """LLM 호출 계측: 엔드포인트 × 섹션:모델별 지연 분포, 토큰, 비용, 잘림(max_tokens) 비율, 폴백 수, 리포트당 비용"""
+    return llm_metrics.snapshot()
 
 
 @app.post("/saju/full")
@@ -452,11 +528,7 @@ async def get_full_saju(req: SajuRequest):
     """✅ 전체 사주 분석 (프론트엔드에서 사용)"""
     try:
         birth_dt, solar_dt_used = _to_datetime(req)
-
-        yj = test.calculate_year_pillar(solar_dt_used, DB)
-        mj = test.calculate_month_pillar(solar_dt_used, yj, DB)
-        dj = test.calculate_day_pillar(solar_dt_used)
-        sj = test.calculate_hour_pillar(solar_dt_used, dj)
+        yj, mj, dj, sj = calculate_pillars(solar_dt_used, DB)
 
         # 십이운성 계산 (일간 기준)
         try:
@@ -570,8 +642,9 @@ async def test_new_engine(req: InterpretRequest):
 
             generator = GPTInterpretationGenerator(
                 api_key=os.getenv("OPENAI_API_KEY"))
-            interpretation = generator.generate_section1(
-                analysis, tone=req.tone)
+            with report_scope("interpret-test"):
+                interpretation = generator.generate_section1(
+                    analysis, tone=req.tone)
 
             return {
                 "success": True,
@@ -607,8 +680,46 @@ async def test_new_engine(req: InterpretRequest):
 
 
 @app.post("/saju/interpret-gpt")
-async def interpret_with_gpt(req: GPTInterpretRequest):
-    """✅ RAG 기반 GPT 오행 해석 (합화 포함)"""
+async def interpret_with_gpt(req: GPTInterpretRequest, request: Request):
+    """✅ RAG 기반 GPT 오행 해석 (합화 포함)
+
+    X-Request-Deadline-Ms 헤더(없으면 INTERPRET_DEADLINE_SEC)까지 끝난 섹션만 GPT 결과로 쓰고,
+    나머지는 템플릿으로 채워 metadata.deadline.partial=true 로 표시합니다.
+    """
+    # 요청 도착 시점부터 계산 (스레드 풀 대기 시간 포함)
+    deadline = Deadline(parse_deadline_header(request.headers.get(DEADLINE_HEADER)))
+    # 더블탭/재시도로 같은 요청이 겹치면 GPT 호출 1회만 하고 결과를 공유 (deadline은 첫 요청 기준)
+    key = make_key(
+        "interpret-gpt",
+        day_stem=req.day_stem,
+        pillars=[req.year_pillar, req.month_pillar, req.day_pillar, req.hour_pillar],
+        tone=req.tone,
+    )
+    pending = speculative.claim(_speculative_key(req.day_stem, _request_pillars(req), req.tone))
+    if pending is not None:
+        # 선생성이 아직 도는 중이면 같은 GPT 호출을 두 번 하지 않도록 남은 시간의 절반까지 기다렸다가 캐시를 씀
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(pending)), timeout=deadline.remaining() / 2)
+        except Exception:
+            pass
+    loop = asyncio.get_event_loop()
+    return await interpret_flight.do(
+        key, lambda: loop.run_in_executor(None, _interpret_with_gpt_sync, req, deadline)
+    )
+
+
+def _interpret_with_gpt_sync(req: GPTInterpretRequest, deadline: Optional[Deadline] = None) -> dict:
+    """interpret-gpt 본체 — GPT 동기 호출이 이벤트 루프를 막지 않도록 스레드에서 실행됨"""
+    deadline = deadline or Deadline(parse_deadline_header(None))
+    with report_scope("interpret-gpt") as report, deadline_scope(deadline):
+        result = _interpret_with_gpt_impl(req)
+    if isinstance(result, dict) and isinstance(result.get("metadata"), dict):
+        result["metadata"]["llm_cost_usd"] = round(report.cost_usd, 5)
+        result["metadata"]["deadline"] = deadline.metadata()
+    return result
+
+
+def _interpret_with_gpt_impl(req: GPTInterpretRequest, priority: int = PRIORITY_INTERACTIVE) -> dict:
     try:
         print(f"✅ GPT 해석 요청: day_stem={req.day_stem}, tone={req.tone}")
 
@@ -661,16 +772,16 @@ async def interpret_with_gpt(req: GPTInterpretRequest):
         # ✅ 4. 이론 검색
         theories = ""
         try:
-            from logic.theory_retriever import TheoryRetriever
-            retriever = TheoryRetriever()
-            theories = retriever.get_relevant_theories(analysis)
+            from logic.theory_retriever import get_retriever
+            # 공통 이론은 생성기가 system prefix에 넣으므로 그 외 관련 이론만
+            theories = get_retriever().get_relevant_theories(analysis, exclude_prefix=True)
             print(f"📚 검색된 이론: {len(theories)}자")
         except Exception as e:
             print(f"⚠️ 이론 검색 실패: {e}")
 
         # ✅ 5. 합화 정보 계산 + GPT 해석 생성기 준비
         from logic.gpt_generator import GPTInterpretationGenerator
-        generator = GPTInterpretationGenerator()
+        generator = GPTInterpretationGenerator(priority=priority)
 
         # 🔥 Tuple 언패킹으로 수정
         transformed_counts, transformations = generator._apply_harmony_transformation(
@@ -743,6 +854,7 @@ async def interpret_with_gpt(req: GPTInterpretRequest):
 
         except Exception as e:
             print(f"❌ GPT 생성 실패: {e}")
+            record_fallback("interpret", e)
             import traceback
             traceback.print_exc()
 
@@ -796,25 +908,80 @@ async def interpret_with_gpt(req: GPTInterpretRequest):
         return {"success": False, "error": str(e)}
 
 
+# ==================== interpret-gpt 선생성 ====================
+
+def _request_pillars(req: GPTInterpretRequest) -> list:
+    return [req.year_pillar, req.month_pillar, req.day_pillar, req.hour_pillar]
+
+
+def _speculative_key(day_stem: str, pillars: list, tone: str) -> str:
+    # TONE_MODE=all 이면 세 톤이 함께 캐시되므로 어떤 톤 요청이든 같은 선생성으로 봄
+    from logic.gpt_generator import TONE_MODE
+    return make_key("speculative", day_stem=day_stem, pillars=pillars,
+                    tone="*" if TONE_MODE == "all" else tone)
+
+
+def _speculative_interpret_job(payload: dict) -> None:
+    """선생성 본체 — 결과는 버리고 section_cache 에 남은 섹션만 쓰임 (쿼터는 BACKGROUND 우선순위)"""
+    req = GPTInterpretRequest(**payload)
+    with report_scope("interpret-speculative"):
+        _interpret_with_gpt_impl(req, priority=PRIORITY_BACKGROUND)
+
+
+speculative = SpeculativePrefetcher(_speculative_interpret_job)
+
+
+def _speculate_saved_saju(user_id: int, chart: dict) -> str:
+    """저장된 사주의 명식(chart_compute.render_chart 형태)으로 interpret-gpt 선생성을 예약. 저장/조회 응답에는 영향 없음"""
+    if not api_key or llm_breaker.state != "closed":
+        return "skipped"
+    try:
+        pillars = [chart["year_pillar"], chart["month_pillar"], chart["day_pillar"], chart["hour_pillar"]]
+        status = speculative.submit(
+            user_id,
+            _speculative_key(chart["day_stem"], pillars, SPECULATIVE_TONE),
+            {
+                "day_stem": chart["day_stem"],
+                "year_pillar": pillars[0],
+                "month_pillar": pillars[1],
+                "day_pillar": pillars[2],
+                "hour_pillar": pillars[3],
+                "tone": SPECULATIVE_TONE,
+            },
+        )
+        print(f"🔮 선생성 {status}: user_id={user_id}, {' '.join(pillars)}")
+        return status
+    except Exception as e:
+        print(f"⚠️ 선생성 예약 실패: {e}")
+        return "error"
+
+
 PAYMENT_PRODUCT = {"orderName": "고민분석", "amount": 3900}
 
 SEED_PRODUCTS = {
-    "seed_1": {"orderName": "씨앗 1개", "amount": 770},
-    "seed_5": {"orderName": "씨앗 5개+보너스 1개", "amount": 3850},
-    "seed_10": {"orderName": "씨앗 10개+보너스 2개", "amount": 7700},
+    "seed_1": {"orderName": "씨앗 1개", "amount": 770, "seeds": 1},
+    "seed_5": {"orderName": "씨앗 5개+보너스 1개", "amount": 3850, "seeds": 6},
+    "seed_10": {"orderName": "씨앗 10개+보너스 2개", "amount": 7700, "seeds": 12},
 }
 
 
 @app.post("/payment/create")
-async def payment_create(req: Optional[PaymentCreateRequest] = None):
-    """결제용 주문 번호 발급. product_key 없으면 고민분석, seed_1/seed_5/seed_10 이면 씨앗 상품."""
+async def payment_create(req: Optional[PaymentCreateRequest] = None,
+                         account_id: Optional[int] = Depends(get_user_id_from_request)):
+    """
+    결제용 주문 번호 발급. product_key 없으면 고민분석, seed_1/seed_5/seed_10 이면 씨앗 상품.
+    주문(상품·로그인 사용자)을 저장해 두고 /payment/confirm 에서 씨앗 적립에 사용.
+    """
     import uuid
+    from logic.payment_db import create_order
     order_id = f"order_{uuid.uuid4().hex[:16]}"
     product_key = req.product_key if req and req.product_key else None
     if product_key and product_key in SEED_PRODUCTS:
         product = SEED_PRODUCTS[product_key]
     else:
+        product_key = None
         product = PAYMENT_PRODUCT
+    await run_db(create_order, order_id, req.user_id if req else None, account_id, product_key, product["amount"])
     return {
         "orderId": order_id,
         "orderName": product["orderName"],
@@ -822,9 +989,35 @@ async def payment_create(req: Optional[PaymentCreateRequest] = None):
     }
 
 
+async def _fetch_portone_payment(payment_id: str, portone_secret: str) -> dict:
+    r = await http_clients.get_client("portone").get(
+        f"/v2/payments/{payment_id}",
+        headers={"Authorization": f"PortOne {portone_secret}"},
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+def _portone_payment_fetcher():
+    """PortOne 시크릿이 있으면 결제 조회 함수, 없으면 None (결제 확인 불가 → 503)"""
+    portone_secret = os.getenv("PORTONE_API_SECRET") or os.getenv("PORTONE_SECRET_KEY")
+    if not portone_secret:
+        print("⚠️ PORTONE_API_SECRET 미설정 — /payment/confirm 은 503 을 반환합니다")
+        return None
+    return lambda payment_id: _fetch_portone_payment(payment_id, portone_secret)
+
+
+payment_confirmer = PaymentConfirmer(_portone_payment_fetcher(), SEED_PRODUCTS)
+
+
 @app.post("/payment/confirm")
-async def payment_confirm(req: PaymentConfirmRequest):
-    """결제 완료 후 프론트에서 호출. PortOne 결제 검증 후 DB 저장."""
+async def payment_confirm(req: PaymentConfirmRequest,
+                          account_id: Optional[int] = Depends(get_user_id_from_request)):
+    """
+    결제 완료 후 프론트에서 호출. PortOne 결제(상태·금액·통화·주문 번호) 검증 후 DB 저장 (씨앗 상품이면 적립).
+    씨앗은 주문 발급 때의 로그인 사용자 또는 이 요청의 로그인 사용자에게만 적립 (본문 user_id 는 기록용).
+    같은 order_id 재요청은 PortOne 을 다시 부르지 않고 저장된 결과를 반환.
+    """
     try:
         payment_id = req.payment_id.strip()
         order_id = req.order_id.strip()
@@ -832,29 +1025,13 @@ async def payment_confirm(req: PaymentConfirmRequest):
         if not payment_id or not order_id or not user_id:
             raise HTTPException(status_code=400, detail="user_id, payment_id, order_id 필수")
 
-        # PortOne API로 결제 상태 검증 (선택: env 있으면 검증)
-        portone_secret = os.getenv("PORTONE_API_SECRET") or os.getenv("PORTONE_SECRET_KEY")
-        if portone_secret:
-            try:
-                import urllib.request
-                req_ = urllib.request.Request(
-                    f"https://api.portone.io/v2/payments/{payment_id}",
-                    headers={"Authorization": f"PortOne {portone_secret}"},
-                    method="GET",
-                )
-                with urllib.request.urlopen(req_, timeout=10) as res:
-                    data = __import__("json").loads(res.read().decode())
-                    if data.get("status") != "PAID" and data.get("status") != "paid":
-                        raise HTTPException(status_code=400, detail="결제 상태가 완료가 아닙니다.")
-            except HTTPException:
-                raise
-            except Exception as e:
-                print(f"⚠️ PortOne 결제 검증 실패: {e}")
-                raise HTTPException(status_code=502, detail="결제 검증 실패")
-
-        from logic.payment_db import save_payment
-        save_payment(user_id=user_id, payment_id=payment_id, order_id=order_id, status="paid")
-        return {"success": True, "order_id": order_id}
+        result = await payment_confirmer.confirm(user_id, payment_id, order_id, account_id)
+        credited_to = result.pop("account_id")
+        if credited_to and not result["duplicate"]:
+            session_cache.invalidate_user(credited_to, balance=True)
+        return result
+    except PaymentError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except HTTPException:
         raise
     except Exception as e:
@@ -865,26 +1042,48 @@ async def payment_confirm(req: PaymentConfirmRequest):
 
 
 @app.get("/api/saju/list")
-def get_saju_list(request: Request):
+def get_saju_list(limit: Optional[int] = None, after: Optional[str] = None,
+                  user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
-    현재 로그인한 사용자의 사주 전체 목록을 반환합니다.
+    현재 로그인한 사용자의 사주 목록 (최신 생성 순).
     쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
+
+    - limit 없음: 전체 목록을 리스트로 반환 (기존 클라이언트 호환)
+    - ?limit=N(최대 100)&after=<next_cursor>: {"items", "total", "next_cursor"} 키셋 페이지
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+    if limit is not None:
+        try:
+            items, next_cursor = get_saju_page_for_user(user_id, limit, after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "items": items,
+            "total": get_saju_count_for_user(user_id),
+            "next_cursor": next_cursor,
+        }
     rows = get_saju_list_for_user(user_id)
     # 그대로 리스트 반환 (FastAPI가 JSON 직렬화)
     return rows
 
 
+def _compute_saved_chart(birthdate: str, birth_time: Optional[str], calendar_type: str) -> Optional[dict]:
+    try:
+        return compute_chart(birthdate, birth_time, calendar_type, DB)
+    except Exception as e:
+        print(f"⚠️ 명식 계산 실패 ({birthdate} {birth_time} {calendar_type}): {e}")
+        return None
+
+
 @app.post("/api/saju/save")
 async def save_saju(request: Request, body: SajuSaveRequest):
     """
     현재 로그인한 사용자의 사주 한 건을 저장합니다.
     hsaju_session 쿠키(숫자 user_id 또는 "kakao:provider_id" 형태)를 파싱해 사용합니다.
     """
-    user_id = get_user_id_from_request(request)
+    # kakao:... 세션은 users DB 조회가 필요하므로 DB 스레드에서
+    user_id = await run_db(get_user_id_from_request, request)
     print(f"🧩 /api/saju/save user_id = {user_id!r}")
     if user_id is None:
         print("🧩 /api/saju/save: user_id 없음 → 401 반환")
@@ -908,7 +1107,11 @@ async def save_saju(request: Request, body: SajuSaveRequest):
             f"calendar_type={calendar_type!r}, gender={gender!r}"
         )
 
-        saju_id = save_saju_for_user(
+        # 음력 변환·만세력·신강약 계산은 스레드에서 한 번만 (실패해도 저장은 진행 → backfill 대상으로 남음)
+        loop = asyncio.get_event_loop()
+        stored_chart = await loop.run_in_executor(None, _compute_saved_chart, birthdate, birth_time, calendar_type)
+        saju_id = await run_db(
+            save_saju_for_user,
             user_id=user_id,
             name=name,
             relation=relation,
@@ -916,9 +1119,15 @@ async def save_saju(request: Request, body: SajuSaveRequest):
             birth_time=birth_time,
             calendar_type=calendar_type,
             gender=gender,
+            chart=stored_chart,
         )
         print(f"✅ /api/saju/save INSERT 성공: saju_id={saju_id}")
-        return {"success": True, "saju_id": saju_id}
+        session_cache.invalidate_user(user_id, saju_count=True)
+        chart = render_chart(stored_chart) if stored_chart else None
+        if chart:
+            # 선생성 예약은 응답과 무관하므로 기다리지 않음
+            loop.run_in_executor(None, _speculate_saved_saju, user_id, chart)
+        return {"success": True, "saju_id": saju_id, "chart": chart}
     except HTTPException:
         raise
     except Exception as e:
@@ -928,18 +1137,60 @@ async def save_saju(request: Request, body: SajuSaveRequest):
         raise HTTPException(status_code=500, detail="사주 저장 실패")
 
 
+@app.get("/api/saju/export")
+async def export_saju(fmt: str = Query("ndjson", alias="format"),
+                      user_id: Optional[int] = Depends(get_user_id_from_request)):
+    """
+    저장한 사주 전체를 명식(4주·일간·신강약·오행 분포)과 함께 내려받기 (최신 생성 순).
+    ?format=ndjson (한 줄에 JSON 하나) | csv. 청크씩 읽어 흘려보내므로 목록 크기와 관계없이 메모리 일정.
+    """
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+    fmt = fmt.lower()
+    if fmt not in saju_export.EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format 은 ndjson 또는 csv")
+
+    async def body():
+        if fmt == "csv":
+            yield saju_export.csv_header()
+        after, limit = None, saju_export.EXPORT_FIRST_CHUNK
+        while True:
+            text, after = await run_db(saju_export.export_chunk, user_id, fmt, after, limit, DB)
+            if text:
+                yield text
+            if after is None:
+                return
+            limit = saju_export.EXPORT_CHUNK_SIZE
+
+    filename = f"hsaju-saju-{datetime.now():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        body(),
+        media_type=saju_export.EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+
 @app.get("/api/saju/{saju_id}")
-def get_saju(saju_id: int, request: Request):
+def get_saju(saju_id: int, user_id: Optional[int] = Depends(get_user_id_from_request)):
     """
     저장된 사주 한 건 조회.
     쿠키 또는 Authorization Bearer 토큰으로 user_id를 확인합니다.
     """
-    user_id = get_user_id_from_request(request)
     if user_id is None:
         raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
     row = get_saju_by_id(saju_id, user_id)
     if not row:
         raise HTTPException(status_code=404, detail="해당 사주를 찾을 수 없습니다.")
+    chart = row["chart"]
+    if chart is None:
+        # backfill 전 행 — 이번에 계산해 저장 (다음 조회부터는 엔진 작업 없음)
+        stored_chart = _compute_saved_chart(row["birthdate"], row["birth_time"], row["calendar_type"])
+        if stored_chart:
+            update_saju_charts([(saju_id, stored_chart)])
+            chart = render_chart(stored_chart)
+    if chart:
+        # saju-preview 가 이 API로 사주를 불러오므로 결과 페이지 해석을 미리 생성
+        _speculate_saved_saju(user_id, chart)
     return {
         "id": row["id"],
         "name": row["name"],
@@ -948,6 +1199,7 @@ def get_saju(saju_id: int, request: Request):
         "birth_time": row["birth_time"],
         "calendar_type": row["calendar_type"],
         "gender": row["gender"],
+        "chart": chart,
     }
 
 
@@ -958,15 +1210,13 @@ async def summary_gpt(req: SummaryGPTRequest):
         if not client:
             print("⚠️ OPENAI_API_KEY 없음 — summary-gpt 스킵")
             return {"summary": None, "error": "OPENAI_API_KEY not configured"}
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": req.system},
-                {"role": "user", "content": req.user},
-            ],
-            max_tokens=1500,
-            temperature=0.6,
-        )
+        messages = [
+            {"role": "system", "content": req.system},
+            {"role": "user", "content": req.user},
+        ]
+        loop = asyncio.get_running_loop()
+        resp = await loop.run_in_executor(None, _summary_gpt_sync, messages)
+        log_prompt_tokens("summary", messages, resp, model="gpt-4o-mini")
         content = (resp.choices[0].message.content or "").strip()
         return {"summary": content}
     except Exception as e:
@@ -976,6 +1226,19 @@ async def summary_gpt(req: SummaryGPTRequest):
         return {"summary": None, "error": str(e)}
 
 
+def _summary_gpt_sync(messages: list):
+    with report_scope("summary-gpt"):
+        return chat_completion(
+            client,
+            call_name="summary",
+            model="gpt-4o-mini",
+            messages=messages,
+            max_tokens=1500,
+            temperature=0.6,
+            priority=PRIORITY_INTERACTIVE,
+        )
+
+
 # ==================== 고민 분석 (GPT-4o) ====================
 
 _CONCERN_SYSTEM = """당신은 한국 전통 사주를 현대적으로 해석하는 상담 전문가입니다.
@@ -1002,32 +1265,17 @@ def _build_concern_user_prompt(req: "ConcernAnalysisRequest", analysis: dict) ->
             "hour": req.hour_pillar,
         }
         summary = analysis.get("summary") or {}
-        element_counts = summary.get("element_count") or calculate_element_counts(pillars)
-        strength = summary.get("strength") if isinstance(summary.get("strength"), str) else ""
-        strength_score = summary.get("strength_score") if isinstance(summary.get("strength_score"), (int, float)) else 0
-        ten_gods = summary.get("ten_gods_count") or {}
-        patterns = analysis.get("patterns") or []
-        harmony = analysis.get("harmony_clash") or {}
-
-        ten_gods_str = "없음"
-        if ten_gods and isinstance(ten_gods, dict):
-            parts = [f"{k}{v}개" for k, v in ten_gods.items() if v and (isinstance(v, (int, float)) and v > 0)]
-            ten_gods_str = ", ".join(parts) if parts else "없음"
-        patterns_str = ", ".join(str(p) for p in patterns) if patterns else "없음"
-
-        return f"""## 사주 정보
-- 일간: {req.day_stem}
-- 사주: 년주 {req.year_pillar}, 월주 {req.month_pillar}, 일주 {req.day_pillar}, 시주 {req.hour_pillar}
-- 신강약: {strength} (점수: {strength_score})
-- 오행 분포: 목 {element_counts.get('wood', 0)}, 화 {element_counts.get('fire', 0)}, 토 {element_counts.get('earth', 0)}, 금 {element_counts.get('metal', 0)}, 수 {element_counts.get('water', 0)}
-- 십성 분포: {ten_gods_str}
-- 패턴/특징: {patterns_str}
-- 합충: {harmony}
-
-## 사용자 고민
-{req.concern}
-
-위 사주와 고민을 바탕으로 JSON 한 개만 출력하세요."""
+        if not summary.get("element_count"):
+            summary = {**summary, "element_count": calculate_element_counts(pillars)}
+        basic_info = {"day_stem": req.day_stem, **pillars}
+
+        pb = PromptBuilder("concern", model="gpt-4o")
+        # 합충/신살은 dict repr 대신 1건 1줄 압축 표기 (logic/analysis_codec.py)
+        pb.add("chart", "## 사주 정보\n" + encode_analysis({**analysis, "summary": summary, "basic_info": basic_info}),
+               shrink=True)
+        pb.add("concern", f"## 사용자 고민\n{req.concern}")
+        pb.add("instruction", "위 사주와 고민을 바탕으로 JSON 한 개만 출력하세요.")
+        return pb.build(_CONCERN_SYSTEM)
     except Exception as e:
         print(f"⚠️ _build_concern_user_prompt 오류: {e}")
         return f"## 사주: {req.year_pillar} {req.month_pillar} {req.day_pillar} {req.hour_pillar}, 일간 {req.day_stem}\n## 고민: {req.concern}\n\n위를 바탕으로 JSON 한 개만 출력하세요."
@@ -1072,22 +1320,33 @@ async def concern_analysis_ping(req: ConcernAnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _call_gpt_concern(system: str, user_prompt: str) -> str:
+def _call_gpt_concern(system: str, user_prompt: str, endpoint: str = "concern-analysis") -> str:
     """동기 GPT 호출 — 이벤트 루프 블로킹 방지를 위해 스레드에서 실행됨"""
+    with report_scope(endpoint):
+        return _call_gpt_concern_impl(system, user_prompt)
+
+
+def _call_gpt_concern_impl(system: str, user_prompt: str) -> str:
     from openai import OpenAI
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY not configured")
     concern_client = OpenAI(api_key=api_key, timeout=90.0)
-    resp = concern_client.chat.completions.create(
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_prompt},
+    ]
+    # 결제 후 호출이므로 무료 요청보다 먼저 쿼터를 배정
+    resp = chat_completion(
+        concern_client,
+        call_name="concern",
         model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=messages,
         max_tokens=2000,
         temperature=0.5,
+        priority=PRIORITY_PAID,
     )
+    log_prompt_tokens("concern", messages, resp, model="gpt-4o")
     return (resp.choices[0].message.content or "").strip()
 
 
@@ -1120,15 +1379,30 @@ async def concern_analysis(req: ConcernAnalysisRequest):
     user_prompt = _build_concern_user_prompt(req, analysis)
 
     try:
-        # 장시간 블로킹 방지: GPT 호출을 스레드 풀에서 실행
+        # 장시간 블로킹 방지: GPT 호출을 스레드 풀에서 실행 (동일 요청은 single-flight로 병합)
         loop = asyncio.get_event_loop()
-        raw = await loop.run_in_executor(None, lambda: _call_gpt_concern(_CONCERN_SYSTEM, user_prompt))
+        key = make_key("concern-analysis", day_stem=req.day_stem, pillars=list(pillars.values()), concern=concern_text)
+        raw = await concern_flight.do(
+            key, lambda: loop.run_in_executor(None, lambda: _call_gpt_concern(_CONCERN_SYSTEM, user_prompt))
+        )
+    except CircuitOpenError as e:
+        # GPT 장애 중: 90초씩 기다리게 하지 않고 즉시 재시도 안내
+        raise HTTPException(
+            status_code=503,
+            detail="분석 서버가 일시적으로 혼잡합니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(int(e.retry_after) + 1)},
+        )
     except Exception as e:
         print(f"❌ concern-analysis GPT 호출 오류: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=502, detail=f"GPT 호출 실패: {e!s}")
 
+    return _concern_result_from_raw(raw)
+
+
+def _concern_result_from_raw(raw: str) -> dict:
+    """GPT 원문 → 고민 분석 응답 dict (동기 엔드포인트/작업 큐 공용)"""
     parsed = _parse_concern_json(raw)
     if not parsed:
         return {
@@ -1154,6 +1428,96 @@ async def concern_analysis(req: ConcernAnalysisRequest):
     }
 
 
+# ==================== 고민 분석 작업 큐 (제출 → 폴링) ====================
+
+def _concern_job_handler(payload: dict) -> dict:
+    """작업 워커에서 실행: 사주 분석 → GPT-4o → 결과 dict (결과는 jobs.db에 저장됨)"""
+    from logic.saju_engine.core.analyzer import analyze_full_saju
+    req = ConcernAnalysisRequest(**payload)
+    pillars = {
+        "year": req.year_pillar,
+        "month": req.month_pillar,
+        "day": req.day_pillar,
+        "hour": req.hour_pillar,
+    }
+    analysis = analyze_full_saju(req.day_stem, pillars)
+    user_prompt = _build_concern_user_prompt(req, analysis)
+    raw = _call_gpt_concern(_CONCERN_SYSTEM, user_prompt, endpoint="concern-job")
+    return _concern_result_from_raw(raw)
+
+
+job_pool = JobWorkerPool()
+job_pool.register("concern_analysis", _concern_job_handler)
+
+# 롱폴링 최대 대기 (초)
+JOB_LONG_POLL_MAX_SEC = 30.0
+
+
+@app.on_event("startup")
+async def _start_job_workers():
+    try:
+        await job_pool.start()
+    except Exception as e:
+        print(f"⚠️ 작업 워커 시작 실패: {e}")
+
+
+@app.on_event("shutdown")
+async def _stop_job_workers():
+    await job_pool.stop()
+    speculative.shutdown()
+    await http_clients.aclose_all()
+
+
+def _job_response(job: dict) -> dict:
+    body = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == "done":
+        body["result"] = job["result"]
+    elif job["status"] == "failed":
+        body["error"] = job["error"]
+    return body
+
+
+@app.post("/saju/concern-analysis/jobs", status_code=202)
+async def submit_concern_analysis_job(req: ConcernAnalysisRequest):
+    """
+    고민 분석을 백그라운드 작업으로 등록하고 job_id를 즉시 반환합니다.
+    같은 사주 + 같은 고민으로 다시 제출하면 기존 작업을 그대로 돌려줍니다 (재시도 안전).
+    """
+    if not client:
+        raise HTTPException(status_code=503, detail="OPENAI_API_KEY not configured")
+    concern_text = (req.concern or "").strip()
+    if not concern_text:
+        raise HTTPException(status_code=400, detail="고민 텍스트를 입력해주세요.")
+    key = make_key(
+        "concern-analysis",
+        day_stem=req.day_stem,
+        pillars=[req.year_pillar, req.month_pillar, req.day_pillar, req.hour_pillar],
+        concern=concern_text,
+    )
+    job = await job_pool.submit("concern_analysis", req.model_dump(), dedupe_key=key)
+    body = _job_response(job)
+    body["deduplicated"] = job.get("deduplicated", False)
+    return body
+
+
+@app.get("/saju/jobs/{job_id}")
+async def get_job_status(job_id: str, wait: float = 0):
+    """
+    작업 상태 조회. wait(초, 최대 30)를 주면 완료될 때까지 롱폴링합니다.
+    status: queued | running | done | failed
+    """
+    job = await job_pool.wait_for(job_id, timeout=min(max(wait, 0.0), JOB_LONG_POLL_MAX_SEC))
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return _job_response(job)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
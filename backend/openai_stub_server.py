@@ -0,0 +1,318 @@
+"""
+로컬 OpenAI 호환 스텁 서버 — 실제 API 크레딧 없이 GPT 경로 부하 테스트용
+실행: cd backend && python openai_stub_server.py --port 8900 --latency-ms 1500 --tokens-per-sec 60
+백엔드 연결: OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=stub uvicorn main:app
+
+- POST /v1/chat/completions (stream=true/false)
+- 지연 분포(fixed/uniform/lognormal), 초당 토큰 속도, 오류 주입(비율·상태코드), 응답 지연(hang) 주입
+- 고민 분석 요청에는 _parse_concern_json 이 기대하는 JSON 형식으로 응답
+- 세 톤을 한 번에 요청하면(TONE_MODE=all) {"empathy", "reality", "fun"} JSON으로 응답
+- 같은 system 메시지가 최근에 왔으면 prompt_tokens_details.cached_tokens 를 채워 프롬프트 캐시를 흉내냄
+  (OpenAI처럼 1024토큰 이상, 128토큰 단위) — 캐시 적중 시 첫 토큰 지연도 cache_speedup 배로 줄임
+- GET/POST /stub/config 로 실행 중에 설정 변경, GET /stub/stats 로 호출 수 확인
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from logic.prompt_builder import count_messages_tokens, estimate_tokens
+
+STUB_CONFIG = {
+    # 첫 토큰까지 지연 (ms)과 분포
+    "latency_ms": float(os.getenv("STUB_LATENCY_MS", "800")),
+    "latency_jitter_ms": float(os.getenv("STUB_LATENCY_JITTER_MS", "400")),
+    "latency_dist": os.getenv("STUB_LATENCY_DIST", "lognormal"),  # fixed | uniform | lognormal
+    # 응답 생성 속도 (completion 토큰/초, 0이면 즉시)
+    "tokens_per_sec": float(os.getenv("STUB_TOKENS_PER_SEC", "80")),
+    # 오류 주입
+    "error_rate": float(os.getenv("STUB_ERROR_RATE", "0")),
+    "error_status": int(os.getenv("STUB_ERROR_STATUS", "500")),
+    # 응답 없이 오래 붙잡는 비율/시간 (클라이언트 timeout 확인용)
+    "hang_rate": float(os.getenv("STUB_HANG_RATE", "0")),
+    "hang_sec": float(os.getenv("STUB_HANG_SEC", "60")),
+    # 프롬프트 캐시 흉내: 적중 시 지연 배율 (0.5 = 절반)
+    "cache_speedup": float(os.getenv("STUB_CACHE_SPEEDUP", "0.7")),
+    "seed": None,
+}
+
+# 최근 system prefix 해시 (LRU)
+PREFIX_CACHE_SIZE = 256
+PREFIX_CACHE_MIN_TOKENS = 1024
+_prefix_cache: "OrderedDict[str, int]" = OrderedDict()
+
+_stats = {"requests": 0, "streamed": 0, "errors": 0, "hangs": 0, "in_flight": 0, "max_in_flight": 0,
+          "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_rng = random.Random()
+
+app = FastAPI(title="OpenAI Stub", version="0.1.0")
+
+
+# ==================== 캔드 응답 ====================
+
+CANNED_CONCERN = {
+    "root_cause": "타고난 성향상 스스로 기준을 높게 잡고 혼자 해결하려는 힘이 강해서, 주변에 기대기보다 버티는 쪽을 택해 왔습니다. "
+                  "그 힘이 지금은 지친 마음으로 돌아오고 있어요.",
+    "reason_now": "올해는 주변 환경이 빠르게 바뀌면서 그동안 미뤄 둔 선택을 더 이상 미룰 수 없는 흐름입니다. "
+                  "그래서 평소보다 고민이 크게 느껴지는 시기입니다.",
+    "directions": [
+        "지금 가장 부담되는 일 하나를 골라, 이번 주 안에 할 수 있는 작은 단계로 나눠 보세요.",
+        "혼자 결론 내리기 전에 믿을 만한 사람 한 명에게 상황을 말로 정리해 들려주세요.",
+        "하루 30분은 결과와 상관없는 휴식 시간으로 정해 두고 지켜 주세요.",
+    ],
+    "resolution_hint": "계절이 한 번 바뀌는 석 달 정도 뒤부터 흐름이 한결 부드러워집니다. "
+                       "특히 새로운 사람과의 만남이 실마리가 될 가능성이 큽니다.",
+}
+
+CANNED_INTERPRETATION = """## 🌈 당신의 오행 에너지
+
+당신은 따뜻한 불의 기운과 단단한 흙의 기운을 함께 가지고 태어났어요. 사람들 앞에서 밝게 빛나면서도, 한번 맡은 일은 끝까지 책임지는 든든함이 있습니다.
+
+### 💪 강점
+- 분위기를 밝게 만드는 힘이 있어 자연스럽게 사람이 모여요.
+- 계획을 세우면 꾸준히 밀고 나가는 끈기가 있습니다.
+
+### 🌱 보완하면 좋은 점
+물의 기운이 다소 약해 쉬어 가는 법을 잊기 쉬워요. 충분히 자고, 감정을 글로 정리하는 습관이 균형을 잡아 줍니다.
+
+### 🔮 앞으로의 흐름
+올해는 그동안 쌓아 온 것이 눈에 보이는 결과로 이어지는 시기입니다. 작은 성취를 스스로 인정해 주세요.
+"""
+
+CANNED_SUMMARY = """1. 타고난 기질: 밝고 책임감이 강한 사람입니다.
+2. 관계: 주변을 챙기지만 정작 자신의 마음은 뒤로 미루는 편입니다.
+3. 일과 재물: 꾸준히 쌓아 가는 방식에서 큰 성과가 납니다.
+4. 건강: 휴식과 수면 리듬을 지키는 것이 가장 중요합니다.
+5. 인생 가이드: 완벽보다 꾸준함을 믿고, 도움을 청하는 연습을 해 보세요."""
+
+
+# 톤별 버전 요청(TONE_MODE=all)에 쓰는 말투별 첫 문장
+CANNED_TONE_OPENERS = {
+    "empathy": "지금까지 정말 잘 버텨 오셨어요.",
+    "reality": "핵심부터 정리하겠습니다.",
+    "fun": "오 이 사주 꽤 재밌는데? 😎",
+}
+
+
+def _canned_content(messages: list) -> str:
+    system = " ".join((m.get("content") or "") for m in messages if m.get("role") == "system")
+    if "root_cause" in system:
+        return json.dumps(CANNED_CONCERN, ensure_ascii=False, indent=2)
+    if '{"empathy"' in system:
+        return json.dumps({tone: f"{opener}\n\n{CANNED_INTERPRETATION}" for tone, opener in CANNED_TONE_OPENERS.items()},
+                          ensure_ascii=False)
+    if "요약" in system or "가이드" in system:
+        return CANNED_SUMMARY
+    return CANNED_INTERPRETATION
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, model: str):
+    """max_tokens 초과 시 잘라서 finish_reason=length"""
+    if not max_tokens or estimate_tokens(text, model) <= max_tokens:
+        return text, "stop"
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid], model) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo], "length"
+
+
+def _latency_sec() -> float:
+    mean = STUB_CONFIG["latency_ms"] / 1000.0
+    jitter = STUB_CONFIG["latency_jitter_ms"] / 1000.0
+    dist = STUB_CONFIG["latency_dist"]
+    if dist == "fixed" or mean <= 0:
+        return max(0.0, mean)
+    if dist == "uniform":
+        return max(0.0, _rng.uniform(mean - jitter, mean + jitter))
+    # lognormal: 중앙값 mean, jitter/mean 을 sigma로 (꼬리가 긴 실제 API 지연에 가까움)
+    sigma = jitter / mean if mean else 0.5
+    return _rng.lognormvariate(math.log(mean), sigma)
+
+
+def _cached_tokens(messages: list, model: str) -> int:
+    """system 메시지가 최근 요청과 같으면 그 토큰 수(128 단위 내림)를 캐시 적중으로 간주"""
+    system = "".join((m.get("content") or "") for m in messages if m.get("role") == "system")
+    tokens = estimate_tokens(system, model)
+    if tokens < PREFIX_CACHE_MIN_TOKENS:
+        return 0
+    key = hashlib.sha1(f"{model}\n{system}".encode("utf-8")).hexdigest()
+    hit = key in _prefix_cache
+    _prefix_cache[key] = tokens
+    _prefix_cache.move_to_end(key)
+    while len(_prefix_cache) > PREFIX_CACHE_SIZE:
+        _prefix_cache.popitem(last=False)
+    return tokens // 128 * 128 if hit else 0
+
+
+def _chunks(text: str, size: int = 8):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+# ==================== 엔드포인트 ====================
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model") or "gpt-4o"
+    messages = body.get("messages") or []
+    max_tokens = body.get("max_tokens") or 0
+    stream = bool(body.get("stream"))
+
+    _stats["requests"] += 1
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    streaming = False
+    try:
+        roll = _rng.random()
+        if roll < STUB_CONFIG["hang_rate"]:
+            _stats["hangs"] += 1
+            await asyncio.sleep(STUB_CONFIG["hang_sec"])
+        elif roll < STUB_CONFIG["hang_rate"] + STUB_CONFIG["error_rate"]:
+            _stats["errors"] += 1
+            await asyncio.sleep(_latency_sec() / 4)
+            status = STUB_CONFIG["error_status"]
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"message": f"stub injected error {status}", "type": "server_error", "code": None}},
+            )
+
+        content, finish_reason = _truncate_to_tokens(_canned_content(messages), max_tokens, model)
+        prompt_tokens = count_messages_tokens(messages, model)
+        completion_tokens = estimate_tokens(content, model)
+        cached_tokens = _cached_tokens(messages, model)
+        if cached_tokens:
+            _stats["cache_hits"] += 1
+        _stats["prompt_tokens"] += prompt_tokens
+        _stats["completion_tokens"] += completion_tokens
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        tps = STUB_CONFIG["tokens_per_sec"]
+
+        await asyncio.sleep(_latency_sec() * (STUB_CONFIG["cache_speedup"] if cached_tokens else 1.0))
+
+        if not stream:
+            if tps > 0:
+                await asyncio.sleep(completion_tokens / tps)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            }
+
+        _stats["streamed"] += 1
+
+        async def event_stream():
+            try:
+                async for line in _stream_lines():
+                    yield line
+            finally:
+                _stats["in_flight"] -= 1
+
+        async def _stream_lines():
+            def chunk(delta, finish=None):
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                }
+                return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in _chunks(content):
+                if tps > 0:
+                    await asyncio.sleep(estimate_tokens(piece, model) / tps)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                tail = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                        "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(tail)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        streaming = True
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+    finally:
+        # 스트리밍은 본문 전송이 끝날 때 event_stream 에서 차감
+        if not streaming:
+            _stats["in_flight"] -= 1
+
+
+@app.get("/stub/config")
+def get_config():
+    return STUB_CONFIG
+
+
+@app.post("/stub/config")
+async def set_config(request: Request):
+    """실행 중 설정 변경 예: {"error_rate": 0.5, "error_status": 503}"""
+    updates = await request.json()
+    for k, v in updates.items():
+        if k in STUB_CONFIG:
+            STUB_CONFIG[k] = type(STUB_CONFIG[k])(v) if STUB_CONFIG[k] is not None else v
+    if updates.get("seed") is not None:
+        _rng.seed(updates["seed"])
+    return STUB_CONFIG
+
+
+@app.get("/stub/stats")
+def get_stats():
+    return _stats
+
+
+def configure(**overrides) -> None:
+    """같은 프로세스에서 띄울 때 (부하 테스트 하네스) 설정 변경"""
+    for k, v in overrides.items():
+        if v is not None and k in STUB_CONFIG:
+            STUB_CONFIG[k] = v
+    if overrides.get("seed") is not None:
+        _rng.seed(overrides["seed"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="로컬 OpenAI 호환 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--tokens-per-sec", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-status", type=int)
+    parser.add_argument("--hang-rate", type=float)
+    parser.add_argument("--hang-sec", type=float)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    configure(**{k: v for k, v in vars(args).items() if k not in ("host", "port")})
+    print(f"🧪 OpenAI 스텁 서버 시작: http://{args.host}:{args.port}/v1  설정={STUB_CONFIG}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
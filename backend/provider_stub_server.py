@@ -0,0 +1,187 @@
+"""
+로컬 외부 API 스텁 서버 — 카카오·구글 로그인, PortOne 결제 조회를 흉내내 로그인/결제 지연 측정용
+실행: cd backend && python provider_stub_server.py --port 8901 --latency-ms 80 --connect-penalty-ms 120
+백엔드 연결 (logic/http_clients.py 가 읽는 기본 주소):
+  KAKAO_AUTH_BASE=http://127.0.0.1:8901/kakao-auth   KAKAO_API_BASE=http://127.0.0.1:8901/kakao-api
+  GOOGLE_OAUTH_BASE=http://127.0.0.1:8901/google-oauth GOOGLE_OIDC_BASE=http://127.0.0.1:8901/google-oidc
+  PORTONE_API_BASE=http://127.0.0.1:8901/portone
+
+- 카카오: POST /kakao-auth/oauth/token, GET /kakao-api/v2/user/me
+- 구글:  POST /google-oauth/token,      GET /google-oidc/v1/userinfo
+- PortOne: GET /portone/v2/payments/{payment_id}  (status·금액은 설정값, 결제 ID별 호출 수 집계)
+- 같은 code 로 만든 토큰은 같은 사용자 → 부하 테스트에서 code 를 바꾸면 새 사용자
+- connect_penalty_ms: 새 연결의 첫 요청에만 더하는 지연 (실서버의 TCP+TLS 핸드셰이크 비용 흉내)
+  → 연결을 재사용하면 그만큼 빨라지는 것을 로컬에서 확인. /stub/stats 의 connections = 새 연결 수
+"""
+import asyncio
+import os
+import random
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+STUB_CONFIG = {
+    # 요청마다 지연 (ms, 균등 분포 jitter)
+    "latency_ms": float(os.getenv("PROVIDER_STUB_LATENCY_MS", "50")),
+    "latency_jitter_ms": float(os.getenv("PROVIDER_STUB_LATENCY_JITTER_MS", "20")),
+    # 새 연결의 첫 요청에 더하는 지연 (ms)
+    "connect_penalty_ms": float(os.getenv("PROVIDER_STUB_CONNECT_PENALTY_MS", "100")),
+    # 오류 주입
+    "error_rate": float(os.getenv("PROVIDER_STUB_ERROR_RATE", "0")),
+    "error_status": int(os.getenv("PROVIDER_STUB_ERROR_STATUS", "500")),
+    # PortOne 결제 조회 응답 status / 결제 금액 (/payment/create 주문 금액과 같아야 확인 통과)
+    "payment_status": os.getenv("PROVIDER_STUB_PAYMENT_STATUS", "PAID"),
+    "payment_amount": int(os.getenv("PROVIDER_STUB_PAYMENT_AMOUNT", "3900")),
+    "seed": None,
+}
+
+_stats = {"requests": 0, "errors": 0, "connections": 0, "in_flight": 0, "max_in_flight": 0}
+_by_route: Counter = Counter()
+_payment_lookups: Counter = Counter()
+_peers = set()
+_rng = random.Random()
+
+app = FastAPI(title="Provider Stub", version="0.1.0")
+
+
+async def _simulate(request: Request, route: str):
+    """지연·오류 주입. 오류면 JSONResponse, 아니면 None"""
+    _stats["requests"] += 1
+    _by_route[route] += 1
+    delay = STUB_CONFIG["latency_ms"] + _rng.uniform(0, STUB_CONFIG["latency_jitter_ms"])
+    peer = request.scope.get("client")
+    if peer not in _peers:
+        _peers.add(peer)
+        _stats["connections"] += 1
+        delay += STUB_CONFIG["connect_penalty_ms"]
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        await asyncio.sleep(delay / 1000.0)
+    finally:
+        _stats["in_flight"] -= 1
+    if STUB_CONFIG["error_rate"] and _rng.random() < STUB_CONFIG["error_rate"]:
+        _stats["errors"] += 1
+        return JSONResponse({"error": "stub_injected"}, status_code=STUB_CONFIG["error_status"])
+    return None
+
+
+def _bearer(request: Request) -> str:
+    return (request.headers.get("authorization") or "").split(" ", 1)[-1]
+
+
+async def _token(request: Request, route: str):
+    error = await _simulate(request, route)
+    if error:
+        return error
+    form = await request.form()
+    code = form.get("code")
+    if not code:
+        return JSONResponse({"error": "invalid_grant"}, status_code=400)
+    return {"access_token": f"at-{code}", "token_type": "bearer", "expires_in": 3600}
+
+
+@app.post("/kakao-auth/oauth/token")
+async def kakao_token(request: Request):
+    return await _token(request, "kakao_token")
+
+
+@app.get("/kakao-api/v2/user/me")
+async def kakao_me(request: Request):
+    error = await _simulate(request, "kakao_me")
+    if error:
+        return error
+    code = _bearer(request).removeprefix("at-")
+    return {
+        "id": abs(hash(("kakao", code))) % 10**10,
+        "properties": {"nickname": f"스텁{code}"},
+        "kakao_account": {"email": f"{code}@kakao.stub", "profile": {"nickname": f"스텁{code}"}},
+    }
+
+
+@app.post("/google-oauth/token")
+async def google_token(request: Request):
+    return await _token(request, "google_token")
+
+
+@app.get("/google-oidc/v1/userinfo")
+async def google_userinfo(request: Request):
+    error = await _simulate(request, "google_userinfo")
+    if error:
+        return error
+    code = _bearer(request).removeprefix("at-")
+    return {"sub": f"g-{code}", "email": f"{code}@google.stub", "name": f"스텁{code}"}
+
+
+@app.get("/portone/v2/payments/{payment_id}")
+async def portone_payment(payment_id: str, request: Request):
+    error = await _simulate(request, "portone_payment")
+    if error:
+        return error
+    _payment_lookups[payment_id] += 1
+    return {
+        "id": payment_id,
+        "status": STUB_CONFIG["payment_status"],
+        "amount": {"total": STUB_CONFIG["payment_amount"], "paid": STUB_CONFIG["payment_amount"]},
+        "currency": "KRW",
+    }
+
+
+@app.get("/stub/config")
+def get_config():
+    return STUB_CONFIG
+
+
+@app.post("/stub/config")
+async def set_config(request: Request):
+    configure(**(await request.json()))
+    return STUB_CONFIG
+
+
+@app.get("/stub/stats")
+def get_stats():
+    return {**_stats, "by_route": dict(_by_route), "payment_lookups": dict(_payment_lookups)}
+
+
+def configure(**overrides) -> None:
+    """같은 프로세스에서 띄울 때 (부하 테스트 하네스) 설정 변경"""
+    for k, v in overrides.items():
+        if v is not None and k in STUB_CONFIG:
+            STUB_CONFIG[k] = type(STUB_CONFIG[k])(v) if STUB_CONFIG[k] is not None else v
+    if overrides.get("seed") is not None:
+        _rng.seed(overrides["seed"])
+
+
+def base_urls(host: str, port: int) -> dict:
+    """logic/http_clients.py 가 읽는 env 이름 → 이 스텁의 주소"""
+    root = f"http://{host}:{port}"
+    return {
+        "KAKAO_AUTH_BASE": f"{root}/kakao-auth",
+        "KAKAO_API_BASE": f"{root}/kakao-api",
+        "GOOGLE_OAUTH_BASE": f"{root}/google-oauth",
+        "GOOGLE_OIDC_BASE": f"{root}/google-oidc",
+        "PORTONE_API_BASE": f"{root}/portone",
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="로컬 카카오/구글/PortOne 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-jitter-ms", type=float)
+    parser.add_argument("--connect-penalty-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-status", type=int)
+    parser.add_argument("--payment-status")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    configure(**{k: v for k, v in vars(args).items() if k not in ("host", "port")})
+    print(f"🧪 외부 API 스텁 서버 시작: http://{args.host}:{args.port}  설정={STUB_CONFIG}")
+    for name, url in base_urls(args.host, args.port).items():
+        print(f"   {name}={url}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
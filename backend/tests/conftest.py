@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+# backend/ 를 import 경로에 추가 (logic.* 모듈 import용)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    """임시 앱 DB (마이그레이션 적용) — saju/users/payments/contact 모듈이 모두 이 파일을 사용"""
+    from logic import db
+    from logic.migrations import migrate
+
+    path = tmp_path / "app.db"
+    monkeypatch.setattr(db, "APP_DB", path)
+    migrate()
+    yield path
+    db.close_thread_connections()
@@ -0,0 +1,67 @@
+"""분석 결과 압축 표기: 같은 사실을 모두 담으면서 기존 repr 기반 프롬프트보다 토큰이 줄어야 함"""
+import pytest
+
+from logic.analysis_codec import SINSAL_KINDS, encode_analysis
+from logic.prompt_builder import estimate_tokens
+from logic.saju_engine.core.analyzer import analyze_full_saju
+
+CHARTS = [
+    ("甲", {"year": "甲子", "month": "丙寅", "day": "甲午", "hour": "己巳"}),
+    ("癸", {"year": "庚辰", "month": "乙酉", "day": "癸未", "hour": "庚申"}),
+    ("丙", {"year": "壬午", "month": "壬子", "day": "丙午", "hour": "丙申"}),
+    ("己", {"year": "乙卯", "month": "丁亥", "day": "己卯", "hour": "甲戌"}),
+]
+
+
+def _legacy_chart_block(day_stem, pillars, analysis):
+    """압축 표기 도입 전 _build_concern_user_prompt 의 사주 정보 블록 (비교 기준)"""
+    summary = analysis["summary"]
+    ec = summary["element_count"]
+    ten_gods = ", ".join(f"{k}{v}개" for k, v in summary["ten_gods_count"].items() if v > 0) or "없음"
+    patterns = ", ".join(analysis["patterns"]) or "없음"
+    return f"""## 사주 정보
+- 일간: {day_stem}
+- 사주: 년주 {pillars['year']}, 월주 {pillars['month']}, 일주 {pillars['day']}, 시주 {pillars['hour']}
+- 신강약: {summary['strength']} (점수: {summary['strength_score']})
+- 오행 분포: 목 {ec['wood']}, 화 {ec['fire']}, 토 {ec['earth']}, 금 {ec['metal']}, 수 {ec['water']}
+- 십성 분포: {ten_gods}
+- 패턴/특징: {patterns}
+- 합충: {analysis['harmony_clash']}"""
+
+
+@pytest.mark.parametrize("day_stem,pillars", CHARTS)
+def test_encoding_keeps_every_fact(day_stem, pillars):
+    analysis = analyze_full_saju(day_stem, pillars)
+    text = encode_analysis(analysis)
+    summary = analysis["summary"]
+
+    assert f"일간 {day_stem}" in text
+    assert " ".join(pillars[k] for k in ("year", "month", "day", "hour")) in text
+    assert f"{summary['strength']} {summary['strength_score']}/100" in text
+    for key, abbr in (("wood", "목"), ("fire", "화"), ("earth", "토"), ("metal", "금"), ("water", "수")):
+        assert f"{abbr}{summary['element_count'][key]}" in text
+    for god, n in summary["ten_gods_count"].items():
+        assert f"{god}{n}" in text
+    for kind, items in analysis["harmony_clash"].items():
+        for item in items:
+            if "position" in item:
+                assert f"{item['position']} {item['chars']}" in text, (kind, item)
+            else:
+                assert item["name"] in text, (kind, item)
+    for key, label in SINSAL_KINDS:
+        for item in analysis["sinsal"][key]:
+            assert f"{label} {item['position']}{item['char']}" in text
+    # 같은 줄이 두 번 나오지 않음
+    lines = [line for line in text.splitlines() if line]
+    assert len(lines) == len(set(lines))
+
+
+def test_encoding_is_stable_and_cuts_prompt_tokens():
+    legacy_total = compact_total = 0
+    for day_stem, pillars in CHARTS:
+        analysis = analyze_full_saju(day_stem, pillars)
+        assert encode_analysis(analysis) == encode_analysis(analyze_full_saju(day_stem, pillars))
+        legacy_total += estimate_tokens(_legacy_chart_block(day_stem, pillars, analysis), "gpt-4o")
+        compact_total += estimate_tokens("## 사주 정보\n" + encode_analysis(analysis), "gpt-4o")
+    # 측정값(근사 토크나이저, 4개 사주 합계): 1558 → 486 토큰 (약 69% 감소). 회귀 기준은 40% 이하
+    assert compact_total <= legacy_total * 0.4, (compact_total, legacy_total)
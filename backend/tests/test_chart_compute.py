@@ -0,0 +1,35 @@
+from logic import chart_compute, saju_db
+
+
+def test_compute_and_render_chart():
+    chart = chart_compute.compute_chart("1990-05-05", None, "양력")
+    rendered = chart_compute.render_chart(chart)
+
+    assert rendered["solar_datetime"] == "1990-05-05 12:00"
+    assert [rendered[k] for k in chart_compute.PILLAR_KEYS] == ["庚午", "庚辰", "庚午", "壬午"]
+    assert rendered["day_stem"] == "庚"
+    assert sum(rendered["element_counts"].values()) == 8
+    assert rendered["strength"] and isinstance(rendered["strength_score"], int)
+
+
+def test_saved_row_carries_chart(app_db):
+    chart = chart_compute.compute_chart("1990-05-05", "12:00", "양력")
+    with_chart = saju_db.save_saju_for_user(1, "a", None, "1990-05-05", "12:00", "양력", "남자", chart=chart)
+    without = saju_db.save_saju_for_user(1, "b", None, "1990-05-05", "12:00", "양력", "남자")
+
+    assert saju_db.get_saju_by_id(with_chart, 1)["chart"] == chart_compute.render_chart(chart)
+    assert saju_db.get_saju_by_id(without, 1)["chart"] is None
+
+
+def test_backfill_streams_batches_and_skips_failures(app_db):
+    for i in range(5):
+        saju_db.save_saju_for_user(1, f"n{i}", None, f"1990-05-0{i + 1}", "08:30", "양력", "여자")
+    saju_db.save_saju_for_user(1, "bad", None, "1990-13-40", None, "양력", "여자")
+
+    stats = chart_compute.backfill_charts(batch_size=2)
+    assert stats == {"updated": 5, "failed": 1, "batches": 3}
+    rows = saju_db.get_saju_list_for_user(1)
+    assert sum(r["chart"] is not None for r in rows) == 5
+
+    # 다시 돌리면 실패한 행만 다시 시도
+    assert chart_compute.backfill_charts(batch_size=2) == {"updated": 0, "failed": 1, "batches": 1}
@@ -0,0 +1,145 @@
+"""서킷 브레이커: 실패/지연 비율로 open, open 중 즉시 거절, half-open 프로브로 복구"""
+import pytest
+
+from logic import llm_client
+from logic.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from logic.llm_scheduler import LLMScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _breaker(clock, **kw):
+    opts = dict(window_sec=60, min_calls=4, failure_rate=0.5, slow_call_sec=10, slow_rate=0.8, open_sec=30)
+    opts.update(kw)
+    return CircuitBreaker("test", clock=clock, **opts)
+
+
+def test_opens_on_failure_rate_and_rejects_immediately():
+    clock = Clock()
+    b = _breaker(clock)
+    for _ in range(2):
+        b.before_call()
+        b.record_success(0.5)
+    for _ in range(2):
+        b.before_call()
+        b.record_failure(RuntimeError("503"))
+    assert b.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        b.before_call()
+    assert exc.value.retry_after == pytest.approx(30)
+    assert b.stats()["rejected"] == 1
+
+
+def test_opens_on_slow_calls():
+    clock = Clock()
+    b = _breaker(clock)
+    for _ in range(4):
+        b.before_call()
+        b.record_success(25.0)
+    assert b.state == STATE_OPEN
+
+
+def test_old_failures_leave_the_window():
+    clock = Clock()
+    b = _breaker(clock)
+    for _ in range(3):
+        b.before_call()
+        b.record_failure()
+    clock.t = 120
+    b.before_call()
+    b.record_failure()
+    assert b.state == STATE_CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = Clock()
+    b = _breaker(clock)
+    for _ in range(4):
+        b.before_call()
+        b.record_failure()
+    clock.t = 31
+    assert b.state == STATE_HALF_OPEN
+
+    b.before_call()  # 프로브 1건 통과
+    with pytest.raises(CircuitOpenError):
+        b.before_call()  # 프로브 진행 중 나머지는 거절
+    b.record_failure()
+    assert b.state == STATE_OPEN
+
+    clock.t = 62
+    b.before_call()
+    b.record_success(1.0)
+    assert b.state == STATE_CLOSED
+    b.before_call()
+
+
+class _FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+        class _Completions:
+            def create(inner, **kwargs):
+                self.calls += 1
+                raise TimeoutError("upstream timeout")
+
+        class _Chat:
+            completions = _Completions()
+
+        self.chat = _Chat()
+
+
+def test_chat_completion_skips_upstream_while_open(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_client, "breaker", _breaker(clock))
+    monkeypatch.setattr(llm_client, "scheduler", LLMScheduler(limits={}))
+    client = _FailingClient()
+    messages = [{"role": "user", "content": "x"}]
+
+    for _ in range(4):
+        with pytest.raises(TimeoutError):
+            llm_client.chat_completion(client, call_name="t", model="m", messages=messages, max_tokens=10)
+    with pytest.raises(CircuitOpenError):
+        llm_client.chat_completion(client, call_name="t", model="m", messages=messages, max_tokens=10)
+    assert client.calls == 4
+
+
+class _RateLimitedClient(_FailingClient):
+    def __init__(self):
+        super().__init__()
+
+        class _RateLimitError(Exception):
+            status_code = 429
+
+        def create(**kwargs):
+            self.calls += 1
+            raise _RateLimitError("rate limit exceeded")
+
+        self.chat.completions.create = create
+
+
+def test_rate_limited_calls_do_not_open_the_breaker(monkeypatch):
+    clock = Clock()
+    b = _breaker(clock)
+    monkeypatch.setattr(llm_client, "breaker", b)
+    monkeypatch.setattr(llm_client, "scheduler", LLMScheduler(limits={}))
+    client = _RateLimitedClient()
+    messages = [{"role": "user", "content": "x"}]
+
+    for _ in range(10):
+        with pytest.raises(Exception) as exc:
+            llm_client.chat_completion(client, call_name="t", model="m", messages=messages, max_tokens=10)
+        assert llm_client.is_rate_limited(exc.value)
+    # 429 가 몰려도 다른 호출(유료 고민 분석 등)은 계속 OpenAI 로 나감
+    assert b.state == STATE_CLOSED and client.calls == 10
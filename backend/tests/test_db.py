@@ -0,0 +1,84 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from logic import db, saju_db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "t.db"
+    yield path
+    db.close_thread_connections()
+
+
+def test_connection_is_reused_per_thread_with_pragmas(db_path):
+    with db.connection(db_path) as a, db.connection(db_path) as b:
+        assert a is b
+        assert a.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert a.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert a.execute("PRAGMA busy_timeout").fetchone()[0] == db.SQLITE_BUSY_TIMEOUT_MS
+
+    other = []
+    t = threading.Thread(target=lambda: (other.append(db.get_conn(db_path)), db.close_thread_connections()))
+    t.start()
+    t.join()
+    assert other[0] is not a
+
+
+def test_uncommitted_write_is_rolled_back(db_path):
+    with db.connection(db_path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.commit()
+
+    with pytest.raises(RuntimeError):
+        with db.connection(db_path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+
+    with db.connection(db_path) as conn:
+        conn.execute("INSERT INTO t VALUES (2)")  # commit 누락
+
+    with db.connection(db_path) as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_run_db_keeps_event_loop_responsive_while_db_is_locked(app_db):
+    """다른 연결이 쓰기 잠금을 0.3초 쥐고 있어도 async 라우트 경로(run_db)는 루프를 막지 않음"""
+    blocker = sqlite3.connect(app_db, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, blocker.commit).start()
+
+    async def scenario():
+        lags = []
+        stop = asyncio.Event()
+
+        async def probe():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - t0 - 0.001)
+
+        probe_task = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        saju_ids = await asyncio.gather(*[
+            db.run_db(saju_db.save_saju_for_user, user_id=1, name=f"n{i}", relation=None,
+                      birthdate="1990-01-01", birth_time=None, calendar_type="양력", gender="남자")
+            for i in range(8)
+        ])
+        waited = time.perf_counter() - t0
+        stop.set()
+        await probe_task
+        return saju_ids, waited, max(lags)
+
+    saju_ids, waited, max_lag = asyncio.run(scenario())
+    blocker.close()
+
+    assert sorted(saju_ids) == list(range(1, 9))
+    assert waited >= 0.25            # 저장은 실제로 잠금을 기다렸고
+    assert max_lag < 0.02            # 그동안 루프는 계속 돌았음
+    assert saju_db.get_saju_count_for_user(1) == 8
@@ -0,0 +1,92 @@
+"""요청 deadline: 남은 시간으로 OpenAI 타임아웃/쿼터 대기를 줄이고, 지나면 호출 없이 폴백 섹션으로 기록"""
+from types import SimpleNamespace
+
+import pytest
+
+from logic import deadline as deadline_mod
+from logic import llm_client, llm_metrics
+from logic.circuit_breaker import CircuitBreaker
+from logic.deadline import Deadline, DeadlineExceeded, deadline_scope, parse_deadline_header
+from logic.llm_scheduler import LLMScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class StubOpenAI:
+    """with_options(timeout=, max_retries=) 로 받은 옵션을 기록하는 스텁"""
+
+    def __init__(self, options=None, on_create=None):
+        self.options = options or {}
+        self.created = []
+        self.on_create = on_create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def with_options(self, **options):
+        clone = StubOpenAI(options, self.on_create)
+        clone.created = self.created
+        return clone
+
+    def _create(self, **kwargs):
+        self.created.append(self.options)
+        if self.on_create:
+            self.on_create()
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=10, total_tokens=20)
+        choice = SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason="stop")
+        return SimpleNamespace(choices=[choice], usage=usage)
+
+
+@pytest.fixture(autouse=True)
+def isolated_client(monkeypatch):
+    m = llm_metrics.LLMMetrics(ndjson_path="")
+    monkeypatch.setattr(llm_client, "metrics", m)
+    monkeypatch.setattr(llm_client, "scheduler", LLMScheduler(limits={}))
+    monkeypatch.setattr(llm_client, "breaker", CircuitBreaker("t"))
+    return m
+
+
+def _call(client, name="comprehensive.elements"):
+    return llm_client.chat_completion(client, call_name=name, model="gpt-4o",
+                                      messages=[{"role": "user", "content": "x"}], max_tokens=100)
+
+
+def test_header_is_parsed_and_clamped():
+    assert parse_deadline_header(None, default_sec=20) == 20
+    assert parse_deadline_header("abc", default_sec=20) == 20
+    assert parse_deadline_header("15000") == 15
+    assert parse_deadline_header("10") == deadline_mod.MIN_DEADLINE_SEC
+    assert parse_deadline_header("999999") == deadline_mod.MAX_DEADLINE_SEC
+
+
+def test_openai_timeout_is_the_remaining_budget():
+    clock = Clock()
+    client = StubOpenAI()
+    with deadline_scope(Deadline(20, clock=clock)):
+        clock.t = 12
+        _call(client)
+    assert client.created == [{"timeout": 8, "max_retries": 0}]
+
+
+def test_expired_deadline_skips_the_call_and_marks_the_section(isolated_client):
+    clock = Clock()
+    client = StubOpenAI(on_create=lambda: setattr(clock, "t", 25))
+    with deadline_scope(Deadline(20, clock=clock)) as dl:
+        _call(client, "comprehensive.elements")
+        with pytest.raises(DeadlineExceeded):
+            _call(client, "core_values")
+    assert len(client.created) == 1
+    meta = dl.metadata()
+    assert meta["partial"] is True and meta["fallback_sections"] == ["core_values"]
+    outcomes = isolated_client.snapshot()["calls"]["-"]["core_values:gpt-4o"]["outcomes"]
+    assert outcomes == {"deadline": 1}
+
+
+def test_no_deadline_leaves_client_untouched():
+    client = StubOpenAI()
+    _call(client)
+    assert client.created == [{}]
@@ -0,0 +1,153 @@
+"""작업 큐: 제출 → 워커 실행 → 결과 저장, 재시작 후 복구, 중복 제출 병합, HTTP 경로 (로컬 OpenAI 스텁)"""
+import asyncio
+import socket
+
+import pytest
+
+from logic import db, job_queue
+
+CONCERN_REQUEST = {
+    "day_stem": "癸",
+    "year_pillar": "庚辰",
+    "month_pillar": "乙酉",
+    "day_pillar": "癸未",
+    "hour_pillar": "庚申",
+    "concern": "이직을 해야 할까요?",
+}
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOBS_DB", tmp_path / "jobs.db")
+    job_queue.init_jobs_db()
+    yield
+    db.close_thread_connections()
+
+
+def _fake_concern(payload):
+    # 큐 동작만 볼 때: _concern_result_from_raw 와 같은 모양의 결과 (GPT 경로는 test_concern_job_over_http)
+    return {"success": True, "root_cause": f"원인: {payload['concern']}", "directions": ["a", "b", "c"]}
+
+
+def test_submit_and_long_poll_returns_result():
+    async def scenario():
+        pool = job_queue.JobWorkerPool(workers=2, poll_sec=0.05)
+        pool.register("concern_analysis", _fake_concern)
+        await pool.start()
+        try:
+            job = await pool.submit("concern_analysis", {"concern": "이직"}, dedupe_key="k1")
+            assert job["status"] == job_queue.STATUS_QUEUED
+            done = await pool.wait_for(job["id"], timeout=5)
+            return done
+        finally:
+            await pool.stop()
+
+    done = asyncio.run(scenario())
+    assert done["status"] == job_queue.STATUS_DONE
+    assert done["result"]["root_cause"] == "원인: 이직"
+    # 결과는 DB에 남아 있어 다른 프로세스/재시작 후에도 조회 가능
+    assert job_queue.get_job(done["id"])["result"] == done["result"]
+
+
+def test_duplicate_submit_reuses_job():
+    first = job_queue.submit_job("concern_analysis", {"concern": "x"}, dedupe_key="same")
+    second = job_queue.submit_job("concern_analysis", {"concern": "x"}, dedupe_key="same")
+    assert second["id"] == first["id"]
+    assert second["deduplicated"] is True
+
+
+def test_interrupted_job_is_requeued_and_finished_after_restart():
+    job = job_queue.submit_job("concern_analysis", {"concern": "재시작"})
+    claimed = job_queue.claim_next_job(["concern_analysis"])
+    assert claimed["id"] == job["id"] and claimed["status"] == job_queue.STATUS_RUNNING
+
+    # 서버가 여기서 죽었다고 가정 → 새 풀이 기동하면서 running 작업을 다시 실행
+    async def restart():
+        pool = job_queue.JobWorkerPool(workers=1, poll_sec=0.05)
+        pool.register("concern_analysis", _fake_concern)
+        await pool.start()
+        try:
+            return await pool.wait_for(job["id"], timeout=5)
+        finally:
+            await pool.stop()
+
+    done = asyncio.run(restart())
+    assert done["status"] == job_queue.STATUS_DONE
+    assert done["attempts"] == 2
+
+
+def test_failed_job_retries_then_fails():
+    calls = []
+
+    def flaky(payload):
+        calls.append(1)
+        raise RuntimeError("GPT 502")
+
+    async def scenario():
+        pool = job_queue.JobWorkerPool(workers=1, max_attempts=2, poll_sec=0.05)
+        pool.register("concern_analysis", flaky)
+        await pool.start()
+        try:
+            job = await pool.submit("concern_analysis", {"concern": "y"})
+            return await pool.wait_for(job["id"], timeout=5)
+        finally:
+            await pool.stop()
+
+    done = asyncio.run(scenario())
+    assert done["status"] == job_queue.STATUS_FAILED
+    assert len(calls) == 2
+    assert "GPT 502" in done["error"]
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """로컬 OpenAI 스텁 서버를 띄우고 SDK가 그쪽을 보도록 env 설정"""
+    pytest.importorskip("uvicorn")
+    pytest.importorskip("openai")
+    from loadtest_gpt import start_stub_server
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    start_stub_server(port, latency_ms=0, latency_jitter_ms=0, latency_dist="fixed", tokens_per_sec=0,
+                      error_rate=0, hang_rate=0)
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-stub")
+    return port
+
+
+def test_concern_job_over_http(openai_stub, app_db, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    monkeypatch.setattr(main, "client", main.client or object())  # 다른 테스트가 키 없이 먼저 import 한 경우
+
+    async def scenario():
+        pool = job_queue.JobWorkerPool(workers=1, poll_sec=0.05)
+        pool.register("concern_analysis", main._concern_job_handler)
+        monkeypatch.setattr(main, "job_pool", pool)
+        await pool.start()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+        try:
+            submitted = await client.post("/saju/concern-analysis/jobs", json=CONCERN_REQUEST)
+            again = await client.post("/saju/concern-analysis/jobs", json=CONCERN_REQUEST)
+            polled = await client.get(f"/saju/jobs/{submitted.json()['job_id']}", params={"wait": 10})
+            missing = await client.get("/saju/jobs/no-such-job")
+            return submitted, again, polled, missing
+        finally:
+            await client.aclose()
+            await pool.stop()
+
+    submitted, again, polled, missing = asyncio.run(scenario())
+
+    assert submitted.status_code == 202 and submitted.json()["deduplicated"] is False
+    # 같은 사주 + 같은 고민 재제출 → 같은 작업
+    assert again.status_code == 202
+    assert again.json()["job_id"] == submitted.json()["job_id"] and again.json()["deduplicated"] is True
+
+    body = polled.json()
+    assert polled.status_code == 200 and body["status"] == job_queue.STATUS_DONE
+    assert body["result"]["success"] is True
+    assert body["result"]["root_cause"] and len(body["result"]["directions"]) == 3
+
+    assert missing.status_code == 404
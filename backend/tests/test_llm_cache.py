@@ -0,0 +1,43 @@
+"""섹션 결과 캐시: 같은 프롬프트는 같은 키, TTL 만료, 용량 초과 시 LRU 제거"""
+from logic.llm_cache import TTLCache, prompt_key
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _messages(chart):
+    return [{"role": "system", "content": "가이드"}, {"role": "user", "content": chart}]
+
+
+def test_prompt_key_depends_on_messages_and_limits():
+    k1 = prompt_key("comprehensive", "gpt-4o", _messages("일간 甲"), 1800)
+    assert k1 == prompt_key("comprehensive", "gpt-4o", _messages("일간  甲 "), 1800)
+    assert k1 != prompt_key("comprehensive", "gpt-4o", _messages("일간 乙"), 1800)
+    assert k1 != prompt_key("comprehensive", "gpt-4o", _messages("일간 甲"), 900)
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = TTLCache("t", ttl_sec=60, max_entries=10, clock=clock)
+    cache.set("a", "본문")
+    clock.t = 59
+    assert cache.get("a") == "본문"
+    clock.t = 61
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("t", ttl_sec=60, max_entries=2, clock=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,65 @@
+"""LLM 계측: 호출별 토큰/비용/잘림 집계, 리포트 단위 비용, NDJSON 기록"""
+import json
+from types import SimpleNamespace
+
+from logic import llm_client, llm_metrics
+from logic.circuit_breaker import CircuitBreaker
+from logic.llm_scheduler import LLMScheduler
+
+
+class StubOpenAI:
+    def __init__(self, finish_reason="stop"):
+        self.finish_reason = finish_reason
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=500, total_tokens=1500,
+                                prompt_tokens_details={"cached_tokens": 512})
+        choice = SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason=self.finish_reason)
+        return SimpleNamespace(choices=[choice], usage=usage)
+
+
+def test_calls_are_aggregated_per_endpoint_and_section(tmp_path, monkeypatch):
+    path = tmp_path / "llm.ndjson"
+    m = llm_metrics.LLMMetrics(ndjson_path=str(path))
+    monkeypatch.setattr(llm_metrics, "metrics", m)
+    monkeypatch.setattr(llm_client, "metrics", m)
+    monkeypatch.setattr(llm_client, "scheduler", LLMScheduler(limits={}))
+    monkeypatch.setattr(llm_client, "breaker", CircuitBreaker("t"))
+    messages = [{"role": "user", "content": "x"}]
+
+    with llm_metrics.report_scope("interpret-gpt") as report:
+        llm_client.chat_completion(StubOpenAI(), call_name="comprehensive", model="gpt-4o",
+                                   messages=messages, max_tokens=500)
+        llm_client.chat_completion(StubOpenAI("length"), call_name="comprehensive", model="gpt-4o",
+                                   messages=messages, max_tokens=500)
+        llm_metrics.record_fallback("core_values", "timeout", model="gpt-4o-mini")
+
+    # (488 * 2.5 + 512 * 1.25 + 500 * 10) / 1M
+    per_call = (488 * 2.50 + 512 * 1.25 + 500 * 10.00) / 1_000_000
+    assert abs(report.cost_usd - 2 * per_call) < 1e-9
+    assert report.calls == 2 and report.fallbacks == 1
+
+    snap = m.snapshot()
+    series = snap["calls"]["interpret-gpt"]["comprehensive:gpt-4o"]
+    assert series["outcomes"] == {"ok": 2}
+    assert series["truncated"] == 1 and series["truncated_rate"] == 0.5
+    assert series["cached_tokens"] == 1024
+    assert series["latency_ms"]["count"] == 2
+    assert snap["calls"]["interpret-gpt"]["core_values:gpt-4o-mini"]["fallbacks"] == 1
+    assert snap["reports"]["interpret-gpt"]["cost_usd"]["count"] == 1
+    assert snap["reports"]["interpret-gpt"]["with_fallback"] == 1
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r["type"] for r in records] == ["llm_call", "llm_call", "fallback", "report"]
+    assert records[1]["finish_reason"] == "length"
+
+
+def test_calls_outside_a_scope_use_placeholder_endpoint(monkeypatch):
+    m = llm_metrics.LLMMetrics(ndjson_path="")
+    monkeypatch.setattr(llm_client, "metrics", m)
+    monkeypatch.setattr(llm_client, "scheduler", LLMScheduler(limits={}))
+    monkeypatch.setattr(llm_client, "breaker", CircuitBreaker("t"))
+    llm_client.chat_completion(StubOpenAI(), call_name="summary", model="gpt-4o-mini",
+                               messages=[{"role": "user", "content": "x"}], max_tokens=100)
+    assert "summary:gpt-4o-mini" in m.snapshot()["calls"]["-"]
@@ -0,0 +1,156 @@
+"""OpenAI 스케줄러: RPM/TPM 버킷, 우선순위 순서, 실제 usage 보정 (가짜 시계 + 로컬 스텁 클라이언트)"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from logic import llm_client
+from logic.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PAID,
+    LLMScheduler,
+    SchedulerTimeout,
+)
+
+
+class FakeClock:
+    """auto=True: 대기 요청 시 그만큼 시간을 즉시 진행. auto=False: 테스트가 advance()로 직접 진행"""
+
+    def __init__(self, auto=True):
+        self.t = 1000.0
+        self.auto = auto
+        self.lock = threading.Lock()
+
+    def now(self):
+        with self.lock:
+            return self.t
+
+    def advance(self, sec):
+        with self.lock:
+            self.t += sec
+
+    def wait(self, cond, timeout):
+        if self.auto and timeout is not None:
+            self.advance(timeout)
+        else:
+            cond.wait(0.005)
+
+
+class StubOpenAI:
+    """chat.completions.create 만 흉내내는 로컬 스텁"""
+
+    def __init__(self, total_tokens=100):
+        self.calls = []
+        self.total_tokens = total_tokens
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=self.total_tokens - 10, completion_tokens=10,
+                                total_tokens=self.total_tokens)
+        message = SimpleNamespace(content="ok")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def test_rpm_bucket_spaces_requests():
+    clock = FakeClock()
+    s = LLMScheduler(limits={"m": {"rpm": 2, "tpm": 100000}}, clock=clock)
+    assert s.acquire("m", 10) == 0
+    assert s.acquire("m", 10) == 0
+    # 분당 2회 → 세 번째는 30초 뒤에 배정
+    assert s.acquire("m", 10) == pytest.approx(30.0)
+
+
+def test_tpm_bucket_uses_estimate_and_settles_with_actual():
+    clock = FakeClock()
+    s = LLMScheduler(limits={"m": {"rpm": 1000, "tpm": 6000}}, clock=clock)
+    assert s.acquire("m", 5000) == 0
+    s.settle("m", 5000, 1000)  # 실제로는 1000 토큰만 사용 → 4000 반환
+    assert s.acquire("m", 4500) == 0
+    # 남은 500 → 4000 필요: 초당 100 토큰 보충 → 35초
+    assert s.acquire("m", 4000) == pytest.approx(35.0)
+
+
+def test_settle_reconciles_against_amount_taken():
+    clock = FakeClock()
+    s = LLMScheduler(limits={"m": {"rpm": 1000, "tpm": 6000}}, clock=clock)
+    # 용량보다 큰 추정치는 용량(6000)만 가져감 → 실제 1000 사용이면 5000만 돌려받아야 함
+    assert s.acquire("m", 9000) == 0
+    s.settle("m", 9000, 1000)
+    assert s.stats()["m"]["tpm_available"] == 5000
+
+
+def test_unconfigured_limits_do_not_wait():
+    clock = FakeClock(auto=False)
+    s = LLMScheduler(limits={"m": {"rpm": None, "tpm": None}}, clock=clock)
+    for _ in range(20):
+        assert s.acquire("m", 5000 + 1800, timeout=0.01) == 0
+        s.settle("m", 6800, 6000)
+    stats = s.stats()["m"]
+    assert stats["granted"]["interactive"] == 20
+    assert stats["tpm_available"] is None
+
+
+def test_timeout_raises_and_leaves_queue():
+    clock = FakeClock()
+    s = LLMScheduler(limits={"m": {"rpm": 1, "tpm": 100000}}, clock=clock)
+    s.acquire("m", 10)
+    with pytest.raises(SchedulerTimeout):
+        s.acquire("m", 10, PRIORITY_BACKGROUND, timeout=5)
+    stats = s.stats()["m"]
+    assert stats["timeouts"]["background"] == 1
+    assert sum(stats["queue_depth"].values()) == 0
+
+
+def test_paid_waiter_is_served_before_earlier_background():
+    clock = FakeClock(auto=False)
+    s = LLMScheduler(limits={"m": {"rpm": 1, "tpm": 100000}}, clock=clock)
+    s.acquire("m", 10)  # 버킷 소진
+
+    order = []
+
+    def worker(name, priority):
+        s.acquire("m", 10, priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=("background", PRIORITY_BACKGROUND))]
+    threads[0].start()
+    time.sleep(0.05)
+    for name, priority in (("interactive", PRIORITY_INTERACTIVE), ("paid", PRIORITY_PAID)):
+        t = threading.Thread(target=worker, args=(name, priority))
+        t.start()
+        threads.append(t)
+    time.sleep(0.05)
+    assert s.stats()["m"]["queue_depth"] == {"paid": 1, "interactive": 1, "background": 1}
+
+    for _ in range(3):
+        clock.advance(60)
+        deadline = time.time() + 2
+        before = len(order)
+        while len(order) == before and time.time() < deadline:
+            time.sleep(0.005)
+    for t in threads:
+        t.join(timeout=2)
+
+    assert order == ["paid", "interactive", "background"]
+
+
+def test_chat_completion_goes_through_scheduler(monkeypatch):
+    s = LLMScheduler(limits={"gpt-4o": {"rpm": 10, "tpm": 100000}}, clock=FakeClock())
+    monkeypatch.setattr(llm_client, "scheduler", s)
+    stub = StubOpenAI(total_tokens=120)
+
+    resp = llm_client.chat_completion(
+        stub, call_name="test", model="gpt-4o",
+        messages=[{"role": "user", "content": "안녕하세요"}],
+        max_tokens=2000, priority=PRIORITY_PAID,
+    )
+
+    assert resp.choices[0].message.content == "ok"
+    assert stub.calls[0]["max_tokens"] == 2000
+    stats = s.stats()["gpt-4o"]
+    assert stats["granted"]["paid"] == 1
+    # 추정치(입력 + max_tokens)를 잡았다가 실제 120 토큰만 차감된 상태로 보정
+    assert stats["tpm_available"] == 100000 - 120
@@ -0,0 +1,54 @@
+import sqlite3
+
+from logic import db, migrations, saju_db, user_db
+
+
+def test_migrations_apply_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "APP_DB", tmp_path / "app.db")
+    try:
+        assert migrations.current_version() == 0
+        assert migrations.migrate() == [version for version, _, _ in migrations.MIGRATIONS]
+        assert migrations.migrate() == []
+        assert migrations.current_version() == migrations.MIGRATIONS[-1][0]
+        with db.app_connection() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {"users", "seed_ledger", "saju", "payments", "payment_orders", "inquiries"} <= tables
+    finally:
+        db.close_thread_connections()
+
+
+def _legacy(path, *statements):
+    conn = sqlite3.connect(path)
+    for sql in statements:
+        conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_files_are_imported_with_ids(tmp_path, monkeypatch):
+    # 예전 파일별 DB — 나중에 추가된 컬럼(seed_balance, 명식 컬럼)이 없는 스키마
+    _legacy(
+        tmp_path / "users.db",
+        "CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, provider TEXT NOT NULL, provider_id TEXT NOT NULL, "
+        "email TEXT, nickname TEXT, created_at TEXT NOT NULL, last_login TEXT NOT NULL)",
+        "INSERT INTO users VALUES (7, 'kakao', '42', NULL, '홍길동', '2024-01-01', '2024-01-02')",
+    )
+    _legacy(
+        tmp_path / "saju.db",
+        "CREATE TABLE saju (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, name TEXT NOT NULL, "
+        "relation TEXT, birthdate TEXT NOT NULL, birth_time TEXT, calendar_type TEXT NOT NULL, gender TEXT NOT NULL, "
+        "created_at TEXT NOT NULL)",
+        "INSERT INTO saju VALUES (3, 7, '엄마', '가족', '1965-03-01', NULL, '음력', '여자', '2024-01-03')",
+    )
+    monkeypatch.setattr(db, "APP_DB", tmp_path / "app.db")
+    try:
+        migrations.migrate()
+
+        assert user_db.get_user_id_from_session("kakao:42") == 7
+        assert user_db.get_seed_balance(7) == 0
+        row = saju_db.get_saju_by_id(3, 7)
+        assert row["name"] == "엄마" and row["chart"] is None  # 명식은 backfill 대상
+        # 새 행은 옮겨 온 id 다음 번호부터
+        assert user_db.get_or_create_user("google", "g1") == 8
+    finally:
+        db.close_thread_connections()
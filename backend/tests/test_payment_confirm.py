@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from logic import payment_db, user_db
+from logic.payment_confirm import PaymentConfirmer, PaymentError
+
+SEED_PRODUCTS = {"seed_5": {"orderName": "씨앗 5개+보너스 1개", "amount": 3850, "seeds": 6}}
+
+
+class PortOneStandIn:
+    """PortOne 결제 조회 흉내: 호출 수를 세고 응답을 지연 (결제 ID는 그대로, 금액·통화는 설정값)"""
+
+    def __init__(self, status="PAID", delay=0.05, amount=3850, currency="KRW"):
+        self.status = status
+        self.delay = delay
+        self.amount = amount
+        self.currency = currency
+        self.calls = 0
+
+    async def __call__(self, payment_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"id": payment_id, "status": self.status,
+                "amount": {"total": self.amount, "paid": self.amount}, "currency": self.currency}
+
+
+@pytest.fixture
+def account_id(app_db):
+    uid = user_db.get_or_create_user("kakao", "buyer")
+    payment_db.create_order("order_a", "user_x", uid, "seed_5", 3850)
+    return uid
+
+
+def _purchases(uid):
+    with user_db.get_conn() as conn:
+        return conn.execute(
+            "SELECT delta, ref FROM seed_ledger WHERE user_id = ? AND reason = 'purchase'", (uid,)
+        ).fetchall()
+
+
+def test_concurrent_retries_verify_and_credit_once(account_id):
+    portone = PortOneStandIn()
+    # 워커 프로세스 두 개를 흉내: 병합기(SingleFlight)가 서로 다른 인스턴스
+    workers = [PaymentConfirmer(portone, SEED_PRODUCTS) for _ in range(2)]
+
+    async def scenario():
+        return await asyncio.gather(*[
+            workers[i % 2].confirm("user_x", "order_a", "order_a") for i in range(20)
+        ])
+
+    results = asyncio.run(scenario())
+
+    assert all(r["success"] and r["seeds_credited"] == 6 for r in results)
+    assert portone.calls <= 2  # 워커당 최대 한 번
+    assert user_db.get_seed_balance(account_id) == 6
+    assert _purchases(account_id) == [(6, "order_a")]
+
+    # 이후 재시도는 PortOne 없이 저장된 결과
+    replay = asyncio.run(workers[0].confirm("user_x", "order_a", "order_a"))
+    assert replay == {"success": True, "order_id": "order_a", "seeds_credited": 6,
+                      "account_id": account_id, "duplicate": True}
+    assert portone.calls <= 2
+
+
+def test_failed_verification_is_not_recorded(account_id):
+    portone = PortOneStandIn(status="FAILED", delay=0)
+    confirmer = PaymentConfirmer(portone, SEED_PRODUCTS)
+
+    with pytest.raises(PaymentError) as exc:
+        asyncio.run(confirmer.confirm("user_x", "order_a", "order_a"))
+    assert exc.value.status_code == 400
+    assert payment_db.get_payment("order_a") is None
+
+    portone.status = "PAID"
+    assert asyncio.run(confirmer.confirm("user_x", "order_a", "order_a"))["seeds_credited"] == 6
+    assert portone.calls == 2
+
+    # 같은 주문을 다른 결제 ID로 확인하면 거절
+    with pytest.raises(PaymentError) as exc:
+        asyncio.run(confirmer.confirm("user_x", "other_payment", "order_a"))
+    assert exc.value.status_code == 409
+    assert user_db.get_seed_balance(account_id) == 6
+
+
+def test_credit_rolls_back_with_conflicting_payment_row(account_id):
+    # 다른 요청이 결제 기록을 먼저 남긴 상태 → 적립도 같은 트랜잭션에서 되돌려짐
+    assert payment_db.save_payment("user_x", "order_a", "order_a")
+    record = payment_db.record_paid_order("user_x", "order_a", "order_a", account_id, "seed_5", 6)
+
+    assert record["seeds"] == 0
+    assert user_db.get_seed_balance(account_id) == 0
+    assert _purchases(account_id) == []
+
+
+def _rejected(confirmer, *args, account_id=None):
+    with pytest.raises(PaymentError) as exc:
+        asyncio.run(confirmer.confirm("user_x", *args, account_id=account_id))
+    return exc.value.status_code
+
+
+def test_payment_must_match_stored_order(account_id):
+    payment_db.create_order("order_b", "user_x", account_id, "seed_5", 3850)
+
+    # 금액·통화가 주문과 다르면 거절
+    assert _rejected(PaymentConfirmer(PortOneStandIn(delay=0, amount=770), SEED_PRODUCTS), "order_a", "order_a") == 400
+    assert _rejected(PaymentConfirmer(PortOneStandIn(delay=0, currency="USD"), SEED_PRODUCTS),
+                     "order_a", "order_a") == 400
+    confirmer = PaymentConfirmer(PortOneStandIn(delay=0), SEED_PRODUCTS)
+    # 다른 주문 번호로 만든 결제
+    assert _rejected(confirmer, "order_b", "order_a") == 400
+    assert payment_db.get_payment("order_a") is None
+    assert user_db.get_seed_balance(account_id) == 0
+
+    # 정상 확인 후, 같은 결제 ID를 새 주문에 재사용해도 적립 안 됨
+    assert asyncio.run(confirmer.confirm("user_x", "order_a", "order_a"))["seeds_credited"] == 6
+    assert _rejected(confirmer, "order_a", "order_b") == 400
+    assert not payment_db.save_payment("user_x", "order_a", "order_b")  # payment_id 유니크
+    assert user_db.get_seed_balance(account_id) == 6
+    assert _purchases(account_id) == [(6, "order_a")]
+
+
+def test_unverifiable_or_unowned_confirm_credits_nothing(app_db):
+    payment_db.create_order("order_anon", "123", None, "seed_5", 3850)
+    body_user = user_db.get_or_create_user("kakao", "someone")
+
+    # PortOne 시크릿 없음 → 검증 없이 적립하지 않음
+    assert _rejected(PaymentConfirmer(None, SEED_PRODUCTS), "order_anon", "order_anon", account_id=body_user) == 503
+    # 발급 기록 없는 주문, 적립 대상(주문·세션 사용자)이 없는 씨앗 주문
+    confirmer = PaymentConfirmer(PortOneStandIn(delay=0), SEED_PRODUCTS)
+    assert _rejected(confirmer, "order_missing", "order_missing") == 404
+    assert _rejected(confirmer, "order_anon", "order_anon") == 401
+    assert confirmer.fetch_payment.calls == 0
+    assert payment_db.get_payment("order_anon") is None
+    assert user_db.get_seed_balance(body_user) == 0
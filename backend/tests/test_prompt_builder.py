@@ -0,0 +1,80 @@
+"""프롬프트 조립: 문장 경계 자르기, 예산 배분, 고정 섹션은 system prefix에 그대로 차트별 내용만 user로"""
+from types import SimpleNamespace
+
+from logic.prompt_builder import TRUNCATION_MARK, PromptBuilder, cached_prompt_tokens, estimate_tokens, trim_to_tokens
+
+THEORY = "신강약 이론입니다. " * 200
+GUIDE = "작성 가이드: 강한 오행과 약한 오행을 설명하세요."
+
+
+def _messages(chart: str, theories: str, tone: str = "따뜻한 상담가"):
+    pb = PromptBuilder("t", model="gpt-4o", budget_tokens=1200)
+    pb.add_static("theory", THEORY)
+    pb.add_static("guide", GUIDE)
+    pb.add_static("tone", tone)
+    pb.add("analysis", chart)
+    pb.add("theory", theories, shrink=True)
+    return pb, pb.messages()
+
+
+def test_trim_cuts_at_sentence_boundary_within_budget():
+    text = "".join(f"{i}번째 문장은 오행의 균형을 설명합니다. " for i in range(100))
+    trimmed = trim_to_tokens(text, 120)
+
+    assert estimate_tokens(trimmed) <= 120
+    body = trimmed[:-len(TRUNCATION_MARK)]
+    assert trimmed.endswith(TRUNCATION_MARK) and body.endswith("설명합니다.")
+    assert text.startswith(body)
+    assert trim_to_tokens(text[:40], 120) == text[:40]  # 이미 들어가면 그대로
+
+
+def test_trim_without_sentence_boundary_still_fits():
+    text = "갑목" * 500
+    trimmed = trim_to_tokens(text, 100)
+
+    assert 0 < estimate_tokens(trimmed) <= 100
+    assert text.startswith(trimmed[:-len(TRUNCATION_MARK)])
+
+
+def test_budget_shrinks_only_shrink_sections_in_proportion():
+    chart = "일간 甲, 월지 寅, 신강. " * 20
+    pb = PromptBuilder("t", model="gpt-4o", budget_tokens=600)
+    pb.add("analysis", chart)
+    pb.add("theory_a", "천간합 이론 설명입니다. " * 200, shrink=True)
+    pb.add("theory_b", "지지충 이론 설명입니다. " * 100, shrink=True)
+    pb.build()
+    analysis, theory_a, theory_b = pb.sections
+
+    assert analysis.text == chart
+    assert theory_a.text.endswith(TRUNCATION_MARK) and theory_b.text.endswith(TRUNCATION_MARK)
+    assert analysis.tokens + theory_a.tokens + theory_b.tokens <= 600
+    # 원래 크기 2:1 비율대로 남은 예산을 나눔
+    assert 1.6 < theory_a.tokens / theory_b.tokens < 2.4
+
+
+def test_static_prefix_is_byte_identical_across_charts():
+    pb1, m1 = _messages("일간 甲, 신강", "천간합 이론. " * 300)
+    pb2, m2 = _messages("일간 癸, 신약", "지지충 이론. " * 10)
+    assert m1[0]["content"] == m2[0]["content"]
+    assert m1[0]["content"].startswith(THEORY)
+    assert pb1.prefix_hash == pb2.prefix_hash
+    # 예산 초과분은 가변(user) 쪽 shrink 섹션에서만 줄어듦
+    assert "일간 甲" in m1[1]["content"]
+    assert THEORY not in m1[1]["content"]
+
+
+def test_tone_only_changes_the_tail_of_the_prefix():
+    _, m1 = _messages("차트", "", tone="따뜻한 상담가")
+    _, m2 = _messages("차트", "", tone="냉철한 분석가")
+    s1, s2 = m1[0]["content"], m2[0]["content"]
+    assert s1 != s2
+    assert s1.startswith(THEORY + "\n\n" + GUIDE) and s2.startswith(THEORY + "\n\n" + GUIDE)
+
+
+def test_cached_prompt_tokens_reads_object_or_dict_usage():
+    as_dict = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=2000, prompt_tokens_details={"cached_tokens": 1536}))
+    as_obj = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=2000,
+                                                   prompt_tokens_details=SimpleNamespace(cached_tokens=1024)))
+    assert cached_prompt_tokens(as_dict) == 1536
+    assert cached_prompt_tokens(as_obj) == 1024
+    assert cached_prompt_tokens(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10))) is None
@@ -0,0 +1,46 @@
+import pytest
+
+from logic import saju_db
+
+
+@pytest.fixture
+def saju_path(app_db):
+    # created_at 이 겹치는 행(3개씩)과 다른 사용자 행을 섞어 넣음
+    with saju_db.get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO saju (user_id, name, birthdate, calendar_type, gender, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(1 + i % 2, f"n{i}", "1990-01-01", "양력", "남자", f"2024-01-01T00:00:{i // 6:02d}") for i in range(50)],
+        )
+        conn.commit()
+
+
+def test_keyset_pages_match_full_list(saju_path):
+    full = saju_db.get_saju_list_for_user(1)
+    assert len(full) == saju_db.get_saju_count_for_user(1) == 25
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = saju_db.get_saju_page_for_user(1, 4, cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [r["id"] for r in seen] == [r["id"] for r in full]
+
+
+def test_bad_cursor_and_limit_clamp(saju_path):
+    with pytest.raises(ValueError):
+        saju_db.get_saju_page_for_user(1, 10, "not-a-cursor")
+    page, cursor = saju_db.get_saju_page_for_user(1, 10_000)
+    assert len(page) == 25 and cursor is None
+
+
+def test_list_query_uses_index_order(saju_path):
+    with saju_db.get_conn() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM saju WHERE user_id = ? AND (created_at, id) < (?, ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT 21",
+            (1, "x", 1),
+        ).fetchall()
+    detail = " ".join(row[-1] for row in plan)
+    assert "idx_saju_user_created" in detail
+    assert "TEMP B-TREE" not in detail
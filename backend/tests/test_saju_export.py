@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+from logic import chart_compute, saju_db, saju_export
+
+
+def _export(user_id, fmt, limit):
+    """main 의 스트리밍 루프와 같은 방식으로 청크를 이어 붙임"""
+    chunks, after = [saju_export.csv_header()] if fmt == "csv" else [], None
+    while True:
+        text, after = saju_export.export_chunk(user_id, fmt, after, limit)
+        assert text.count("\n") <= limit
+        chunks.append(text)
+        if after is None:
+            return "".join(chunks)
+
+
+def _seed_rows():
+    chart = chart_compute.compute_chart("1990-05-05", "12:00", "양력")
+    saju_db.save_saju_for_user(1, "저장됨", None, "1990-05-05", "12:00", "양력", "남자", chart=chart)
+    for i in range(6):
+        saju_db.save_saju_for_user(1, f"n{i}", "지인", f"1990-05-0{i + 1}", "08:30", "양력", "여자")
+    saju_db.save_saju_for_user(1, "bad", None, "1990-13-40", None, "양력", "여자")
+    saju_db.save_saju_for_user(2, "other", None, "1990-05-05", None, "양력", "남자")
+
+
+def test_ndjson_export_streams_all_rows_and_repairs_charts(app_db):
+    _seed_rows()
+
+    lines = _export(1, "ndjson", limit=3).splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert len(records) == 8
+    assert [r["id"] for r in records] == [r["id"] for r in saju_db.get_saju_list_for_user(1)]
+    assert records[-1]["name"] == "저장됨" and records[-1]["day_pillar"] == "庚午"
+    bad = next(r for r in records if r["name"] == "bad")
+    assert bad["day_pillar"] is None
+    # 계산한 명식은 저장돼 다음에는 다시 계산하지 않음
+    assert sum(r["chart"] is None for r in saju_db.get_saju_list_for_user(1)) == 1
+
+
+def test_csv_export_has_header_and_fields(app_db):
+    _seed_rows()
+
+    text = _export(1, "csv", limit=100)
+    assert text.startswith("\ufeff")
+    rows = list(csv.reader(io.StringIO(text.lstrip("\ufeff"))))
+
+    assert rows[0] == list(saju_export.EXPORT_FIELDS)
+    assert len(rows) == 9
+    saved = dict(zip(rows[0], rows[-1]))
+    assert saved["name"] == "저장됨" and saved["day_stem"] == "庚"
+    assert sum(int(saved[k]) for k in chart_compute.ELEMENT_KEYS) == 8
+
+
+def test_csv_export_neutralizes_formulas(app_db):
+    saju_db.save_saju_for_user(1, '=HYPERLINK("http://x","y")', "@SUM(A1)", "1990-05-05", None, "양력", "남자")
+    saju_db.save_saju_for_user(1, "-1+2", "\t+cmd", "1990-05-05", None, "양력", "남자")
+
+    rows = list(csv.reader(io.StringIO(_export(1, "csv", limit=10).lstrip("\ufeff"))))
+    records = [dict(zip(rows[0], row)) for row in rows[1:]]
+
+    assert {(r["name"], r["relation"]) for r in records} == {
+        ("'=HYPERLINK(\"http://x\",\"y\")", "'@SUM(A1)"),
+        ("'-1+2", "'\t+cmd"),
+    }
+    # 날짜·숫자 칸은 그대로
+    assert all(r["birthdate"] == "1990-05-05" for r in records)
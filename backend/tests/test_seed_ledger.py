@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from logic import db, user_db
+
+
+@pytest.fixture
+def user_id(app_db):
+    return user_db.get_or_create_user("kakao", "stress")
+
+
+def _set_balance(uid: int, balance: int) -> None:
+    with user_db.get_conn() as conn:
+        conn.execute("UPDATE users SET seed_balance = ? WHERE id = ?", (balance, uid))
+        conn.commit()
+
+
+def _ledger(uid: int) -> list:
+    with user_db.get_conn() as conn:
+        return conn.execute(
+            "SELECT delta, balance_after, reason FROM seed_ledger WHERE user_id = ? ORDER BY id", (uid,)
+        ).fetchall()
+
+
+def test_deduct_writes_ledger_and_refuses_overspend(user_id):
+    _set_balance(user_id, 2)
+
+    assert user_db.deduct_seed(user_id, 1) == (True, 1)
+    assert user_db.deduct_seed(user_id, 2) == (False, 1)
+    assert user_db.deduct_seed(user_id, 1) == (True, 0)
+    assert user_db.deduct_seed(user_id, 1) == (False, 0)
+
+    assert _ledger(user_id) == [(-1, 1, "analysis"), (-1, 0, "analysis")]
+    with pytest.raises(sqlite3.IntegrityError), user_db.get_conn() as conn:
+        conn.execute("DELETE FROM seed_ledger")
+
+
+def test_concurrent_deductions_never_overspend(user_id):
+    balance, threads, attempts = 300, 16, 40  # 시도 640회 > 잔액 300
+    _set_balance(user_id, balance)
+    successes = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker():
+        start.wait()
+        ok = 0
+        for _ in range(attempts):
+            success, _ = user_db.deduct_seed(user_id, 1)
+            ok += success
+        db.close_thread_connections()
+        with lock:
+            successes.append(ok)
+
+    t0 = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    print(f"\n📊 deduct_seed {threads}스레드 × {attempts}회: {threads * attempts / elapsed:.0f} ops/s")
+
+    ledger = _ledger(user_id)
+    assert sum(successes) == balance
+    assert user_db.get_seed_balance(user_id) == 0
+    assert len(ledger) == balance
+    assert sum(delta for delta, _, _ in ledger) == -balance
+    # 잔액 변화가 빠짐없이 한 번씩 — 잃어버린 갱신 없음
+    assert sorted(after for _, after, _ in ledger) == list(range(balance))
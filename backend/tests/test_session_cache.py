@@ -0,0 +1,56 @@
+import pytest
+
+from logic import session_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in (session_cache.session_users, session_cache.profiles,
+                  session_cache.balances, session_cache.saju_counts):
+        cache.clear()
+    yield
+
+
+def test_resolve_caches_verified_sessions_only():
+    lookups, verifies = [], []
+
+    def lookup(value):
+        lookups.append(value)
+        return 7 if value == "kakao:1" else None
+
+    def verify(token):
+        verifies.append(token)
+        return 9 if token == "good" else None
+
+    for _ in range(3):
+        assert session_cache.resolve_user_id("kakao:1", None, lookup, verify) == 7
+        assert session_cache.resolve_user_id(None, "good", lookup, verify) == 9
+        assert session_cache.resolve_user_id("kakao:404", "bad", lookup, verify) is None
+
+    assert lookups.count("kakao:1") == 1
+    assert verifies.count("good") == 1
+    # 확인 실패는 캐시하지 않으므로 매번 다시 확인
+    assert lookups.count("kakao:404") == 3
+    assert verifies.count("bad") == 3
+
+
+def test_cached_values_and_invalidation():
+    balance = {"value": 5}
+    loads = []
+
+    def load_balance(user_id):
+        loads.append(user_id)
+        return balance["value"]
+
+    assert session_cache.cached(session_cache.balances, 1, load_balance) == 5
+    balance["value"] = 4
+    assert session_cache.cached(session_cache.balances, 1, load_balance) == 5  # 캐시
+    session_cache.invalidate_user(1, balance=True)
+    assert session_cache.cached(session_cache.balances, 1, load_balance) == 4
+    assert loads == [1, 1]
+
+    # 없는 사용자(None)도 캐시
+    missing = []
+    assert session_cache.cached(session_cache.profiles, 2, lambda uid: missing.append(uid)) is None
+    assert session_cache.cached(session_cache.profiles, 2, lambda uid: missing.append(uid)) is None
+    assert missing == [2]
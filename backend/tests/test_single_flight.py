@@ -0,0 +1,87 @@
+"""동일 요청 병합: 한 번만 실행, 예외는 모든 대기자에게, 첫 호출자가 끊겨도 나머지는 결과를 받음"""
+import asyncio
+
+import pytest
+
+from logic.single_flight import SingleFlight, make_key
+
+
+class SlowCall:
+    """호출 수를 세고 release 될 때까지 기다렸다가 결과(또는 예외)를 반환"""
+
+    def __init__(self, result="해석", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_make_key_normalizes_whitespace():
+    key = make_key("interpret", pillars=["庚辰", "乙酉"], tone="empathy", concern="이직  고민 ")
+    assert key == make_key("interpret", tone="empathy", concern="이직 고민", pillars=["庚辰", "乙酉"])
+    assert key != make_key("interpret", pillars=["庚辰", "乙酉"], tone="fun", concern="이직 고민")
+
+
+def test_concurrent_calls_with_same_key_run_once():
+    async def scenario():
+        flight = SingleFlight("t")
+        call = SlowCall()
+        waiters = [asyncio.ensure_future(flight.do("k", call)) for _ in range(5)]
+        other = asyncio.ensure_future(flight.do("other", SlowCall(result="다른 키")))
+        await asyncio.sleep(0)
+        call.release.set()
+        results = await asyncio.gather(*waiters)
+        other.cancel()
+        return flight, call, results
+
+    flight, call, results = asyncio.run(scenario())
+    assert results == ["해석"] * 5
+    assert call.calls == 1
+    stats = flight.stats()
+    assert (stats["calls"], stats["executed"], stats["coalesced"]) == (6, 2, 4)
+
+
+def test_exception_reaches_every_waiter_and_next_call_runs_again():
+    async def scenario():
+        flight = SingleFlight("t")
+        call = SlowCall(error=RuntimeError("OpenAI 오류"))
+        waiters = [asyncio.ensure_future(flight.do("k", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        call.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        # 실패한 호출은 남지 않으므로 다음 요청은 새로 실행
+        retry = SlowCall(result="재시도")
+        retry.release.set()
+        return flight, results, await flight.do("k", retry)
+
+    flight, results, retried = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) and str(r) == "OpenAI 오류" for r in results)
+    assert retried == "재시도"
+    assert flight.stats()["errors"] == 1 and flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_first_caller_does_not_cancel_shared_call():
+    async def scenario():
+        flight = SingleFlight("t")
+        call = SlowCall()
+        first = asyncio.ensure_future(flight.do("k", call))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", call))
+        await asyncio.sleep(0)
+        first.cancel()  # 첫 요청 클라이언트 연결 끊김
+        await asyncio.sleep(0)
+        call.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return call, await second
+
+    call, result = asyncio.run(scenario())
+    assert result == "해석"
+    assert call.calls == 1
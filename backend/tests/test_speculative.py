@@ -0,0 +1,65 @@
+import threading
+
+from logic.speculative import DUPLICATE, OVER_BUDGET, QUEUED, SpeculativePrefetcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_daily_budget_per_user_and_duplicates_are_free():
+    clock = FakeClock()
+    ran = []
+    p = SpeculativePrefetcher(run=ran.append, daily_budget=2, window_sec=3600, clock=clock)
+
+    assert p.submit(1, "a", {"n": 1}) == QUEUED
+    assert p.submit(1, "a", {"n": 1}) == DUPLICATE
+    assert p.submit(1, "b", {"n": 2}) == QUEUED
+    assert p.submit(1, "c", {"n": 3}) == OVER_BUDGET
+    # 다른 사용자는 별도 예산
+    assert p.submit(2, "c", {"n": 3}) == QUEUED
+
+    # 다음 날이면 예산 초기화
+    clock.now += 60 * 60 * 24
+    assert p.submit(1, "d", {"n": 4}) == QUEUED
+    p.shutdown()
+
+    stats = p.stats()
+    assert stats["queued"] == 4
+    assert stats["duplicates"] == 1
+    assert stats["over_budget"] == 1
+
+
+def test_hit_inflight_ready_miss_and_waste():
+    clock = FakeClock()
+    release = threading.Event()
+    p = SpeculativePrefetcher(run=lambda payload: release.wait(5), daily_budget=10, window_sec=600, clock=clock)
+
+    p.submit(1, "slow", {})
+    pending = p.claim("slow")
+    assert pending is not None          # 아직 생성 중 → 호출부가 기다릴 수 있음
+    release.set()
+    pending.result(timeout=5)
+
+    p.submit(1, "ready", {})
+    p.submit(1, "unused", {})
+    p._entries["ready"].future.result(timeout=5)
+    assert p.claim("ready") is None     # 이미 완료 → 캐시에서 바로
+    assert p.claim("ready") is None     # 같은 항목 재요청은 다시 세지 않음
+    assert p.claim("never-speculated") is None
+
+    clock.now += 601                    # 창 만료 → 한 번도 요청 안 된 'unused' 는 낭비
+    stats = p.stats()
+    p.shutdown()
+
+    assert stats["hits_inflight"] == 1
+    assert stats["hits_ready"] == 1
+    assert stats["misses"] == 1
+    assert stats["wasted"] == 1
+    assert stats["hit_rate"] == round(2 / 3, 3)
+    assert stats["waste_rate"] == round(1 / 3, 3)
+    assert stats["pending"] == 0
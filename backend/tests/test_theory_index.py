@@ -0,0 +1,93 @@
+"""이론 BM25 인덱스: 청크 중복 제거, 순위, 버전별 캐시 파일, 검색 실패 시 고정 발췌 폴백"""
+import pytest
+
+from logic import theory_index, theory_retriever
+from logic.theory_index import TheoryIndex, chunk_theory
+from logic.theory_retriever import TheoryCorpus
+
+SHARED = "천간합은 두 천간이 만나 새로운 기운으로 변하는 관계입니다. 합화 조건은 월지가 결정합니다."
+THEORIES = {
+    "천간합": f"# 천간합\n\n{SHARED}",
+    "천간합,충": f"# 천간합\n\n{SHARED}\n\n# 천간충\n\n갑경충은 서로 부딪히는 관계입니다.",
+    "귀인신살": "# 도화살\n\n도화살은 사람을 끄는 매력입니다. 도화살이 있으면 인기가 많습니다.\n\n"
+                "# 역마살\n\n역마살은 이동과 변화의 기운입니다.",
+}
+
+
+def _corpus(theories=THEORIES):
+    return TheoryCorpus(theories, signature=())
+
+
+@pytest.fixture
+def shared_index(tmp_path, monkeypatch):
+    """get_index 가 tmp 캐시 폴더와 교체 가능한 코퍼스를 쓰도록"""
+    state = {"corpus": _corpus()}
+    monkeypatch.setattr(theory_index, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(theory_index, "get_corpus", lambda: state["corpus"])
+    monkeypatch.setattr(theory_index, "_index", None)
+    return state
+
+
+def test_chunks_follow_headings_and_duplicates_are_indexed_once():
+    chunks = chunk_theory("천간합,충", THEORIES["천간합,충"])
+    assert [c["heading"] for c in chunks] == ["천간합", "천간충"]
+
+    # 두 파일에 똑같이 실린 천간합 청크는 한 번만 색인
+    index = TheoryIndex.build(_corpus())
+    assert [(c["source"], c["heading"]) for c in index.chunks] == [
+        ("천간합", "천간합"), ("천간합,충", "천간충"), ("귀인신살", "도화살"), ("귀인신살", "역마살"),
+    ]
+    assert len(index.doc_lens) == 4
+
+
+def test_search_ranks_matching_chunk_first_within_budget():
+    index = TheoryIndex.build(_corpus())
+
+    results = index.search("도화살 매력")
+    assert results[0]["heading"] == "도화살"
+    assert all(r["score"] < results[0]["score"] for r in results[1:])
+    assert index.search("천간충 갑경")[0]["heading"] == "천간충"
+    assert index.search("없는단어") == []
+
+    budget = results[0]["tokens"]
+    assert [r["id"] for r in index.search("도화살 역마살", budget_tokens=budget)] == [results[0]["id"]]
+    assert index.search("도화살", skip=lambda c: c["heading"] == "도화살") == []
+
+
+def test_index_cache_is_reused_until_corpus_version_changes(shared_index, monkeypatch):
+    first = theory_index.get_index()
+    path = theory_index._cache_path(first.version)
+    assert path.exists()
+
+    # 새 프로세스 흉내: 메모리 인덱스 없이 → 파일에서 로드 (빌드 안 함)
+    monkeypatch.setattr(theory_index, "_index", None)
+    built = []
+    original_build = TheoryIndex.build
+    monkeypatch.setattr(TheoryIndex, "build", classmethod(lambda cls, c: built.append(c) or original_build(c)))
+    loaded = theory_index.get_index()
+    assert built == [] and loaded is not first
+    assert loaded.version == first.version and loaded.chunks == first.chunks
+
+    # 이론 파일이 바뀌면 새 버전으로 다시 빌드해 새 파일에 저장
+    shared_index["corpus"] = _corpus({**THEORIES, "역마": "# 역마\n\n역마는 먼 곳으로 떠나는 기운입니다."})
+    rebuilt = theory_index.get_index()
+    assert len(built) == 1 and rebuilt.version != first.version
+    assert theory_index._cache_path(rebuilt.version).exists()
+
+
+def test_retriever_falls_back_to_prefix_blocks(shared_index, monkeypatch):
+    corpus = shared_index["corpus"]
+    monkeypatch.setattr(theory_retriever, "get_corpus", lambda: corpus)
+    monkeypatch.setattr(theory_retriever, "RETRIEVAL_MODE", "bm25")
+    retriever = theory_retriever.TheoryRetriever()
+    analysis = {"patterns": ["도화살"], "sinsal": {"dohwa": True}}
+
+    assert "도화살은 사람을 끄는 매력" in retriever.get_relevant_theories(analysis)
+
+    def broken_index():
+        raise OSError("index unavailable")
+
+    monkeypatch.setattr(theory_index, "get_index", broken_index)
+    fallback = retriever.get_relevant_theories(analysis)
+    assert fallback == corpus.relevant_block(analysis["patterns"])
+    assert "역마살은 이동과 변화의 기운" in fallback  # 청크가 아니라 귀인신살 발췌 블록 전체
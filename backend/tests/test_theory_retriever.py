@@ -0,0 +1,124 @@
+"""공유 이론 코퍼스: 변경 없으면 재로드 안 함, 파일이 바뀌면 새 객체로 교체, 확인 주기, 불변, 미리 조립한 블록"""
+import os
+import shutil
+import time
+from itertools import product
+from types import SimpleNamespace
+
+import pytest
+
+from logic import theory_retriever
+from logic.prompt_builder import TRUNCATION_MARK, estimate_tokens
+from logic.theory_retriever import SECTION_SPECS, THEORY_FILES
+
+# 예전 get_relevant_theories 의 고정 글자 수 발췌 (키, 제목, 글자 수) — 조합 순서도 이 순서
+OLD_REQUIRED = [("신강약", "신강약 이론", 3000), ("오행십신", "오행과 십신 이론", 4000)]
+OLD_BY_FLAG = [
+    [("천간합", "천간합 이론", 2000), ("천간충", "천간충 이론", 2000)],
+    [("지지합", "지지합 이론", 2000)],
+    [("지지충", "지지충 이론", 2000)],
+    [("귀인신살", "신살 이론", 3000)],
+]
+
+
+@pytest.fixture
+def theory_dir(tmp_path, monkeypatch):
+    """theories/ 복사본을 공유 코퍼스 경로로 (재로드 상태도 초기화)"""
+    path = tmp_path / "theories"
+    shutil.copytree(theory_retriever.THEORY_DIR, path)
+    monkeypatch.setattr(theory_retriever, "THEORY_DIR", path)
+    monkeypatch.setattr(theory_retriever, "_corpus", None)
+    monkeypatch.setattr(theory_retriever, "_last_check", 0.0)
+    return path
+
+
+def _touch(path, append=""):
+    if append:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(append)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_reload_is_noop_until_a_file_changes(theory_dir):
+    assert theory_retriever.reload_corpus() is True
+    first = theory_retriever._corpus
+    assert theory_retriever.reload_corpus() is False
+    assert theory_retriever._corpus is first
+
+    # mtime 만 바뀜 → 새 객체로 교체하지만 내용 기준 버전은 그대로
+    _touch(theory_dir / THEORY_FILES["신강약"])
+    assert theory_retriever.reload_corpus() is True
+    touched = theory_retriever._corpus
+    assert touched is not first and touched.version == first.version
+
+    # 내용(크기)이 바뀜 → 새 버전, 이전 객체를 들고 있던 쪽은 예전 내용 그대로
+    _touch(theory_dir / THEORY_FILES["지지충"], append="\n추가된 문단입니다.\n")
+    assert theory_retriever.reload_corpus() is True
+    changed = theory_retriever._corpus
+    assert changed.version != first.version
+    assert changed.theories["지지충"].endswith("추가된 문단입니다.\n")
+    assert not first.theories["지지충"].endswith("추가된 문단입니다.\n")
+
+
+def test_get_corpus_checks_files_only_every_reload_interval(theory_dir, monkeypatch):
+    clock = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(theory_retriever, "time", SimpleNamespace(monotonic=lambda: clock.t, time=time.time))
+    monkeypatch.setattr(theory_retriever, "RELOAD_CHECK_SEC", 30.0)
+    first = theory_retriever.get_corpus()
+
+    _touch(theory_dir / THEORY_FILES["천간합"], append="\n새 이론.\n")
+    clock.t += 29
+    assert theory_retriever.get_corpus() is first
+    clock.t += 2
+    reloaded = theory_retriever.get_corpus()
+    assert reloaded is not first and reloaded.version != first.version
+    # 다음 확인 주기 전까지는 파일을 다시 보지 않음
+    assert theory_retriever.get_corpus() is reloaded
+
+
+def test_corpus_is_immutable(theory_dir):
+    corpus = theory_retriever.load_corpus(theory_dir)
+    with pytest.raises(TypeError):
+        corpus.theories["신강약"] = "다른 내용"
+    with pytest.raises(TypeError):
+        corpus.blocks[(False,) * 4] = ""
+    with pytest.raises(TypeError):
+        corpus.sections["신강약"] = ""
+
+
+def test_precomputed_blocks_match_old_slice_selection(theory_dir):
+    corpus = theory_retriever.load_corpus(theory_dir)
+    theories = corpus.theories
+    assert len(corpus.blocks) == len(corpus.extra_blocks) == 16
+
+    # 발췌 하나하나: 예전 글자 수 발췌와 같은 곳에서 시작해 문장 경계에서 토큰 상한 안으로 자름
+    old_slices = OLD_REQUIRED + [spec for extra in OLD_BY_FLAG for spec in extra]
+    for key, title, chars in old_slices:
+        header = f"## {title}\n\n"
+        section = corpus.sections[key]
+        body = section.removeprefix(header).removesuffix(TRUNCATION_MARK)
+        assert section.startswith(header)
+        assert theories[key].startswith(body)
+        assert body[:200] == theories[key][:chars][:200]
+        assert estimate_tokens(body) <= SECTION_SPECS[key][1]
+
+    all_titles = [title for _, title, _ in old_slices]
+    for flags in product((False, True), repeat=4):
+        specs = list(OLD_REQUIRED)
+        for on, extra in zip(flags, OLD_BY_FLAG):
+            if on:
+                specs += extra
+        block = corpus.blocks[flags]
+        # 예전과 같은 이론을 같은 순서로 조합 (해당 안 되는 이론은 없음)
+        positions = [block.find(f"## {title}\n\n") for _, title, _ in specs]
+        assert -1 not in positions and positions == sorted(positions)
+        included = {title for _, title, _ in specs}
+        assert not any(f"## {t}\n\n" in block for t in all_titles if t not in included)
+        expected = "\n\n---\n\n".join(corpus.sections[key] for key, _, _ in specs)
+        assert expected.startswith(block.removesuffix(TRUNCATION_MARK))  # 합친 길이 상한을 넘으면 뒤만 잘림
+        assert estimate_tokens(block) <= theory_retriever.MAX_COMBINED_TOKENS
+        # prefix 에 들어간 공통 이론(신강약·오행십신)을 뺀 나머지
+        extra = corpus.extra_blocks[flags]
+        assert "## 신강약 이론" not in extra and "## 오행과 십신 이론" not in extra
+        assert all(f"## {title}\n\n" in extra for _, title, _ in specs[2:])
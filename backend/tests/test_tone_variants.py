@@ -0,0 +1,106 @@
+"""TONE_MODE=all: 세 톤 JSON 응답 파싱, 톤 누락·429 시 재시도, 톤 전환은 캐시에서 (로컬 스텁 응답)"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from logic import gpt_generator  # noqa: E402
+from logic.deadline import Deadline, deadline_scope  # noqa: E402
+from logic.gpt_generator import GPTInterpretationGenerator, _parse_tone_variants  # noqa: E402
+from logic.llm_cache import TTLCache  # noqa: E402
+from logic.prompt_builder import PromptBuilder  # noqa: E402
+
+VARIANTS = '{"empathy": "따뜻한 본문", "reality": "냉철한 본문", "fun": "재밌는 본문"}'
+
+
+class StubCompletion:
+    """chat_completion 대신: 준비한 응답을 순서대로 반환하고 호출 수를 셈"""
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.calls = []
+
+    def __call__(self, client, **kwargs):
+        self.calls.append(kwargs)
+        content = self.contents.pop(0)
+        if isinstance(content, Exception):
+            raise content
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setattr(gpt_generator, "TONE_MODE", "all")
+    monkeypatch.setattr(gpt_generator, "section_cache", TTLCache("test", ttl_sec=60, max_entries=10))
+    gen = GPTInterpretationGenerator.__new__(GPTInterpretationGenerator)
+    gen.client = object()
+    gen.priority = gpt_generator.PRIORITY_INTERACTIVE
+    return gen
+
+
+def _complete(gen, tone):
+    pb = PromptBuilder("comprehensive_section", model="gpt-4o")
+    gen._add_tone(pb, gpt_generator.COMPREHENSIVE_TONE_PROMPTS, tone)
+    pb.add("analysis", "일간 甲, 신강")
+    return gen._complete_cached(pb, "comprehensive_elements", "gpt-4o", 1800, tone)
+
+
+def test_parse_accepts_fenced_json_and_rejects_missing_tone():
+    assert _parse_tone_variants(f"```json\n{VARIANTS}\n```") == {
+        "empathy": "따뜻한 본문", "reality": "냉철한 본문", "fun": "재밌는 본문",
+    }
+    assert _parse_tone_variants('{"empathy": "따뜻한 본문", "reality": "냉철한 본문"}') is None
+    assert _parse_tone_variants("그냥 글") is None
+
+
+def test_missing_tone_is_retried(generator, monkeypatch):
+    stub = StubCompletion('{"empathy": "따뜻한 본문", "reality": "", "fun": "재밌는 본문"}', VARIANTS)
+    monkeypatch.setattr(gpt_generator, "chat_completion", stub)
+
+    assert _complete(generator, "reality") == "냉철한 본문"
+    assert len(stub.calls) == 2
+    assert stub.calls[0]["response_format"] == {"type": "json_object"}
+    assert stub.calls[0]["max_tokens"] == 1800 * gpt_generator.ALL_TONES_TOKEN_FACTOR
+
+
+def test_tone_switch_is_served_from_section_cache(generator, monkeypatch):
+    stub = StubCompletion(VARIANTS)
+    monkeypatch.setattr(gpt_generator, "chat_completion", stub)
+
+    assert _complete(generator, "empathy") == "따뜻한 본문"
+    # 톤을 바꿔도 프롬프트(세 톤 블록)가 같으므로 같은 캐시 항목
+    assert _complete(generator, "fun") == "재밌는 본문"
+    assert _complete(generator, "reality") == "냉철한 본문"
+    assert len(stub.calls) == 1
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("rate limit exceeded")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+
+def test_rate_limited_section_backs_off_and_retries(generator, monkeypatch):
+    stub = StubCompletion(RateLimited(retry_after="2"), VARIANTS)
+    sleeps = []
+    monkeypatch.setattr(gpt_generator, "chat_completion", stub)
+    monkeypatch.setattr(gpt_generator.time, "sleep", sleeps.append)
+
+    with deadline_scope(Deadline(20)):
+        assert _complete(generator, "fun") == "재밌는 본문"
+    assert len(stub.calls) == 2 and sleeps == [2.0]
+
+
+def test_rate_limited_section_falls_back_when_backoff_exceeds_deadline(generator, monkeypatch):
+    stub = StubCompletion(RateLimited(retry_after="5"), VARIANTS)
+    sleeps = []
+    monkeypatch.setattr(gpt_generator, "chat_completion", stub)
+    monkeypatch.setattr(gpt_generator.time, "sleep", sleeps.append)
+
+    with deadline_scope(Deadline(3)):
+        assert _complete(generator, "fun") is None
+    assert len(stub.calls) == 1 and sleeps == []
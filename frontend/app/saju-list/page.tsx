@@ -19,6 +19,13 @@ type SajuRow = {
   calendar_type: string;
   gender: string;
   created_at: string;
+  // 저장 시 서버가 계산해 둔 명식 (backfill 전이면 null)
+  chart?: {
+    year_pillar: string;
+    month_pillar: string;
+    day_pillar: string;
+    hour_pillar: string;
+  } | null;
 };
 
 type SajuWithAnimal = SajuRow & {
@@ -26,6 +33,14 @@ type SajuWithAnimal = SajuRow & {
   animalName?: string;
 };
 
+type SajuPage = {
+  items: SajuRow[];
+  total: number;
+  next_cursor: string | null;
+};
+
+const PAGE_SIZE = 20;
+
 const HANJA_TO_HANGUL: Record<string, string> = {
   甲: "갑",
   乙: "을",
@@ -87,6 +102,52 @@ function getAnimalNameColor(animalName: string): string {
   return "#374151";
 }
 
+async function withAnimalName(item: SajuWithAnimal): Promise<SajuWithAnimal> {
+  if (item.chart?.day_pillar) {
+    const key = dayPillarToKey(item.chart.day_pillar);
+    return { ...item, dayPillarKey: key, animalName: key ? getDayPillarAnimalName(key) : "" };
+  }
+  try {
+    const [y, m, d] = (item.birthdate || "").split("-").map(Number);
+    if (!y || !m || !d) return item;
+
+    let hour = 12;
+    let minute = 0;
+    const timePart = (item.birth_time || "").trim();
+    if (timePart && /^\d{1,2}:\d{1,2}$/.test(timePart)) {
+      const [h, mi] = timePart.split(":").map(Number);
+      if (!Number.isNaN(h)) hour = h;
+      if (!Number.isNaN(mi)) minute = mi;
+    }
+
+    const calendar_type =
+      item.calendar_type === "음력" ? "lunar" : "solar";
+    const gender = item.gender === "남자" ? "M" : "F";
+
+    const fullRes = await fetch(`${API_BASE}/saju/full`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        calendar_type,
+        year: y,
+        month: m,
+        day: d,
+        hour,
+        minute,
+        gender,
+      }),
+    });
+    const full = await fullRes.json().catch(() => null);
+    if (!fullRes.ok || !full) return item;
+
+    const key = dayPillarToKey(full.day_pillar);
+    const animalName = key ? getDayPillarAnimalName(key) : "";
+    return { ...item, dayPillarKey: key, animalName };
+  } catch {
+    return item;
+  }
+}
+
 export default function SajuListPage({
   params,
 }: { params?: Promise<Record<string, string | string[]>> } = {}) {
@@ -95,76 +156,77 @@ export default function SajuListPage({
   const [items, setItems] = useState<SajuWithAnimal[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState<number | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [exporting, setExporting] = useState(false);
+
+  // 한 페이지씩 받아 목록에 붙이고, 일주 동물 이름은 그 페이지 항목만 따로 채움
+  async function loadPage(after: string | null, isCancelled: () => boolean = () => false) {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (after) params.set("after", after);
+    const res = await fetch(`${API_BASE}/api/saju/list?${params}`, {
+      credentials: "include",
+      headers: getAuthHeaders(),
+    });
+    const data: SajuPage | null = await res.json().catch(() => null);
+    if (!res.ok || !data) {
+      throw new Error("saju list");
+    }
+    if (isCancelled()) return;
+
+    const baseList: SajuWithAnimal[] = Array.isArray(data.items) ? data.items : [];
+    setItems((prev) => (after ? [...prev, ...baseList] : baseList));
+    setNextCursor(data.next_cursor ?? null);
+    setTotal(typeof data.total === "number" ? data.total : null);
+
+    const withAnimals = await Promise.all(baseList.map(withAnimalName));
+    if (isCancelled()) return;
+    const byId = new Map(withAnimals.map((item) => [item.id, item]));
+    setItems((prev) => prev.map((item) => byId.get(item.id) ?? item));
+  }
+
+  async function handleLoadMore() {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      await loadPage(nextCursor);
+    } catch {
+      alert("사주 목록을 더 불러오지 못했습니다.");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  // 저장한 사주 전체를 명식과 함께 CSV로 내려받기 (서버가 청크씩 스트리밍)
+  async function handleExport() {
+    if (exporting) return;
+    setExporting(true);
+    try {
+      const res = await fetch(`${API_BASE}/api/saju/export?format=csv`, {
+        credentials: "include",
+        headers: getAuthHeaders(),
+      });
+      if (!res.ok) throw new Error("saju export");
+      const url = URL.createObjectURL(await res.blob());
+      const a = document.createElement("a");
+      a.href = url;
+      a.download = `hsaju-saju-${new Date().toISOString().slice(0, 10)}.csv`;
+      a.click();
+      URL.revokeObjectURL(url);
+    } catch {
+      alert("사주 목록을 내보내지 못했습니다.");
+    } finally {
+      setExporting(false);
+    }
+  }
 
   useEffect(() => {
     let cancelled = false;
 
     async function load() {
       try {
-        const res = await fetch(`${API_BASE}/api/saju/list`, {
-          credentials: "include",
-          headers: getAuthHeaders(),
-        });
-        const data = await res.json().catch(() => []);
-        if (!res.ok) {
-          if (!cancelled) {
-            setError("사주 목록을 불러오지 못했습니다.");
-            setLoading(false);
-          }
-          return;
-        }
-        if (cancelled) return;
-
-        const baseList: SajuWithAnimal[] = Array.isArray(data) ? data : [];
-        setItems(baseList);
-
-        const withAnimals = await Promise.all(
-          baseList.map(async (item) => {
-            try {
-              const [y, m, d] = (item.birthdate || "").split("-").map(Number);
-              if (!y || !m || !d) return item;
-
-              let hour = 12;
-              let minute = 0;
-              const timePart = (item.birth_time || "").trim();
-              if (timePart && /^\d{1,2}:\d{1,2}$/.test(timePart)) {
-                const [h, mi] = timePart.split(":").map(Number);
-                if (!Number.isNaN(h)) hour = h;
-                if (!Number.isNaN(mi)) minute = mi;
-              }
-
-              const calendar_type =
-                item.calendar_type === "음력" ? "lunar" : "solar";
-              const gender = item.gender === "남자" ? "M" : "F";
-
-              const fullRes = await fetch(`${API_BASE}/saju/full`, {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({
-                  calendar_type,
-                  year: y,
-                  month: m,
-                  day: d,
-                  hour,
-                  minute,
-                  gender,
-                }),
-              });
-              const full = await fullRes.json().catch(() => null);
-              if (!fullRes.ok || !full) return item;
-
-              const key = dayPillarToKey(full.day_pillar);
-              const animalName = key ? getDayPillarAnimalName(key) : "";
-              return { ...item, dayPillarKey: key, animalName };
-            } catch {
-              return item;
-            }
-          })
-        );
-
-        if (!cancelled) {
-          setItems(withAnimals);
-        }
+        await loadPage(null, () => cancelled);
       } catch {
         if (!cancelled) {
           setError("사주 목록을 불러오지 못했습니다.");
@@ -531,6 +593,46 @@ export default function SajuListPage({
                 </button>
               ))
             )}
+            {!loading && !error && nextCursor && (
+              <button
+                type="button"
+                className="tap sans"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                style={{
+                  width: "100%",
+                  background: "transparent",
+                  border: "1.5px dashed #c8dac8",
+                  borderRadius: 14,
+                  padding: 12,
+                  fontSize: 13,
+                  color: "#4b5563",
+                }}
+              >
+                {loadingMore
+                  ? "불러오는 중..."
+                  : `더 보기${total !== null ? ` (${items.length}/${total})` : ""}`}
+              </button>
+            )}
+            {!loading && !error && items.length > 0 && (
+              <button
+                type="button"
+                className="tap sans"
+                onClick={handleExport}
+                disabled={exporting}
+                style={{
+                  width: "100%",
+                  background: "transparent",
+                  border: "none",
+                  padding: 8,
+                  fontSize: 12,
+                  color: "#6b7280",
+                  textDecoration: "underline",
+                }}
+              >
+                {exporting ? "내보내는 중..." : "전체 목록 내보내기 (CSV)"}
+              </button>
+            )}
           </div>
         </section>
       </div>
@@ -76,7 +76,8 @@ export default function SajuMyPage({
     const loadUserInfo = async (retryCount = 0): Promise<void> => {
       const maxRetries = 2;
       try {
-        const res = await fetch(`${API_BASE}/api/me`, {
+        // 사용자 정보 + 씨앗 잔액을 한 번에
+        const res = await fetch(`${API_BASE}/api/session`, {
           credentials: "include",
           headers: { Accept: "application/json", ...getAuthHeaders() },
         });
@@ -88,6 +89,7 @@ export default function SajuMyPage({
             email: data.email ?? null,
             nickname: data.nickname ?? null,
           });
+          if (typeof data.seeds === "number") setSeedCount(data.seeds);
           if (!cancelled) setUserInfoLoading(false);
           return;
         }
@@ -114,23 +116,6 @@ export default function SajuMyPage({
     return () => { cancelled = true; };
   }, []);
 
-  useEffect(() => {
-    let cancelled = false;
-    (async () => {
-      try {
-        const res = await fetch(`${API_BASE}/api/seeds`, {
-          credentials: "include",
-          headers: getAuthHeaders(),
-        });
-        const data = await res.json().catch(() => ({}));
-        if (!cancelled && typeof data?.seeds === "number") setSeedCount(data.seeds);
-      } catch {
-        if (!cancelled) setSeedCount(0);
-      }
-    })();
-    return () => { cancelled = true; };
-  }, []);
-
   const handleLogout = () => {
     if (typeof window !== "undefined") {
       localStorage.removeItem("isLoggedIn");
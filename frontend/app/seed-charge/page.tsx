@@ -96,7 +96,8 @@ export default function SeedChargePage({
         const userId = getUserId();
         const createRes = await fetch(`${API_BASE}/payment/create`, {
           method: "POST",
-          headers: { "Content-Type": "application/json" },
+          credentials: "include",
+          headers: { "Content-Type": "application/json", ...getAuthHeaders() },
           body: JSON.stringify({ user_id: userId, product_key: productKey }),
         });
         const createData = await createRes.json();
@@ -119,7 +120,8 @@ export default function SeedChargePage({
         if (response?.paymentId) {
           const confirmRes = await fetch(`${API_BASE}/payment/confirm`, {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            credentials: "include",
+            headers: { "Content-Type": "application/json", ...getAuthHeaders() },
             body: JSON.stringify({
               user_id: userId,
               payment_id: response.paymentId,